@@ -0,0 +1,56 @@
+"""
+Management command to generate a large, skewed dataset for capacity testing.
+A few organizations get most of the users and tasks and many get very few;
+see core.seeding for the generator. Users share the password SCALE_PASSWORD.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.seeding import SCALE_PASSWORD, ScaleSeeder
+
+
+class Command(BaseCommand):
+    help = 'Generate organizations, members, projects and millions of tasks for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orgs', type=int, default=100, help='Organizations to create')
+        parser.add_argument('--users', type=int, default=2000, help='Users, split across organizations')
+        parser.add_argument('--tasks', type=int, default=100000, help='Tasks, split across organizations')
+        parser.add_argument('--tasks-per-project', type=int, default=2000, help='Target tasks per project')
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent for organization sizes (0 = uniform)')
+        parser.add_argument('--comments', type=float, default=1.5, help='Average comments per task')
+        parser.add_argument('--attachment-rate', type=float, default=0.1, help='Fraction of tasks with an attachment')
+        parser.add_argument('--notifications', type=int, default=20, help='Notifications per user')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows buffered per table before writing')
+        parser.add_argument('--no-copy', action='store_true', help='Use bulk_create even on PostgreSQL')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        if options['orgs'] < 1 or options['tasks'] < 0:
+            raise CommandError('--orgs must be at least 1 and --tasks non-negative')
+
+        seeder = ScaleSeeder(
+            orgs=options['orgs'],
+            users=options['users'],
+            tasks=options['tasks'],
+            tasks_per_project=options['tasks_per_project'],
+            skew=options['skew'],
+            comments_per_task=options['comments'],
+            attachment_rate=options['attachment_rate'],
+            notifications_per_user=options['notifications'],
+            batch_size=options['batch_size'],
+            use_copy=not options['no_copy'],
+            random_seed=options['seed'],
+            progress=self.stdout.write,
+        )
+        mode = 'COPY' if seeder.writer.use_copy else 'bulk_create'
+        self.stdout.write(f"Seeding {options['tasks']} tasks across {options['orgs']} organizations ({mode})")
+
+        report = seeder.run()
+
+        for label, count in report['rows'].items():
+            self.stdout.write(f"  {label}: {count}")
+        total = sum(report['rows'].values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {total} rows in {report['seconds']}s "
+            f"({total / max(report['seconds'], 0.1):.0f} rows/s). Password: {SCALE_PASSWORD}"
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_make_username_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='dedupe_key',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='notification',
+            name='type',
+            field=models.CharField(choices=[('task_assigned', 'Task Assigned'), ('task_updated', 'Task Updated'), ('task_completed', 'Task Completed'), ('task_comment', 'Task Comment'), ('project_invite', 'Project Invitation'), ('org_invite', 'Organization Invitation'), ('mention', 'Mentioned'), ('deadline', 'Deadline Reminder'), ('task_overdue', 'Task Overdue'), ('invitation_accepted', 'Invitation Accepted'), ('invitation_declined', 'Invitation Declined'), ('member_left', 'Member Left'), ('account_deleted', 'Account Deleted')], max_length=20),
+        ),
+    ]
@@ -119,6 +119,7 @@ class Notification(models.Model):
         ('org_invite', 'Organization Invitation'),
         ('mention', 'Mentioned'),
         ('deadline', 'Deadline Reminder'),
+        ('task_overdue', 'Task Overdue'),
         ('invitation_accepted', 'Invitation Accepted'),
         ('invitation_declined', 'Invitation Declined'),
         ('member_left', 'Member Left'),
@@ -152,6 +153,8 @@ class Notification(models.Model):
     actor_id = models.IntegerField(blank=True, null=True, help_text="User who triggered the notification")
     actor_name = models.CharField(max_length=255, blank=True, null=True)
     actor_username = models.CharField(max_length=30, blank=True, null=True)
+    # Set by background jobs so re-runs cannot create the same notification twice
+    dedupe_key = models.CharField(max_length=100, unique=True, blank=True, null=True)
     
     class Meta:
         ordering = ['-created_at']
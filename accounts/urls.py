@@ -10,6 +10,7 @@ from .views import (
     UserProfileView,
     NotificationViewSet,
     AccountDeleteView,
+    unread_notifications,
 )
 
 app_name = 'accounts'
@@ -37,6 +38,7 @@ urlpatterns = [
     # Phase 8: Account deletion endpoint
     path('delete-account/', AccountDeleteView.as_view(), name='delete_account'),
     
-    # Phase 7: Notification routes
+    # Phase 7: Notification routes (unread polling is async, ahead of the router)
+    path('notifications/unread/', unread_notifications, name='notification-unread'),
     path('', include(router.urls)),
 ]
@@ -7,6 +7,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Q
 
 from .serializers import (
     UserRegistrationSerializer,
@@ -17,6 +18,7 @@ from .serializers import (
     AccountDeleteSerializer
 )
 from .models import Notification
+from core.async_views import api_response, async_api_view
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -148,7 +150,11 @@ class AccountDeleteView(APIView):
         
         # Import here to avoid circular imports
         from orgs.models import Membership, Organization
-        from projects.models import Task, ProjectRole, AuditLog, TaskComment
+        from projects.models import Project, Task, ProjectRole, AuditLog, TaskComment
+        
+        Project.objects.filter(
+            Q(tasks__assigned_to=user) | Q(tasks__comments__author=user)
+        ).touch()
         
         # Preserve username in assigned tasks
         Task.objects.filter(assigned_to=user).update(
@@ -217,16 +223,6 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user)
     
-    @action(detail=False, methods=['get'])
-    def unread(self, request):
-        """Get only unread notifications."""
-        notifications = self.get_queryset().filter(is_read=False)[:20]
-        serializer = self.get_serializer(notifications, many=True)
-        return Response({
-            'count': self.get_queryset().filter(is_read=False).count(),
-            'results': serializer.data
-        })
-    
     @action(detail=False, methods=['get'])
     def all(self, request):
         """Get all notifications with pagination."""
@@ -382,3 +378,18 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         notification.save()
         
         return Response(self.get_serializer(notification).data)
+
+
+@async_api_view()
+async def unread_notifications(request):
+    """
+    Latest unread notifications and their count. Async, since every open
+    client polls it and it should not hold a worker while the database answers.
+    """
+    unread = Notification.objects.filter(user=request.user, is_read=False)
+    count = await unread.acount()
+    notifications = [notification async for notification in unread[:20]]
+    return api_response({
+        'count': count,
+        'results': NotificationSerializer(notifications, many=True).data
+    })
@@ -0,0 +1,338 @@
+"""
+AI request pipeline behind core.ai_services.AIService.
+A request is a kind ('summarize', 'describe' or 'estimate') and a JSON-able
+payload. Results are cached under a hash of the backend, kind and payload,
+so asking again for the same summary costs neither a provider call nor a
+wait. Misses run on a dedicated pool of AI_MAX_CONCURRENCY threads, up to
+AI_BATCH_SIZE prompts of one kind per provider call, and identical requests
+in flight share one call. Callers wait at most AI_REQUEST_TIMEOUT and then
+get the stub's answer; a call already under way still caches its late result
+for the next caller, but prompts whose callers all gave up while queued are
+dropped unsent. At most AI_MAX_PENDING prompts wait for a thread; beyond
+that, new prompts are answered by the stub at once.
+The 'stub' backend answers deterministically and offline (tests, no key).
+"""
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from core import metrics
+
+try:
+    import openai
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Tasks described in one summary prompt
+SUMMARY_MAX_TASKS = 50
+
+DEFAULT_ESTIMATE = {"hours": 4, "complexity": "medium", "priority": "medium"}
+
+
+class PipelineFull(Exception):
+    """The prompt was refused because AI_MAX_PENDING prompts are already queued."""
+
+
+class AIRequest:
+    """One prompt: a kind and the payload its answer depends on."""
+
+    __slots__ = ('kind', 'payload', 'digest')
+
+    def __init__(self, kind: str, payload: Dict[str, Any]):
+        self.kind = kind
+        self.payload = payload
+        encoded = json.dumps([kind, payload], sort_keys=True, separators=(',', ':'), default=str)
+        self.digest = hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class StubBackend:
+    """Deterministic offline answers computed from the payload alone."""
+    name = 'stub'
+
+    def complete(self, kind: str, payloads: Sequence[Dict]) -> List[Any]:
+        return [getattr(self, kind)(payload) for payload in payloads]
+
+    def summarize(self, payload: Dict) -> str:
+        tasks = payload['tasks']
+        if not tasks:
+            return "No tasks to summarize"
+        completed = sum(1 for t in tasks if t['status'] == 'done')
+        in_progress = sum(1 for t in tasks if t['status'] == 'in_progress')
+        return f"Total: {len(tasks)} tasks | Completed: {completed} | In Progress: {in_progress}"
+
+    def describe(self, payload: Dict) -> str:
+        return ""
+
+    def estimate(self, payload: Dict) -> Dict:
+        return dict(DEFAULT_ESTIMATE)
+
+
+def _task_lines(payload: Dict) -> str:
+    return '\n'.join(
+        f"- {t['title']}: {t['description']}" for t in payload['tasks'][:SUMMARY_MAX_TASKS]
+    )
+
+
+class OpenAIBackend:
+    """
+    Chat completions with a request timeout. A batch of several prompts is
+    sent as one numbered message answered with a JSON array.
+    """
+    # kind -> (system prompt, user prompt, max tokens per answer, temperature)
+    PROMPTS = {
+        'summarize': (
+            "You are a project management assistant. Summarize the following tasks concisely.",
+            lambda p: f"Summarize these tasks:\n{_task_lines(p)}",
+            100, 0.7,
+        ),
+        'describe': (
+            "You are a project manager. Generate a brief, actionable task description.",
+            lambda p: f"Generate a description for this task: {p['title']}",
+            150, 0.7,
+        ),
+        'estimate': (
+            'You are a project estimator. Respond in JSON format: '
+            '{"hours": number, "complexity": "low|medium|high", "priority": "low|medium|high"}',
+            lambda p: f"Task: {p['title']}\nDescription: {p['description']}\n\nEstimate:",
+            100, 0.5,
+        ),
+    }
+
+    def __init__(self, api_key: str, model: str, timeout: float):
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.name = f'openai:{model}'
+
+    def _chat(self, system: str, user: str, max_tokens: int, temperature: float) -> str:
+        response = openai.ChatCompletion.create(
+            model=self.model,
+            api_key=self.api_key,
+            messages=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            request_timeout=self.timeout,
+        )
+        return response.choices[0].message.content
+
+    def complete(self, kind: str, payloads: Sequence[Dict]) -> List[Any]:
+        system, prompt, max_tokens, temperature = self.PROMPTS[kind]
+        if len(payloads) == 1:
+            answers = [self._chat(system, prompt(payloads[0]), max_tokens, temperature)]
+        else:
+            numbered = '\n\n'.join(f"[{i}]\n{prompt(p)}" for i, p in enumerate(payloads, 1))
+            content = self._chat(
+                f"{system}\nAnswer each numbered request below. Respond with only a JSON array "
+                f"of {len(payloads)} answers, in order, each formatted as asked.",
+                numbered, max_tokens * len(payloads), temperature
+            )
+            answers = json.loads(content)
+            if not isinstance(answers, list) or len(answers) != len(payloads):
+                raise ValueError(f"expected {len(payloads)} answers, got {content[:200]!r}")
+        if kind == 'estimate':
+            answers = [json.loads(a) if isinstance(a, str) else a for a in answers]
+        return answers
+
+
+class AIPipeline:
+    """Cached, batched, concurrency-limited execution of AI requests."""
+
+    def __init__(self, backend, timeout: float, batch_size: int, max_concurrency: int, cache_timeout: int,
+                 max_pending: int):
+        self.backend = backend
+        self.fallback = StubBackend()
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self.cache_timeout = cache_timeout
+        self.max_pending = max_pending
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='navflow-ai')
+        self._inflight: Dict[str, Future] = {}
+        # Callers still waiting on each in-flight key, and prompts not yet started
+        self._waiters: Dict[str, int] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.backend_calls = 0
+
+    def cache_key(self, request: AIRequest) -> str:
+        return f'ai:{self.backend.name}:{request.digest}'
+
+    def submit_many(self, requests: Sequence[AIRequest]) -> List[Future]:
+        """
+        A future per request: resolved now on a cache hit, failed with
+        PipelineFull if the backlog is full, else resolved by a batched
+        backend call. Callers that stop waiting must call give_up().
+        """
+        keys = [self.cache_key(request) for request in requests]
+        cached = cache.get_many(keys)
+        futures = []
+        batches: Dict[str, List[Tuple[str, AIRequest, Future]]] = {}
+        with self._lock:
+            for key, request in zip(keys, requests):
+                future = self._inflight.get(key)
+                if key in cached:
+                    future = Future()
+                    future.set_result(cached[key])
+                elif future is not None:
+                    self._waiters[key] += 1
+                elif self._pending >= self.max_pending:
+                    future = Future()
+                    future.set_exception(PipelineFull())
+                else:
+                    future = self._inflight[key] = Future()
+                    self._waiters[key] = 1
+                    self._pending += 1
+                    batches.setdefault(request.kind, []).append((key, request, future))
+                metrics.record_cache('ai', key in cached)
+                futures.append(future)
+        for kind, items in batches.items():
+            for start in range(0, len(items), self.batch_size):
+                self.pool.submit(self._run, kind, items[start:start + self.batch_size])
+        return futures
+
+    def give_up(self, requests: Sequence[AIRequest]):
+        """Stop waiting for these requests; queued prompts nobody waits for are not sent."""
+        with self._lock:
+            for request in requests:
+                key = self.cache_key(request)
+                if key in self._waiters:
+                    self._waiters[key] -= 1
+
+    def _run(self, kind: str, items: List[Tuple[str, AIRequest, Future]]):
+        with self._lock:
+            self._pending -= len(items)
+            abandoned = [item for item in items if not self._waiters[item[0]]]
+            for key, _, _ in abandoned:
+                del self._inflight[key], self._waiters[key]
+            items = [item for item in items if self._waiters.get(item[0])]
+            if items:
+                self.backend_calls += 1
+        for _, _, future in abandoned:
+            future.cancel()
+        if abandoned:
+            metrics.record_ai(kind, 'dropped', len(abandoned))
+        if not items:
+            return
+        try:
+            results = self.backend.complete(kind, [request.payload for _, request, _ in items])
+        except Exception as e:
+            logger.warning("AI %s batch of %d failed: %s", kind, len(items), e)
+            metrics.record_ai(kind, 'error', len(items))
+            for key, _, future in items:
+                self._finish(key, future, exception=e)
+            return
+        metrics.record_ai(kind, 'ok', len(items))
+        try:
+            cache.set_many({key: result for (key, _, _), result in zip(items, results)}, self.cache_timeout)
+        except Exception as e:
+            logger.warning("Caching AI %s results failed: %s", kind, e)
+        for (key, _, future), result in zip(items, results):
+            self._finish(key, future, result=result)
+
+    def _finish(self, key: str, future: Future, result=None, exception=None):
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._waiters.pop(key, None)
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def _fallback(self, request: AIRequest, outcome: str):
+        metrics.record_ai(request.kind, outcome)
+        return self.fallback.complete(request.kind, [request.payload])[0]
+
+    def run_many(self, requests: Sequence[AIRequest], timeout: Optional[float] = None) -> List[Any]:
+        """Results in order; requests not answered within the timeout get the stub's answer."""
+        futures = self.submit_many(requests)
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        results = []
+        for request, future in zip(requests, futures):
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                self.give_up([request])
+                results.append(self._fallback(request, 'timeout'))
+            except PipelineFull:
+                results.append(self._fallback(request, 'rejected'))
+            except Exception:
+                results.append(self._fallback(request, 'fallback'))
+        return results
+
+    def run(self, kind: str, payload: Dict, timeout: Optional[float] = None) -> Any:
+        return self.run_many([AIRequest(kind, payload)], timeout)[0]
+
+    async def arun(self, kind: str, payload: Dict, timeout: Optional[float] = None) -> Any:
+        """run() for async callers; waits on the event loop, not a thread."""
+        request = AIRequest(kind, payload)
+        # The cache client may block
+        [future] = await sync_to_async(self.submit_many, thread_sensitive=False)([request])
+        try:
+            # Shielded: a timeout must not cancel a call other callers share
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), self.timeout if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            self.give_up([request])
+            return self._fallback(request, 'timeout')
+        except PipelineFull:
+            return self._fallback(request, 'rejected')
+        except Exception:
+            return self._fallback(request, 'fallback')
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _make_backend():
+    if settings.AI_BACKEND == 'openai':
+        if OPENAI_AVAILABLE and settings.OPENAI_API_KEY:
+            return OpenAIBackend(settings.OPENAI_API_KEY, settings.OPENAI_MODEL, settings.AI_REQUEST_TIMEOUT)
+        logger.warning("AI_BACKEND is 'openai' but the openai package or OPENAI_API_KEY is missing; using the stub")
+    elif settings.AI_BACKEND != 'stub':
+        raise ValueError(f"Unknown AI_BACKEND {settings.AI_BACKEND!r}")
+    return StubBackend()
+
+
+_pipeline: Optional[AIPipeline] = None
+_pipeline_config = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> AIPipeline:
+    """The process-wide pipeline, rebuilt if its settings changed."""
+    global _pipeline, _pipeline_config
+    config = (
+        settings.AI_BACKEND, settings.OPENAI_MODEL, settings.AI_REQUEST_TIMEOUT,
+        settings.AI_BATCH_SIZE, settings.AI_MAX_CONCURRENCY, settings.AI_CACHE_TIMEOUT,
+        settings.AI_MAX_PENDING,
+    )
+    with _pipeline_lock:
+        if _pipeline is None or _pipeline_config != config:
+            if _pipeline is not None:
+                _pipeline.shutdown()
+            else:
+                atexit.register(lambda: _pipeline and _pipeline.shutdown())
+            _pipeline = AIPipeline(
+                _make_backend(),
+                timeout=settings.AI_REQUEST_TIMEOUT,
+                batch_size=settings.AI_BATCH_SIZE,
+                max_concurrency=settings.AI_MAX_CONCURRENCY,
+                cache_timeout=settings.AI_CACHE_TIMEOUT,
+                max_pending=settings.AI_MAX_PENDING,
+            )
+            _pipeline_config = config
+        return _pipeline
@@ -2,130 +2,78 @@
 AI Integration module for smart features.
 Includes task summarization, smart scheduling, and recommendations.
 """
-import os
-import json
 from typing import List, Dict, Optional
-from functools import lru_cache
-from django.core.cache import cache
 from datetime import timedelta
 from django.utils import timezone
 
-# OpenAI integration (or similar AI service)
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+from core.ai_pipeline import AIRequest, get_pipeline
+
+
+def _task_payload(task) -> Dict:
+    return {
+        'title': task.title,
+        'description': task.description[:100] if task.description else '',
+        'status': task.status,
+    }
+
+
+def _estimate_payload(task_title: str, task_description: str = "") -> Dict:
+    return {'title': task_title, 'description': task_description}
 
 
 class AIService:
-    """Service for AI-powered features."""
-    
-    def __init__(self):
-        self.api_key = os.getenv('OPENAI_API_KEY')
-        if OPENAI_AVAILABLE and self.api_key:
-            openai.api_key = self.api_key
+    """
+    Service for AI-powered features.
+    Prompts go through core.ai_pipeline (cached, batched, with a timeout);
+    without a provider the deterministic stub backend answers.
+    """
     
     def summarize_tasks(self, tasks: List, max_length: int = 200) -> str:
         """
         Summarize multiple tasks using AI.
         Returns a concise summary of task list.
         """
-        if not OPENAI_AVAILABLE or not self.api_key:
-            return self._fallback_summarize(tasks)
-        
-        try:
-            task_descriptions = '\n'.join([
-                f"- {t.title}: {t.description[:100] if t.description else ''}"
-                for t in tasks[:10]  # Limit to first 10
-            ])
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a project management assistant. Summarize the following tasks concisely."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Summarize these tasks:\n{task_descriptions}"
-                    }
-                ],
-                max_tokens=100,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
-        
-        except Exception as e:
-            print(f"AI summarization failed: {str(e)}")
-            return self._fallback_summarize(tasks)
+        return get_pipeline().run('summarize', {'tasks': [_task_payload(t) for t in tasks]})
     
     def generate_task_description(self, title: str) -> str:
         """
         Generate a task description based on title using AI.
         """
-        if not OPENAI_AVAILABLE or not self.api_key:
-            return ""
-        
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a project manager. Generate a brief, actionable task description."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Generate a description for this task: {title}"
-                    }
-                ],
-                max_tokens=150,
-                temperature=0.7
-            )
-            
-            return response.choices[0].message.content
-        
-        except Exception as e:
-            print(f"Description generation failed: {str(e)}")
-            return ""
+        return get_pipeline().run('describe', {'title': title})
+    
+    def generate_task_descriptions(self, titles: List[str]) -> List[str]:
+        """generate_task_description() for many titles, batched into few provider calls."""
+        return get_pipeline().run_many([AIRequest('describe', {'title': title}) for title in titles])
     
     def estimate_effort(self, task_title: str, task_description: str = "") -> Dict:
         """
         Estimate task effort (time, complexity, priority) using AI.
         Returns: {hours: int, complexity: str, priority: str}
         """
-        if not OPENAI_AVAILABLE or not self.api_key:
-            return {"hours": 4, "complexity": "medium", "priority": "medium"}
-        
-        try:
-            prompt = f"Task: {task_title}\nDescription: {task_description}\n\nEstimate:"
-            
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a project estimator. 
-                        Respond in JSON format: 
-                        {"hours": number, "complexity": "low|medium|high", "priority": "low|medium|high"}"""
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.5
-            )
-            
-            # Parse JSON response
-            response_text = response.choices[0].message.content
-            estimation = json.loads(response_text)
-            return estimation
-        
-        except Exception as e:
-            print(f"Effort estimation failed: {str(e)}")
-            return {"hours": 4, "complexity": "medium", "priority": "medium"}
+        return get_pipeline().run('estimate', _estimate_payload(task_title, task_description))
+    
+    def estimate_efforts(self, tasks: List) -> List[Dict]:
+        """estimate_effort() for many tasks, batched into few provider calls."""
+        return get_pipeline().run_many([
+            AIRequest('estimate', _estimate_payload(t.title, t.description or '')) for t in tasks
+        ])
+    
+    # Async counterparts for async views: they await the pipeline on the
+    # event loop instead of holding a thread while the provider answers.
+    
+    async def asummarize_tasks(self, tasks, max_length: int = 200) -> str:
+        """summarize_tasks() for async callers; accepts a QuerySet or a list."""
+        if hasattr(tasks, 'aiterator'):
+            tasks = [task async for task in tasks]
+        return await get_pipeline().arun('summarize', {'tasks': [_task_payload(t) for t in tasks]})
+    
+    async def agenerate_task_description(self, title: str) -> str:
+        """generate_task_description() for async callers."""
+        return await get_pipeline().arun('describe', {'title': title})
+    
+    async def aestimate_effort(self, task_title: str, task_description: str = "") -> Dict:
+        """estimate_effort() for async callers."""
+        return await get_pipeline().arun('estimate', _estimate_payload(task_title, task_description))
     
     def recommend_task_priority(self, task) -> str:
         """
@@ -144,38 +92,12 @@ class AIService:
     
     def suggest_task_assignment(self, task) -> Optional[Dict]:
         """
-        Suggest team member to assign task based on:
-        - Workload
-        - Skills/expertise
-        - Past assignment patterns
+        Suggest the organization member with the least open work, weighted
+        by priority and estimated hours (see core.workload).
+        Returns: {user_id, username, current_tasks, load} or None.
         """
-        from projects.models import Task
-        from django.db.models import Count
-        
-        org = task.project.organization
-        members = org.memberships.all()
-        
-        # Count current assigned tasks per member
-        workload = {}
-        for member in members:
-            count = Task.objects.filter(
-                assigned_to=member.user,
-                project__organization=org,
-                status__in=['todo', 'in_progress']
-            ).count()
-            workload[member.user.id] = count
-        
-        # Suggest member with least tasks
-        if workload:
-            suggested_user_id = min(workload, key=workload.get)
-            suggested_member = members.get(user_id=suggested_user_id)
-            return {
-                'user_id': suggested_user_id,
-                'username': suggested_member.user.username,
-                'current_tasks': workload[suggested_user_id]
-            }
-        
-        return None
+        from core.workload import suggest_assignee
+        return suggest_assignee(task.project.organization_id)
     
     def generate_sprint_recommendations(self, organization, sprint_duration_days: int = 14) -> Dict:
         """
@@ -205,17 +127,6 @@ class AIService:
         }
         
         return recommendations
-    
-    def _fallback_summarize(self, tasks) -> str:
-        """Fallback summarization without AI."""
-        if not tasks:
-            return "No tasks to summarize"
-        
-        total = len(tasks)
-        completed = sum(1 for t in tasks if t.status == 'done')
-        in_progress = sum(1 for t in tasks if t.status == 'in_progress')
-        
-        return f"Total: {total} tasks | Completed: {completed} | In Progress: {in_progress}"
 
 
 class SmartNotificationService:
@@ -302,27 +213,15 @@ class WorkflowAutomation:
         """
         Auto-assign task to least busy team member if unassigned.
         """
-        from django.db.models import Count
+        from core.workload import suggest_assignee
         
-        if task.assigned_to:
+        if task.assigned_to_id:
             return False  # Already assigned
         
-        org_members = task.project.organization.memberships.all()
-        
-        # Find member with least tasks
-        member_workload = {}
-        for member in org_members:
-            from projects.models import Task
-            count = Task.objects.filter(
-                assigned_to=member.user,
-                status__in=['todo', 'in_progress']
-            ).count()
-            member_workload[member.id] = (member.user, count)
-        
-        if member_workload:
-            best_member, _ = min(member_workload.values(), key=lambda x: x[1])
-            task.assigned_to = best_member
-            task.save()
-            return True
+        suggestion = suggest_assignee(task.project.organization_id)
+        if suggestion is None:
+            return False
         
-        return False
+        task.assigned_to_id = suggestion['user_id']
+        task.save()
+        return True
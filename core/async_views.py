@@ -0,0 +1,94 @@
+"""
+Async function views for I/O-bound endpoints.
+Under ASGI these run on the event loop and await the database through
+Django's async ORM, so slow queries, polls and file reads do not hold a
+sync worker thread; under WSGI Django runs them to completion per request.
+DRF has no async views, so async_api_view authenticates and throttles with
+the configured DRF classes and answers in DRF's {'detail': ...} shape.
+"""
+from functools import wraps
+from typing import Iterable
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+def api_response(data, status: int = 200, headers=None) -> HttpResponse:
+    """JSON rendered like a DRF Response; `.data` is kept for callers and tests."""
+    response = HttpResponse(
+        JSONRenderer().render(data), status=status, content_type='application/json', headers=headers
+    )
+    response.data = data
+    return response
+
+
+def drf_request(request) -> Request:
+    """The request wrapped with the configured DRF authenticators."""
+    return Request(
+        request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+
+
+def check_throttles(request: Request, view):
+    """Raise Throttled if a configured throttle refuses the request, like APIView."""
+    durations = [
+        throttle.wait() for throttle in (cls() for cls in api_settings.DEFAULT_THROTTLE_CLASSES)
+        if not throttle.allow_request(request, view)
+    ]
+    if durations:
+        raise exceptions.Throttled(max((d for d in durations if d is not None), default=None))
+
+
+def _authenticate_header(request):
+    # Like APIView.get_authenticate_header: the first authenticator decides
+    classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    return classes[0]().authenticate_header(request) if classes else None
+
+
+def _unauthorized(request, detail) -> HttpResponse:
+    # DRF answers 401 when an authenticator names a scheme, else 403
+    header = _authenticate_header(request)
+    if header:
+        return api_response({'detail': detail}, status=401, headers={'WWW-Authenticate': header})
+    return api_response({'detail': detail}, status=403)
+
+
+def async_api_view(methods: Iterable[str] = ('GET',)):
+    """
+    Decorate an async view: allow `methods`, authenticate the caller into
+    request.user (401/403 otherwise), apply the configured throttles (429)
+    and let the view return api_response().
+    """
+    allowed = {method.upper() for method in methods}
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in allowed:
+                return api_response(
+                    {'detail': f'Method "{request.method}" not allowed.'},
+                    status=405, headers={'Allow': ', '.join(sorted(allowed))}
+                )
+            wrapped = drf_request(request)
+            try:
+                # Authenticators and throttles may query the database or cache
+                user = await sync_to_async(lambda: wrapped.user)()
+            except exceptions.AuthenticationFailed as e:
+                return _unauthorized(request, e.detail)
+            if not user or not user.is_authenticated:
+                return _unauthorized(request, exceptions.NotAuthenticated.default_detail)
+            try:
+                await sync_to_async(check_throttles)(wrapped, view)
+            except exceptions.Throttled as e:
+                return api_response(
+                    {'detail': e.detail}, status=e.status_code,
+                    headers={'Retry-After': '%d' % e.wait} if e.wait else None
+                )
+            request.user = user
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
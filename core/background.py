@@ -0,0 +1,279 @@
+"""
+In-process background job runner.
+Stands in for Celery when no broker is configured: tasks keep the same
+@app.task / .delay() interface but run on a bounded thread pool (or a
+process pool for CPU-bound tasks) with retries, metrics and a graceful
+shutdown at interpreter exit. With BACKGROUND_TASK_BACKEND='database',
+.delay() instead stores a durable core.Job (see core.jobqueue).
+"""
+import atexit
+import importlib
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def crontab(**fields) -> Dict[str, Any]:
+    """Stand-in for celery.schedules.crontab; schedules are only recorded."""
+    return fields
+
+
+class Retry(Exception):
+    """Raised by Task.retry() to reschedule the current job."""
+
+    def __init__(self, exc: Optional[BaseException] = None, countdown: Optional[float] = None):
+        super().__init__(str(exc) if exc else 'retry requested')
+        self.exc = exc
+        self.countdown = countdown
+
+
+def _setup_process():
+    import django
+    django.setup()
+
+
+def _run_in_process(module: str, name: str, args: Tuple, kwargs: Dict):
+    # Decorated functions are not picklable by reference, so the child
+    # process looks the task up by name and runs it inline
+    task = getattr(importlib.import_module(module), name)
+    try:
+        return task.run(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+class Executor:
+    """
+    Bounded pool shared by all local tasks.
+    When max_pending jobs are already queued or running, new jobs run in the
+    caller's thread instead of growing the queue without limit.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, process_workers: int = 0):
+        self.max_workers = max_workers
+        self.threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='navflow-task')
+        self.process_workers = process_workers
+        self._processes = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.counters = {
+            'submitted': 0, 'succeeded': 0, 'failed': 0, 'retried': 0,
+            'ran_inline': 0, 'running': 0,
+        }
+
+    @property
+    def processes(self):
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.process_workers or None,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_setup_process
+            )
+        return self._processes
+
+    def _count(self, key: str, delta: int = 1):
+        with self._lock:
+            self.counters[key] += delta
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters, max_workers=self.max_workers)
+
+    def submit(self, task: 'Task', args: Tuple, kwargs: Dict, attempt: int = 0) -> Future:
+        self._count('submitted')
+        if self._closed or not self._slots.acquire(blocking=False):
+            self._count('ran_inline')
+            future = Future()
+            self._execute(task, args, kwargs, attempt, future, release=False)
+            return future
+
+        future = Future()
+        self.threads.submit(self._execute, task, args, kwargs, attempt, future)
+        return future
+
+    def _execute(self, task: 'Task', args, kwargs, attempt: int, future: Future, release: bool = True):
+        self._count('running')
+        try:
+            if task.cpu_bound:
+                result = self.processes.submit(_run_in_process, task.module, task.fn_name, args, kwargs).result()
+            else:
+                result = task.run(*args, **kwargs)
+        except Exception as e:
+            countdown = getattr(e, 'countdown', None)
+            cause = getattr(e, 'exc', None) or e
+            retryable = isinstance(e, Retry) or isinstance(e, task.autoretry_for)
+            if retryable and attempt < task.max_retries and not self._closed:
+                delay = countdown if countdown is not None else task.retry_backoff * (2 ** attempt)
+                self._count('retried')
+                metrics.inc('navflow_background_tasks_total', task=task.name, outcome='retried')
+                logger.warning("Task %s failed (%s), retry %d in %.1fs", task.name, cause, attempt + 1, delay)
+                self._schedule_retry(task, args, kwargs, attempt + 1, delay, future)
+            else:
+                self._count('failed')
+                metrics.inc('navflow_background_tasks_total', task=task.name, outcome='failed')
+                logger.exception("Task %s failed after %d attempts", task.name, attempt + 1)
+                future.set_exception(cause)
+        else:
+            self._count('succeeded')
+            metrics.inc('navflow_background_tasks_total', task=task.name, outcome='succeeded')
+            future.set_result(result)
+        finally:
+            self._count('running', -1)
+            if release:
+                self._slots.release()
+                # Pool threads have their own connections; don't leak them
+                connections.close_all()
+
+    def _schedule_retry(self, task, args, kwargs, attempt, delay, future: Future):
+        def resubmit():
+            retried = self.submit(task, args, kwargs, attempt)
+            retried.add_done_callback(lambda done: _chain(done, future))
+
+        timer = threading.Timer(delay, resubmit)
+        timer.daemon = True
+        timer.start()
+
+    def shutdown(self, timeout: Optional[float] = None):
+        """Stop accepting pooled work and wait for running jobs to finish."""
+        self._closed = True
+        deadline = time.monotonic() + timeout if timeout else None
+        self.threads.shutdown(wait=deadline is None, cancel_futures=False)
+        while deadline and self.metrics()['running'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if self._processes is not None:
+            self._processes.shutdown(wait=True)
+
+
+def _chain(source: Future, target: Future):
+    if source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = Executor(
+                max_workers=settings.BACKGROUND_TASK_WORKERS,
+                max_pending=settings.BACKGROUND_TASK_MAX_PENDING,
+                process_workers=settings.BACKGROUND_TASK_PROCESS_WORKERS,
+            )
+            atexit.register(_executor.shutdown, settings.BACKGROUND_TASK_SHUTDOWN_TIMEOUT)
+        return _executor
+
+
+def get_executor_metrics() -> Optional[Dict[str, int]]:
+    """Executor counters, or None if no local job has run in this process."""
+    return _executor.metrics() if _executor is not None else None
+
+
+class Task:
+    """
+    A function registered with LocalApp.task.
+    Like Celery, failures are retried only via `raise self.retry(...)` or for
+    exceptions listed in autoretry_for, with exponential backoff.
+    """
+
+    def __init__(self, fn: Callable, bind: bool = False, max_retries: Optional[int] = None,
+                 retry_backoff: Optional[float] = None, autoretry_for: Tuple = (),
+                 cpu_bound: bool = False, name: Optional[str] = None):
+        self.fn = fn
+        self.bind = bind
+        self.module = fn.__module__
+        self.fn_name = fn.__name__
+        self.name = name or f"{fn.__module__}.{fn.__name__}"
+        self.max_retries = settings.BACKGROUND_TASK_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_backoff = settings.BACKGROUND_TASK_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+        self.autoretry_for = tuple(autoretry_for)
+        self.cpu_bound = cpu_bound
+        self.__doc__ = fn.__doc__
+
+    def __repr__(self):
+        return f"<local task {self.name}>"
+
+    def run(self, *args, **kwargs):
+        if self.bind:
+            return self.fn(self, *args, **kwargs)
+        return self.fn(*args, **kwargs)
+
+    __call__ = run
+
+    def retry(self, exc: Optional[BaseException] = None, countdown: Optional[float] = None):
+        """Celery-compatible: `raise self.retry(exc=e, countdown=60)`."""
+        return Retry(exc=exc, countdown=countdown)
+
+    def delay(self, *args, **kwargs) -> Future:
+        return self.apply_async(args, kwargs)
+
+    def apply_async(self, args: Optional[Tuple] = None, kwargs: Optional[Dict] = None,
+                    countdown: Optional[float] = None, **options):
+        args, kwargs = tuple(args or ()), dict(kwargs or {})
+        if settings.BACKGROUND_TASKS_ALWAYS_EAGER:
+            future = Future()
+            try:
+                future.set_result(self.run(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        if settings.BACKGROUND_TASK_BACKEND == 'database':
+            from datetime import timedelta
+            from django.utils import timezone
+            from core.jobqueue import enqueue
+            return enqueue(
+                self.name, args, kwargs,
+                queue=options.get('queue', 'default'),
+                priority=options.get('priority', 0),
+                run_at=timezone.now() + timedelta(seconds=countdown) if countdown else None
+            )
+
+        executor = get_executor()
+        if countdown:
+            future = Future()
+            executor._schedule_retry(self, args, kwargs, 0, countdown, future)
+            return future
+        return executor.submit(self, args, kwargs)
+
+
+class LocalApp:
+    """Minimal Celery-compatible application backed by the local executor."""
+
+    def __init__(self, main: str):
+        self.main = main
+        self.conf = SimpleNamespace(beat_schedule={})
+        self.tasks: Dict[str, Task] = {}
+
+    def config_from_object(self, *args, **kwargs):
+        pass
+
+    def autodiscover_tasks(self, *args, **kwargs):
+        pass
+
+    def task(self, *args, **options):
+        """Usable as @app.task or @app.task(bind=True, max_retries=..., cpu_bound=...)."""
+        def register(fn):
+            task = Task(fn, **options)
+            self.tasks[task.name] = task
+            return task
+
+        if len(args) == 1 and callable(args[0]) and not options:
+            return register(args[0])
+        return register
@@ -0,0 +1,223 @@
+"""
+Endpoint benchmarks for the hot API paths.
+Seeds a deterministic dataset, drives each endpoint through the DRF test
+client and records latency percentiles, query count and response size, so
+serializer and viewset changes can be compared against a saved baseline.
+"""
+import json
+import random
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import CustomUser, Notification
+from core import counters
+from core.performance import QueryStats
+from orgs.models import Membership, Organization
+from projects.models import Project, ProjectRole, Task, TaskComment, TaskLabel, TaskSection
+
+
+@dataclass
+class Dataset:
+    """Handles to the seeded rows that scenarios request."""
+    user: CustomUser
+    organization: Organization
+    project: Project
+    tasks: List[int]
+
+
+def seed(users: int = 20, projects: int = 5, tasks_per_project: int = 200,
+         comments_per_task: int = 2, notifications: int = 200, random_seed: int = 1) -> Dataset:
+    """Create one organization of `users` members with projects, tasks, comments and notifications."""
+    rng = random.Random(random_seed)
+    owner = CustomUser.objects.create_user(email='bench-owner@example.com', username='bench_owner', password='bench-pass-123')
+    members = [owner] + CustomUser.objects.bulk_create([
+        CustomUser(email=f'bench{i}@example.com', username=f'bench{i}', first_name='Bench', last_name=str(i))
+        for i in range(1, users)
+    ])
+    org = Organization.objects.create(name='Bench Org')
+    Membership.objects.bulk_create([
+        Membership(user=user, organization=org, role=Membership.OWNER if user == owner else Membership.MEMBER)
+        for user in members
+    ])
+    labels = TaskLabel.objects.bulk_create([
+        TaskLabel(name=name, organization=org) for name in ('Bug', 'Feature', 'Chore', 'Urgent')
+    ])
+
+    project_list = []
+    for p in range(projects):
+        project = Project.objects.create(name=f'Bench Project {p}', organization=org, created_by=owner)
+        project_list.append(project)
+        ProjectRole.objects.bulk_create([
+            ProjectRole(user=user, project=project, role=ProjectRole.OWNER if user == owner else ProjectRole.MEMBER)
+            for user in members
+        ])
+        sections = TaskSection.objects.bulk_create([
+            TaskSection(project=project, name=name, slug=name.lower(), position=i, is_default=True)
+            for i, name in enumerate(('Backlog', 'Sprint', 'Done'))
+        ])
+        statuses = ['todo', 'in_progress', 'review', 'done']
+        tasks = Task.objects.bulk_create([
+            Task(
+                project=project,
+                title=f'Task {p}-{i}',
+                description='Benchmark task ' * 5,
+                status=rng.choice(statuses),
+                priority=rng.choice(['low', 'medium', 'high']),
+                section=rng.choice(sections),
+                assigned_to=rng.choice(members),
+                created_by=owner,
+                position=i,
+                due_date=timezone.now() + timedelta(days=rng.randint(-10, 30)),
+            )
+            for i in range(tasks_per_project)
+        ], batch_size=1000)
+        counters.add_tasks(tasks)
+        through = Task.labels.through
+        through.objects.bulk_create([
+            through(task_id=task.id, tasklabel_id=label.id)
+            for task in tasks for label in rng.sample(labels, 2)
+        ], batch_size=1000)
+        TaskComment.objects.bulk_create([
+            TaskComment(task=task, author=rng.choice(members), content='Looks good', author_username='bench')
+            for task in tasks for _ in range(comments_per_task)
+        ], batch_size=1000)
+
+    Notification.objects.bulk_create([
+        Notification(user=owner, type='task_assigned', title='Task Assigned', message='Benchmark', is_read=i % 3 == 0)
+        for i in range(notifications)
+    ], batch_size=1000)
+
+    project = project_list[0]
+    task_ids = list(project.tasks.order_by('position').values_list('id', flat=True))
+    return Dataset(user=owner, organization=org, project=project, tasks=task_ids)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[Dataset], str]
+    data: Optional[Callable[[Dataset, int], Dict[str, Any]]] = None
+
+
+SCENARIOS = [
+    Scenario('task_list', 'get', lambda d: '/api/v1/tasks/'),
+    Scenario('project_detail', 'get', lambda d: f'/api/v1/projects/{d.project.id}/'),
+    Scenario('board', 'get', lambda d: f'/api/v1/tasks/?project_id={d.project.id}&page_size=100'),
+    Scenario('reorder', 'post', lambda d: '/api/v1/tasks/reorder/', lambda d, i: {
+        'tasks': [
+            {'id': task_id, 'position': (position + i) % 20, 'status': 'in_progress' if i % 2 else 'todo'}
+            for position, task_id in enumerate(d.tasks[:20])
+        ]
+    }),
+    Scenario('org_details', 'get', lambda d: f'/api/v1/orgs/{d.organization.id}/details/'),
+    Scenario('notifications_unread', 'get', lambda d: '/api/v1/accounts/notifications/unread/'),
+    Scenario('comment_create', 'post', lambda d: '/api/v1/comments/', lambda d, i: {
+        'task': d.tasks[i % len(d.tasks)], 'content': f'Benchmark comment {i} @bench1'
+    }),
+]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_scenario(client: APIClient, dataset: Dataset, scenario: Scenario, iterations: int, warmup: int) -> Dict[str, Any]:
+    """Time one endpoint; queries and size are taken from the last request."""
+    path = scenario.path(dataset)
+    timings = []
+    for i in range(warmup + iterations):
+        kwargs = {'format': 'json'}
+        if scenario.data:
+            kwargs['data'] = scenario.data(dataset, i)
+        queries = QueryStats()
+        with connection.execute_wrapper(queries):
+            started = time.perf_counter()
+            response = getattr(client, scenario.method)(path, **kwargs)
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            raise RuntimeError(f"{scenario.name}: {scenario.method.upper()} {path} returned {response.status_code}")
+        if i >= warmup:
+            timings.append(elapsed)
+    return {
+        'p50_ms': round(_percentile(timings, 50), 2),
+        'p95_ms': round(_percentile(timings, 95), 2),
+        'queries': queries.count,
+        'bytes': len(response.content),
+    }
+
+
+def run_benchmarks(dataset: Dataset, iterations: int = 20, warmup: int = 3,
+                   only: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    client = APIClient()
+    client.force_authenticate(dataset.user)
+    return {
+        scenario.name: run_scenario(client, dataset, scenario, iterations, warmup)
+        for scenario in SCENARIOS
+        if not only or scenario.name in only
+    }
+
+
+def compare_list_rendering(dataset: Dataset, rows: int = 100, iterations: int = 20) -> Dict[str, float]:
+    """
+    CPU microseconds per row to load and render one task list page with
+    TaskSerializer and with TaskProjection (core.projections), both reading
+    a warm label catalog.
+    """
+    from core.projections import TaskProjection
+    from projects.serializers import TaskSerializer
+
+    queryset = Task.objects.filter(project=dataset.project).with_list_stats(dataset.user).order_by('-created_at')
+    projection = TaskProjection()
+    renderers = {
+        'serializer': lambda: TaskSerializer(list(queryset[:rows]), many=True).data,
+        'projection': lambda: projection.render(projection.queryset(queryset)[:rows]),
+    }
+    result = {}
+    for name, render in renderers.items():
+        render()
+        started = time.process_time()
+        for _ in range(iterations):
+            count = len(render())
+        result[f'{name}_us_per_row'] = round((time.process_time() - started) / iterations / count * 1e6, 1)
+    result['speedup'] = round(result['serializer_us_per_row'] / result['projection_us_per_row'], 2)
+    return result
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], latency_tolerance: float = 0.25,
+            query_tolerance: int = 0, size_tolerance: float = 0.10) -> List[str]:
+    """
+    Regressions against a baseline. Latency and size may grow by the given
+    fraction; query counts by query_tolerance queries.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result['queries'] > base['queries'] + query_tolerance:
+            regressions.append(f"{name}: {result['queries']} queries (baseline {base['queries']})")
+        if result['p95_ms'] > base['p95_ms'] * (1 + latency_tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']}ms (baseline {base['p95_ms']}ms)")
+        if result['bytes'] > base['bytes'] * (1 + size_tolerance):
+            regressions.append(f"{name}: {result['bytes']} bytes (baseline {base['bytes']})")
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, Dict]:
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path: str, results: Dict[str, Dict], config: Dict[str, Any]):
+    with open(path, 'w') as f:
+        json.dump({'config': config, 'results': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
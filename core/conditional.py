@@ -0,0 +1,80 @@
+"""
+Conditional GET for project-scoped reads.
+A weak ETag is derived from the caller, the request URL and the versions of
+the projects a response is built from (Project.version, bumped by
+projects.signals). Matching If-None-Match or If-Modified-Since requests get
+a 304 after a single query, before any serializer or renderer runs.
+Last-Modified is only sent when the URL pins the set of projects: the newest
+change over a set that can lose members may move backwards, which would let
+If-Modified-Since wrongly match. Other reads rely on the ETag alone.
+"""
+import hashlib
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import QuerySet
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def project_validators(request, projects: QuerySet, pinned: bool = False) -> Tuple[str, Optional[int], List]:
+    """
+    (weak ETag, Last-Modified timestamp, version rows) for the given projects.
+    The timestamp is None unless pinned, i.e. the project set cannot change.
+    """
+    rows = list(projects.order_by('id').values_list('id', 'version', 'content_updated_at'))
+    fingerprint = '|'.join([
+        str(request.user.pk),
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT', ''),
+        ','.join(f'{pk}:{version}' for pk, version, _ in rows),
+    ])
+    etag = f'W/"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+    last_modified = max((changed for _, _, changed in rows), default=None) if pinned else None
+    # HTTP dates have one-second resolution
+    return etag, int(last_modified.timestamp()) if last_modified else None, rows
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding ETag/Last-Modified validators to list and retrieve.
+    Subclasses implement conditional_projects() returning every project the
+    response is built from, and may widen conditional_pinned().
+    """
+
+    def conditional_projects(self, request, pk=None) -> QuerySet:
+        raise NotImplementedError
+
+    def conditional_pinned(self, request, pk=None) -> bool:
+        """Whether the URL fixes which projects the response is built from."""
+        return pk is not None
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+    def _conditional(self, handler, request, *args, **kwargs):
+        pk = kwargs.get('pk')
+        if not settings.CONDITIONAL_GET_ENABLED or (pk is not None and not str(pk).isdigit()):
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified, rows = project_validators(
+            request, self.conditional_projects(request, pk), pinned=self.conditional_pinned(request, pk)
+        )
+        if pk is not None and not rows:
+            # Missing or inaccessible: let the view answer 404
+            return handler(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        # Browsers may keep a copy but must revalidate it; shared caches may not
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,153 @@
+"""
+Denormalized active-task counters.
+Project.active_task_count, the per-status Project.<status>_task_count columns
+and TaskSection.active_task_count count tasks that are not soft-deleted.
+Instance saves and deletes are handled by projects.signals; bulk paths that
+bypass signals wrap their writes in tracking() or call add_tasks(). Every
+change is an F() increment, and both instance writes (stored_key()) and
+tracking() read the stored rows under row locks, so concurrent writers of
+one task neither lose updates nor apply the same move twice.
+reconcile() (manage.py reconcile_task_counters) recomputes them from rows.
+"""
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from projects.models import Project, Task, TaskSection, TaskStatus
+
+# (project_id, section_id, status) of an active task
+Key = Tuple[int, Optional[int], str]
+
+RECONCILE_BATCH = 1000
+
+
+def status_field(status: str) -> Optional[str]:
+    """Project column counting active tasks in `status`, if it is a known status."""
+    return f'{status}_task_count' if status in TaskStatus.values else None
+
+
+def apply(deltas: Counter):
+    """Apply {key: delta} with one UPDATE per project and per distinct section delta."""
+    projects: Dict[int, Counter] = defaultdict(Counter)
+    sections = Counter()
+    for (project_id, section_id, status), delta in deltas.items():
+        if not delta:
+            continue
+        projects[project_id]['active_task_count'] += delta
+        field = status_field(status)
+        if field:
+            projects[project_id][field] += delta
+        if section_id:
+            sections[section_id] += delta
+
+    # Fixed lock order across concurrent writers
+    for project_id in sorted(projects):
+        fields = {name: F(name) + delta for name, delta in projects[project_id].items() if delta}
+        if fields:
+            Project.objects.filter(pk=project_id).update(**fields)
+    by_delta = defaultdict(list)
+    for section_id, delta in sections.items():
+        if delta:
+            by_delta[delta].append(section_id)
+    for delta, section_ids in sorted(by_delta.items()):
+        TaskSection.objects.filter(pk__in=sorted(section_ids)).update(
+            active_task_count=F('active_task_count') + delta
+        )
+
+
+def stored_key(task_id) -> Optional[Key]:
+    """
+    Key of the task as stored, with its row locked until the transaction
+    ends, so concurrent writers of one task each move from what the previous
+    one committed instead of all moving from the state they loaded.
+    """
+    row = Task.objects.select_for_update().filter(pk=task_id).values_list(
+        'project_id', 'section_id', 'status', 'deleted_at'
+    ).first()
+    return row[:3] if row and row[3] is None else None
+
+
+def move(old: Optional[Key], new: Optional[Key]):
+    """One task changed from `old` to `new` (None: not counted)."""
+    if old == new:
+        return
+    deltas = Counter()
+    if old:
+        deltas[old] -= 1
+    if new:
+        deltas[new] += 1
+    apply(deltas)
+
+
+def add_tasks(tasks: Iterable[Task], sign: int = 1):
+    """Count tasks written without signals (bulk_create); sign=-1 uncounts them."""
+    deltas = Counter()
+    for task in tasks:
+        key = task.counter_key()
+        if key:
+            deltas[key] += sign
+    apply(deltas)
+
+
+def grouped(task_ids) -> Counter:
+    """Active task counts by key for the given ids."""
+    rows = Task.objects.filter(id__in=task_ids, deleted_at__isnull=True).order_by().values_list(
+        'project_id', 'section_id', 'status'
+    ).annotate(n=Count('id'))
+    return Counter({(project_id, section_id, status): n for project_id, section_id, status, n in rows})
+
+
+@contextmanager
+def tracking(task_ids):
+    """
+    Adjust counters by how a bulk .update() of these tasks moved them. The
+    rows are locked first (in id order, like apply()), so a concurrent
+    instance save cannot commit its own move between the before and after
+    counts and have it counted again here.
+    """
+    task_ids = list(task_ids)
+    with transaction.atomic():
+        list(Task.objects.select_for_update().filter(id__in=task_ids).order_by('id').values_list('id', flat=True))
+        before = grouped(task_ids)
+        yield
+        deltas = grouped(task_ids)
+        deltas.subtract(before)
+        apply(deltas)
+
+
+def _active_count(field: str, **filters):
+    count = Task.objects.filter(
+        **{field: OuterRef('pk')}, deleted_at__isnull=True, **filters
+    ).order_by().values(field).annotate(c=Count('pk')).values('c')
+    return Coalesce(Subquery(count), 0)
+
+
+def reconcile(project_ids=None) -> Dict[str, int]:
+    """
+    Recompute counters of the given projects (default: all) and their
+    sections from task rows. Returns how many rows were out of date.
+    """
+    projects = Project.objects.all()
+    sections = TaskSection.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(id__in=project_ids)
+        sections = sections.filter(project_id__in=project_ids)
+
+    project_counts = {'active_task_count': _active_count('project')}
+    for status in TaskStatus.values:
+        project_counts[status_field(status)] = _active_count('project', status=status)
+    section_counts = {'active_task_count': _active_count('section')}
+
+    fixed = {}
+    for name, queryset, counts in (('projects', projects, project_counts), ('sections', sections, section_counts)):
+        expected = {f'expected_{field}': value for field, value in counts.items()}
+        in_sync = Q(*[Q(**{field: F(f'expected_{field}')}) for field in counts])
+        stale = list(queryset.annotate(**expected).exclude(in_sync).values_list('pk', flat=True))
+        for start in range(0, len(stale), RECONCILE_BATCH):
+            queryset.model.objects.filter(pk__in=stale[start:start + RECONCILE_BATCH]).update(**counts)
+        fixed[name] = len(stale)
+    return fixed
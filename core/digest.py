@@ -0,0 +1,120 @@
+"""
+Daily task digest emails.
+Pending tasks for every recipient come from one query ordered by assignee,
+streamed and grouped in Python, and mail goes out in chunks over reused
+SMTP connections (optionally from several sender threads).
+"""
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from core.utils import chunked
+from projects.models import Task, TaskStatus
+
+CHUNK_SIZE = 500
+MAX_TASKS_PER_DIGEST = 25
+
+
+def iter_digests(days_ahead: int = 1, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Yield one digest per recipient: {'email', 'tasks': [(title, due_date, project), ...], 'total'}.
+    Only active users with email notifications on and unfinished tasks due
+    within days_ahead (including overdue ones) are included.
+    """
+    rows = Task.objects.filter(
+        deleted_at__isnull=True,
+        due_date__lte=timezone.now() + timedelta(days=days_ahead),
+        assigned_to__notification_email=True,
+        assigned_to__is_deleted=False,
+        assigned_to__is_active=True,
+    ).exclude(
+        status=TaskStatus.DONE
+    ).order_by('assigned_to_id', 'due_date', 'id').values_list(
+        'assigned_to_id', 'assigned_to__email', 'title', 'due_date', 'project__name'
+    )
+
+    for _, user_rows in groupby(rows.iterator(chunk_size=chunk_size), key=itemgetter(0)):
+        tasks = []
+        total = 0
+        email = None
+        for _, email, title, due_date, project_name in user_rows:
+            total += 1
+            if total <= MAX_TASKS_PER_DIGEST:
+                tasks.append((title, due_date, project_name))
+        yield {'email': email, 'tasks': tasks, 'total': total}
+
+
+def build_message(digest: Dict, today) -> EmailMessage:
+    lines = [
+        f"- {title} [{project}] (Due: {timezone.localtime(due_date):%b %d %H:%M})"
+        for title, due_date, project in digest['tasks']
+    ]
+    if digest['total'] > len(digest['tasks']):
+        lines.append(f"...and {digest['total'] - len(digest['tasks'])} more")
+    return EmailMessage(
+        subject=f"Your Daily Task Digest - {today:%B %d}",
+        body=f"You have {digest['total']} tasks due today:\n\n" + '\n'.join(lines),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[digest['email']],
+    )
+
+
+def _iter_message_chunks(days_ahead: int, chunk_size: int, stats: Dict) -> Iterator[List[EmailMessage]]:
+    today = timezone.localdate()
+    for digests in chunked(iter_digests(days_ahead, chunk_size), chunk_size):
+        stats['users'] += len(digests)
+        yield [build_message(digest, today) for digest in digests if digest['email']]
+
+
+def send_daily_digest(days_ahead: int = 1, workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    Send the daily digest to every user with pending tasks.
+    With workers > 1 (default DIGEST_SENDER_THREADS), chunks are sent from a
+    thread pool; each thread keeps its own open connection.
+    Returns {'users': recipients, 'sent': messages accepted by the backend}.
+    """
+    workers = workers or settings.DIGEST_SENDER_THREADS
+    stats = {'users': 0, 'sent': 0}
+    chunks = _iter_message_chunks(days_ahead, chunk_size, stats)
+
+    if workers <= 1:
+        with get_connection(fail_silently=True) as connection:
+            for messages in chunks:
+                stats['sent'] += connection.send_messages(messages) or 0
+        return stats
+
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+
+    def send(messages):
+        connection = getattr(local, 'connection', None)
+        if connection is None:
+            connection = local.connection = get_connection(fail_silently=True)
+            connection.open()
+            with lock:
+                connections.append(connection)
+        return connection.send_messages(messages) or 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='digest') as pool:
+            pending = set()
+            for messages in chunks:
+                # Bound in-flight chunks so rendering never races far ahead of sending
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    stats['sent'] += sum(future.result() for future in done)
+                pending.add(pool.submit(send, messages))
+            stats['sent'] += sum(future.result() for future in pending)
+    finally:
+        for connection in connections:
+            connection.close()
+
+    return stats
@@ -0,0 +1,205 @@
+"""
+Streaming task export to CSV or JSONL.
+Rows are read with values() and a server-side iterator so memory stays flat.
+Small projects stream straight into the response; large ones are written to
+a gzipped file by a background job that records its progress.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.text import slugify
+
+from core.imports import SUPPORTED_FORMATS
+from core.utils import chunked
+from projects.models import Task, TaskExport
+
+CHUNK_SIZE = 2000
+
+# Column name -> values() path. Names match the import format so an export
+# can be imported into another project unchanged.
+COLUMNS = [
+    ('id', 'id'),
+    ('title', 'title'),
+    ('description', 'description'),
+    ('status', 'status'),
+    ('priority', 'priority'),
+    ('assignee', 'assigned_to__username'),
+    ('section', 'section__slug'),
+    ('due_date', 'due_date'),
+    ('estimated_hours', 'estimated_hours'),
+    ('time_spent_minutes', 'time_spent_minutes'),
+    ('created_by', 'created_by__username'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+    ('completed_at', 'completed_at'),
+]
+HEADER = [name for name, _ in COLUMNS] + ['labels']
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+def count_rows(project_id: int) -> int:
+    return Task.objects.filter(project_id=project_id, deleted_at__isnull=True).count()
+
+
+def iter_task_batches(project_id: int, chunk_size: int = CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield active tasks of a project as lists of plain dicts, in id order.
+    Labels are resolved with one query per batch.
+    """
+    rows = Task.objects.filter(
+        project_id=project_id,
+        deleted_at__isnull=True
+    ).order_by('id').values_list(*[path for _, path in COLUMNS])
+
+    through = Task.labels.through
+    for batch in chunked(rows.iterator(chunk_size=chunk_size), chunk_size):
+        labels = defaultdict(list)
+        for task_id, name in through.objects.filter(
+            task_id__in=[row[0] for row in batch]
+        ).order_by('tasklabel__name').values_list('task_id', 'tasklabel__name'):
+            labels[task_id].append(name)
+
+        records = []
+        for row in batch:
+            record = dict(zip(HEADER, row))
+            record['labels'] = labels.get(row[0], [])
+            records.append(record)
+        yield records
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ', '.join(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def render_header(format_type: str) -> str:
+    if format_type != 'csv':
+        return ''
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(HEADER)
+    return buffer.getvalue()
+
+
+def render_batch(records: List[Dict[str, Any]], format_type: str) -> str:
+    """Serialize a batch of records into one string chunk."""
+    if format_type == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [_csv_value(record[name]) for name in HEADER] for record in records
+        )
+        return buffer.getvalue()
+    if format_type == 'jsonl':
+        return ''.join(json.dumps(record, cls=DjangoJSONEncoder) + '\n' for record in records)
+    raise ValueError(f"Unsupported format: {format_type}")
+
+
+def iter_export(project_id: int, format_type: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Lazily yield the whole export, one chunk of rows at a time."""
+    if format_type not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format: {format_type}")
+    header = render_header(format_type)
+    if header:
+        yield header
+    for records in iter_task_batches(project_id, chunk_size):
+        yield render_batch(records, format_type)
+
+
+def export_filename(project, format_type: str) -> str:
+    return f"{slugify(project.name) or 'project'}-tasks-{timezone.now():%Y%m%d-%H%M%S}.{format_type}"
+
+
+def stream_response(project, format_type: str) -> StreamingHttpResponse:
+    """Stream a project's tasks as an attachment."""
+    response = StreamingHttpResponse(
+        iter_export(project.id, format_type),
+        content_type=CONTENT_TYPES[format_type]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(project, format_type)}"'
+    return response
+
+
+def run_export(export: TaskExport, chunk_size: int = CHUNK_SIZE) -> TaskExport:
+    """
+    Write an export job to EXPORTS_ROOT as a gzipped file.
+    Progress is saved after every chunk; failures are recorded on the job.
+    """
+    exports = TaskExport.objects.filter(id=export.id)
+    total_rows = count_rows(export.project_id)
+    exports.update(status=TaskExport.STATUS_RUNNING, started_at=timezone.now(), total_rows=total_rows)
+
+    os.makedirs(settings.EXPORTS_ROOT, exist_ok=True)
+    path = os.path.join(settings.EXPORTS_ROOT, f"project-{export.project_id}-export-{export.id}.{export.format}.gz")
+    partial_path = f"{path}.part"
+
+    try:
+        written = 0
+        with gzip.open(partial_path, 'wt', encoding='utf-8', newline='') as output:
+            output.write(render_header(export.format))
+            for records in iter_task_batches(export.project_id, chunk_size):
+                output.write(render_batch(records, export.format))
+                written += len(records)
+                exports.update(rows_written=written)
+        os.replace(partial_path, path)
+    except Exception as e:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        exports.update(status=TaskExport.STATUS_FAILED, error=str(e), finished_at=timezone.now())
+    else:
+        exports.update(
+            status=TaskExport.STATUS_COMPLETED,
+            rows_written=written,
+            file_path=path,
+            file_size=os.path.getsize(path),
+            finished_at=timezone.now()
+        )
+
+    export.refresh_from_db()
+    return export
+
+
+def notify_export_ready(export: TaskExport):
+    """Email the requester once a background export has finished."""
+    user = export.requested_by
+    if not user or not user.email:
+        return
+    if export.status == TaskExport.STATUS_COMPLETED:
+        subject = f"Your task export for {export.project.name} is ready"
+        message = (
+            f"{export.rows_written} tasks were exported.\n\n"
+            f"Download: /api/v1/tasks/exports/{export.id}/download/"
+        )
+    else:
+        subject = f"Your task export for {export.project.name} failed"
+        message = export.error or 'The export could not be completed.'
+    send_mail(
+        subject=subject,
+        message=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[user.email],
+        fail_silently=True,
+    )
+
+
+def enqueue_export(export_id: int):
+    """Run an export job off the request thread via the background task runner."""
+    from core.tasks import bulk_export_tasks
+    bulk_export_tasks.delay(export_id=export_id)
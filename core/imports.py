@@ -0,0 +1,301 @@
+"""
+Streaming task import from CSV or JSONL.
+Rows are parsed lazily, validated and inserted in chunks so large backlogs
+import quickly without loading the whole file or holding one long transaction.
+"""
+import csv
+import io
+import json
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core import counters
+from core.performance import BulkOperationHelper
+from core.utils import chunked
+from projects.models import AuditLog, Project, ProjectRole, Task, TaskLabel, TaskStatus
+
+SUPPORTED_FORMATS = ('csv', 'jsonl')
+
+PRIORITIES = {choice for choice, _ in Task._meta.get_field('priority').choices}
+STATUSES = set(TaskStatus.values)
+
+
+def detect_format(filename: str, default: str = 'csv') -> str:
+    """Guess the import format from a file name."""
+    name = (filename or '').lower()
+    if name.endswith('.jsonl') or name.endswith('.ndjson'):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_rows(stream, format_type: str) -> Iterator[Any]:
+    """
+    Lazily yield raw rows from a text or binary stream.
+    Malformed JSONL lines are yielded as ValueError instances so they can be
+    reported per row instead of aborting the import.
+    """
+    if not isinstance(stream, io.TextIOBase):
+        # Binary files, including Django uploads (whose .file is the raw handle)
+        stream = io.TextIOWrapper(getattr(stream, 'file', stream), encoding='utf-8-sig', newline='')
+
+    if format_type == 'csv':
+        yield from csv.DictReader(stream)
+    elif format_type == 'jsonl':
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ValueError(f"Invalid JSON: {e}")
+    else:
+        raise ValueError(f"Unsupported format: {format_type}")
+
+
+def _text(row: Dict[str, Any], key: str) -> str:
+    value = row.get(key)
+    return str(value).strip() if value is not None else ''
+
+
+class TaskImporter:
+    """
+    Import tasks into a project.
+
+    Each row may contain: title (required), description, status, priority,
+    assignee (username), section (slug or name), labels (comma-separated in
+    CSV, a list in JSONL), due_date (ISO date/datetime) and estimated_hours.
+
+    Usage:
+        result = TaskImporter(project, user).run(uploaded_file, 'csv')
+    """
+    CHUNK_SIZE = 1000
+    MAX_REPORTED_ERRORS = 500
+
+    def __init__(self, project, user, chunk_size: Optional[int] = None):
+        self.project = project
+        self.user = user
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+
+        # Sections and labels are small per project: resolve them once
+        self.sections = {}
+        for section in project.sections.all():
+            self.sections[section.slug.lower()] = section.id
+            self.sections.setdefault(section.name.lower(), section.id)
+
+        self.labels = {}
+        labels = TaskLabel.objects.filter(
+            models.Q(is_default=True) |
+            models.Q(organization_id=project.organization_id) |
+            models.Q(project=project)
+        ).values_list('id', 'name', 'project_id', 'organization_id')
+        # Project labels shadow org-wide ones, which shadow the defaults
+        for label_id, name, project_id, org_id in sorted(
+            labels, key=lambda row: (row[2] is None, row[3] is None, row[0])
+        ):
+            self.labels.setdefault(name.lower(), label_id)
+
+        self.next_position = (
+            Task.objects.filter(project=project).aggregate(max_pos=models.Max('position'))['max_pos'] or 0
+        ) + 1
+
+    def run(self, stream, format_type: str) -> Dict[str, Any]:
+        """Import all rows and return counts plus per-row errors."""
+        result = {'rows': 0, 'created': 0, 'failed': 0, 'errors': []}
+        rows = self._readable_rows(iter_rows(stream, format_type), result)
+
+        for chunk_index, chunk in enumerate(chunked(rows, self.chunk_size)):
+            first_row = chunk_index * self.chunk_size + 1
+            created, errors = self._import_chunk(chunk, first_row)
+            result['rows'] += len(chunk)
+            result['created'] += created
+            result['failed'] += len(errors)
+            remaining = self.MAX_REPORTED_ERRORS - len(result['errors'])
+            if remaining > 0:
+                result['errors'].extend(errors[:remaining])
+
+        if result['created']:
+            AuditLog.objects.create(
+                organization_id=self.project.organization_id,
+                project=self.project,
+                user=self.user,
+                action=AuditLog.ACTION_CREATE,
+                target_type='task_import',
+                target_id=self.project.id,
+                target_name=self.project.name,
+                details={
+                    'format': format_type,
+                    'rows': result['rows'],
+                    'created': result['created'],
+                    'failed': result['failed'],
+                }
+            )
+
+        return result
+
+    @staticmethod
+    def _readable_rows(rows: Iterator[Any], result: Dict[str, Any]) -> Iterator[Any]:
+        """
+        Yield rows until the file cannot be decoded or parsed, then record
+        that as the import's error; rows read before it are still imported.
+        """
+        read = 0
+        try:
+            for row in rows:
+                read += 1
+                yield row
+        except (UnicodeDecodeError, csv.Error) as e:
+            result['detail'] = f"Could not read the file after row {read}: {e}"
+            result['failed'] += 1
+            result['errors'].append({'row': read + 1, 'errors': [result['detail']]})
+
+    def _import_chunk(self, chunk: List[Any], first_row: int):
+        """Validate a chunk with batched lookups and insert it in one short transaction."""
+        errors = []
+        usernames = {
+            _text(row, 'assignee')
+            for row in chunk
+            if isinstance(row, dict) and _text(row, 'assignee')
+        }
+        assignees = dict(
+            ProjectRole.objects.filter(
+                project=self.project,
+                user__username__in=usernames
+            ).values_list('user__username', 'user_id')
+        ) if usernames else {}
+
+        tasks = []
+        task_labels = []
+        for offset, row in enumerate(chunk):
+            row_number = first_row + offset
+            task, label_ids, row_errors = self._build_task(row, assignees)
+            if row_errors:
+                errors.append({'row': row_number, 'errors': row_errors})
+                continue
+            tasks.append(task)
+            task_labels.append(label_ids)
+
+        if not tasks:
+            return 0, errors
+
+        with transaction.atomic():
+            created = BulkOperationHelper.bulk_create_optimized(Task, tasks, batch_size=self.chunk_size)
+            through = Task.labels.through
+            links = [
+                through(task_id=task.id, tasklabel_id=label_id)
+                for task, label_ids in zip(created, task_labels)
+                for label_id in label_ids
+            ]
+            if links:
+                BulkOperationHelper.bulk_create_optimized(through, links, batch_size=self.chunk_size)
+            # bulk_create sends no signals
+            counters.add_tasks(created)
+            Project.objects.filter(id=self.project.id).touch()
+
+        return len(created), errors
+
+    def _build_task(self, row, assignees):
+        """Turn one raw row into an unsaved Task plus label ids, or a list of errors."""
+        if isinstance(row, ValueError):
+            return None, [], [str(row)]
+        if not isinstance(row, dict):
+            return None, [], ['Row must be an object']
+
+        errors = []
+        title = _text(row, 'title')
+        if not title:
+            errors.append('title is required')
+        elif len(title) > 255:
+            errors.append('title must be at most 255 characters')
+
+        status = _text(row, 'status') or TaskStatus.TODO
+        if status not in STATUSES:
+            errors.append(f"invalid status '{status}'")
+
+        priority = _text(row, 'priority') or 'medium'
+        if priority not in PRIORITIES:
+            errors.append(f"invalid priority '{priority}'")
+
+        assigned_to_id = None
+        username = _text(row, 'assignee')
+        if username:
+            assigned_to_id = assignees.get(username)
+            if assigned_to_id is None:
+                errors.append(f"assignee '{username}' is not a project member")
+
+        section_id = None
+        section = _text(row, 'section')
+        if section:
+            section_id = self.sections.get(section.lower())
+            if section_id is None:
+                errors.append(f"unknown section '{section}'")
+
+        label_ids = []
+        labels = row.get('labels') or []
+        if isinstance(labels, str):
+            labels = labels.replace(';', ',').split(',')
+        elif not isinstance(labels, list):
+            errors.append('labels must be a list or comma-separated string')
+            labels = []
+        for name in labels:
+            name = str(name).strip()
+            if not name:
+                continue
+            label_id = self.labels.get(name.lower())
+            if label_id is None:
+                errors.append(f"unknown label '{name}'")
+            elif label_id not in label_ids:
+                label_ids.append(label_id)
+
+        due_date = None
+        raw_due = _text(row, 'due_date')
+        if raw_due:
+            try:
+                due_date = parse_datetime(raw_due)
+                if due_date is None:
+                    day = parse_date(raw_due)
+                    due_date = datetime.combine(day, time.min) if day else None
+            except ValueError:
+                # Well formed but impossible, e.g. 2024-02-30
+                due_date = None
+            if due_date is None:
+                errors.append(f"invalid due_date '{raw_due}'")
+            elif timezone.is_naive(due_date):
+                due_date = timezone.make_aware(due_date)
+
+        estimated_hours = None
+        raw_hours = _text(row, 'estimated_hours')
+        if raw_hours:
+            try:
+                estimated_hours = Decimal(raw_hours).quantize(Decimal('0.01'))
+                if estimated_hours < 0 or estimated_hours >= 10000:
+                    raise InvalidOperation()
+            except InvalidOperation:
+                errors.append(f"invalid estimated_hours '{raw_hours}'")
+
+        if errors:
+            return None, [], errors
+
+        task = Task(
+            project=self.project,
+            title=title,
+            description=row.get('description') or '',
+            status=status,
+            priority=priority,
+            assigned_to_id=assigned_to_id,
+            section_id=section_id,
+            due_date=due_date,
+            estimated_hours=estimated_hours,
+            created_by=self.user,
+            completed_at=timezone.now() if status == TaskStatus.DONE else None,
+            position=self.next_position,
+        )
+        self.next_position += 1
+        return task, label_ids, []
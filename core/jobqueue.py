@@ -0,0 +1,325 @@
+"""
+Durable database-backed job queue.
+Jobs live in core.Job; workers (`manage.py run_jobs`) claim ready jobs with
+SELECT ... FOR UPDATE SKIP LOCKED on PostgreSQL. Claims are also guarded by a
+conditional UPDATE, so SQLite (which ignores row locks) stays correct for
+local development and tests.
+"""
+import importlib
+import logging
+import socket
+import os
+import threading
+import traceback
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from core import metrics
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE = 'default'
+
+
+def enqueue(
+    task_name: str,
+    args: Sequence = (),
+    kwargs: Optional[Dict[str, Any]] = None,
+    queue: str = DEFAULT_QUEUE,
+    priority: int = 0,
+    run_at=None,
+    max_attempts: Optional[int] = None,
+    dedupe_key: Optional[str] = None
+) -> Optional[Job]:
+    """
+    Add a job. Arguments must be JSON serializable.
+    Returns None when dedupe_key is already taken.
+    """
+    job = Job(
+        task_name=task_name,
+        args=list(args),
+        kwargs=kwargs or {},
+        queue=queue,
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        dedupe_key=dedupe_key,
+    )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        if dedupe_key:
+            return None
+        raise
+    return job
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(queues: Iterable[str], worker_id: str, limit: int = 1) -> List[Job]:
+    """Claim up to `limit` ready jobs, highest priority and oldest first."""
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = list(
+            Job.objects.select_for_update(skip_locked=True).filter(
+                status=Job.STATUS_QUEUED,
+                queue__in=list(queues),
+                run_at__lte=now
+            ).order_by('-priority', 'run_at', 'id').values_list('id', flat=True)[:limit]
+        )
+        claimed = []
+        for job_id in candidates:
+            # Conditional update: a no-op if another worker got there first
+            if Job.objects.filter(id=job_id, status=Job.STATUS_QUEUED).update(
+                status=Job.STATUS_RUNNING,
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F('attempts') + 1
+            ):
+                claimed.append(job_id)
+    return list(Job.objects.filter(id__in=claimed).order_by('-priority', 'run_at', 'id'))
+
+
+def resolve_task(task_name: str):
+    """Import a task ('module.function') registered with core.tasks' app or any callable."""
+    module_name, _, attr = task_name.rpartition('.')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, settings.JOB_RETRY_MAX_SECONDS))
+
+
+def _held(job: Job):
+    """The job's row while this worker still holds it."""
+    return Job.objects.filter(id=job.id, status=Job.STATUS_RUNNING, locked_by=job.locked_by)
+
+
+def _record(job: Job, **fields) -> bool:
+    """Write a run's outcome only while this worker still holds the job."""
+    if _held(job).update(**fields):
+        return True
+    logger.warning("Job %s (%s) was reclaimed while running; its outcome was not recorded", job.id, job.task_name)
+    return False
+
+
+class Heartbeat:
+    """
+    Refresh a running job's locked_at every JOB_HEARTBEAT_SECONDS, so
+    requeue_stale() only reclaims jobs whose worker stopped, not slow ones.
+    """
+
+    def __init__(self, job: Job, interval: Optional[float] = None):
+        self.job = job
+        self.interval = interval or settings.JOB_HEARTBEAT_SECONDS
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f'job-heartbeat-{job.id}', daemon=True)
+
+    def _beat(self):
+        try:
+            while not self._stopped.wait(self.interval):
+                _held(self.job).update(locked_at=timezone.now())
+        except Exception:
+            logger.exception("Heartbeat for job %s failed", self.job.id)
+        finally:
+            connections.close_all()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+
+def run_job(job: Job) -> bool:
+    """
+    Execute a claimed job and record the outcome. Returns True on success,
+    False if it failed or was reclaimed, before it started or while running.
+    """
+    # Jobs claimed in a batch wait behind each other; start only if still ours
+    if not _held(job).update(locked_at=timezone.now()):
+        logger.warning("Job %s (%s) was reclaimed before it started; skipping", job.id, job.task_name)
+        return False
+    try:
+        task = resolve_task(job.task_name)
+        run = getattr(task, 'run', task)
+        with Heartbeat(job):
+            run(*job.args, **job.kwargs)
+    except Exception as e:
+        error = ''.join(traceback.format_exception(type(e), e, e.__traceback__))[-5000:]
+        dead = job.attempts >= job.max_attempts
+        metrics.inc('navflow_background_tasks_total', task=job.task_name, outcome='dead' if dead else 'retried')
+        if dead:
+            logger.error("Job %s (%s) dead after %d attempts: %s", job.id, job.task_name, job.attempts, e)
+            _record(job, status=Job.STATUS_DEAD, last_error=error, finished_at=timezone.now(), locked_by=None)
+        else:
+            logger.warning("Job %s (%s) failed, attempt %d: %s", job.id, job.task_name, job.attempts, e)
+            _record(
+                job,
+                status=Job.STATUS_QUEUED,
+                last_error=error,
+                run_at=timezone.now() + retry_delay(job.attempts),
+                locked_by=None,
+                locked_at=None
+            )
+        return False
+
+    if not _record(job, status=Job.STATUS_SUCCEEDED, finished_at=timezone.now(), locked_by=None):
+        return False
+    metrics.inc('navflow_background_tasks_total', task=job.task_name, outcome='succeeded')
+    return True
+
+
+def requeue_stale(timeout_seconds: Optional[int] = None) -> int:
+    """
+    Put jobs whose worker stopped heartbeating back on the queue. The lost
+    run already counted as an attempt when claimed, so a job that keeps
+    killing its worker is dead-lettered at max_attempts like a failing one.
+    """
+    timeout_seconds = timeout_seconds or settings.JOB_VISIBILITY_TIMEOUT
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.STATUS_RUNNING,
+        locked_at__lt=now - timedelta(seconds=timeout_seconds)
+    )
+    dead = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.STATUS_DEAD, finished_at=now, locked_by=None,
+        last_error=f'Worker stopped responding for {timeout_seconds}s on the last attempt'
+    )
+    if dead:
+        logger.error("Dead-lettered %d jobs whose workers stopped responding", dead)
+        metrics.inc('navflow_background_tasks_total', dead, task='stale', outcome='dead')
+    return stale.update(status=Job.STATUS_QUEUED, locked_by=None, locked_at=None, run_at=now)
+
+
+def retry_dead(queue: Optional[str] = None) -> int:
+    """Move dead-lettered jobs back to the queue with a fresh attempt budget."""
+    jobs = Job.objects.filter(status=Job.STATUS_DEAD)
+    if queue:
+        jobs = jobs.filter(queue=queue)
+    return jobs.update(status=Job.STATUS_QUEUED, attempts=0, run_at=timezone.now(), finished_at=None)
+
+
+def queue_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-queue counts by state plus latency: how long the oldest ready job has
+    been waiting past its run_at. One grouped query.
+    """
+    now = timezone.now()
+    stats: Dict[str, Dict[str, Any]] = {}
+    rows = Job.objects.exclude(status=Job.STATUS_SUCCEEDED).filter(
+        run_at__lte=now
+    ).values('queue', 'status').annotate(count=Count('id'), oldest=Min('run_at')).order_by()
+    scheduled = Job.objects.filter(status=Job.STATUS_QUEUED, run_at__gt=now).values('queue').annotate(
+        count=Count('id')
+    ).order_by()
+
+    def entry(queue):
+        return stats.setdefault(queue, {'ready': 0, 'scheduled': 0, 'running': 0, 'dead': 0, 'latency_seconds': 0.0})
+
+    for row in rows:
+        queue = entry(row['queue'])
+        if row['status'] == Job.STATUS_QUEUED:
+            queue['ready'] = row['count']
+            queue['latency_seconds'] = round((now - row['oldest']).total_seconds(), 3)
+        else:
+            queue[row['status']] = row['count']
+    for row in scheduled:
+        entry(row['queue'])['scheduled'] = row['count']
+    return stats
+
+
+# Crontab fields as (local dict key, Celery crontab attribute, value at a moment).
+# Days of the week count from Sunday = 0, as in cron and Celery.
+CRON_FIELDS = (
+    ('minute', lambda moment: moment.minute),
+    ('hour', lambda moment: moment.hour),
+    ('day_of_week', lambda moment: (moment.weekday() + 1) % 7),
+    ('day_of_month', lambda moment: moment.day),
+    ('month_of_year', lambda moment: moment.month),
+)
+DAY_NAMES = {name: i for i, name in enumerate(('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'))}
+
+# Periodic slots a worker enqueues after falling behind, e.g. during a long batch
+PERIODIC_CATCH_UP = timedelta(days=1)
+
+
+def _cron_value(part: str) -> int:
+    part = part.strip().lower()
+    return DAY_NAMES[part[:3]] if part[:3] in DAY_NAMES else int(part)
+
+
+def _cron_part_matches(part: str, value: int) -> bool:
+    # '*', 'n', 'a-b', each optionally '/step'
+    part, _, step = part.partition('/')
+    if part == '*':
+        start, end = 0, value
+    elif '-' in part:
+        start, end = (_cron_value(bound) for bound in part.split('-', 1))
+    else:
+        start = end = _cron_value(part)
+        if step:
+            end = value
+    if not start <= value <= end:
+        return False
+    return not step or (value - start) % int(step) == 0
+
+
+def _cron_field_matches(spec, value: int) -> bool:
+    if spec is None or spec == '*':
+        return True
+    if isinstance(spec, str):
+        return any(_cron_part_matches(part, value) for part in spec.split(','))
+    if isinstance(spec, (set, frozenset, list, tuple)):
+        return value in spec
+    return value == int(spec)
+
+
+def schedule_matches(schedule, moment) -> bool:
+    """Whether a crontab schedule (local dict or Celery crontab) fires at this minute."""
+    if isinstance(schedule, dict):
+        return all(_cron_field_matches(schedule.get(name, '*'), value(moment)) for name, value in CRON_FIELDS)
+    # celery.schedules.crontab exposes each field as an expanded set
+    return all(value(moment) in getattr(schedule, name) for name, value in CRON_FIELDS)
+
+
+def enqueue_periodic(beat_schedule: Dict[str, Dict], moment=None, since=None) -> int:
+    """
+    Enqueue every periodic job due at this minute, or at any minute after
+    `since` (the previous call) up to this one, so slots passed while a
+    worker was busy still run, late. The dedupe key makes this safe to call
+    from every worker, every poll.
+    """
+    moment = (moment or timezone.now()).replace(second=0, microsecond=0)
+    slot = moment
+    if since is not None:
+        slot = max(since.replace(second=0, microsecond=0) + timedelta(minutes=1), moment - PERIODIC_CATCH_UP)
+    queued = 0
+    while slot <= moment:
+        # Step in absolute time; match and name slots in local time
+        local = timezone.localtime(slot)
+        for name, entry in beat_schedule.items():
+            if schedule_matches(entry['schedule'], local):
+                job = enqueue(
+                    entry['task'],
+                    args=entry.get('args', ()),
+                    kwargs=entry.get('kwargs'),
+                    queue=entry.get('options', {}).get('queue', DEFAULT_QUEUE),
+                    run_at=local,
+                    dedupe_key=f"periodic:{name}:{local:%Y%m%d%H%M}",
+                )
+                queued += job is not None
+        slot += timedelta(minutes=1)
+    return queued
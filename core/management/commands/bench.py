@@ -0,0 +1,91 @@
+"""
+Management command benchmarking the hot API endpoints.
+Runs against a throwaway test database, so the configured database is never
+touched; see core.bench for the dataset and scenarios.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import bench
+
+
+class Command(BaseCommand):
+    help = 'Benchmark hot endpoints and compare latency, query count and size with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Members in the seeded organization')
+        parser.add_argument('--projects', type=int, default=5, help='Seeded projects')
+        parser.add_argument('--tasks', type=int, default=200, help='Tasks per project')
+        parser.add_argument('--comments', type=int, default=2, help='Comments per task')
+        parser.add_argument('--notifications', type=int, default=200, help='Notifications for the benchmark user')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per endpoint')
+        parser.add_argument('--only', action='append', choices=[s.name for s in bench.SCENARIOS], help='Run only this scenario (repeatable)')
+        parser.add_argument('--baseline', default=os.path.join(settings.BASE_DIR, 'bench_baseline.json'), help='Baseline JSON file')
+        parser.add_argument('--save', action='store_true', help='Write this run as the new baseline')
+        parser.add_argument('--latency-tolerance', type=float, default=0.25, help='Allowed p95 growth as a fraction')
+        parser.add_argument('--query-tolerance', type=int, default=0, help='Allowed extra queries per request')
+        parser.add_argument('--size-tolerance', type=float, default=0.10, help='Allowed response size growth as a fraction')
+        parser.add_argument('--keepdb', action='store_true', help='Keep the benchmark database schema between runs (rows are reseeded)')
+
+    def handle(self, *args, **options):
+        config = {
+            'users': options['users'],
+            'projects': options['projects'],
+            'tasks_per_project': options['tasks'],
+            'comments_per_task': options['comments'],
+            'notifications': options['notifications'],
+        }
+
+        # Per-request N+1 warnings would drown the report
+        logging.getLogger('navflow.queries').setLevel(logging.ERROR)
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            if options['keepdb']:
+                # Skip the migrations, not the seed: the previous run's rows would collide
+                call_command('flush', interactive=False, verbosity=0)
+            self.stdout.write(f"Seeding {config}")
+            dataset = bench.seed(**config)
+            results = bench.run_benchmarks(dataset, options['iterations'], options['warmup'], options['only'])
+            rendering = bench.compare_list_rendering(dataset, iterations=options['iterations'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        self.stdout.write(f"{'endpoint':<22}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'bytes':>10}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<22}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['queries']:>9}{result['bytes']:>10}"
+            )
+        self.stdout.write(
+            f"task list rendering, CPU per row: serializer {rendering['serializer_us_per_row']}us, "
+            f"projection {rendering['projection_us_per_row']}us ({rendering['speedup']}x)"
+        )
+
+        if options['save']:
+            bench.save_baseline(options['baseline'], results, config)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(self.style.WARNING("No baseline found; run with --save to create one"))
+            return
+
+        regressions = bench.compare(
+            results,
+            bench.load_baseline(options['baseline']),
+            latency_tolerance=options['latency_tolerance'],
+            query_tolerance=options['query_tolerance'],
+            size_tolerance=options['size_tolerance'],
+        )
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
@@ -0,0 +1,53 @@
+"""
+Management command to import tasks from a CSV or JSONL file into a project.
+Streams the file and inserts in chunks, so very large backlogs can be migrated.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.imports import SUPPORTED_FORMATS, TaskImporter, detect_format
+from projects.models import Project
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import tasks into a project from a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the CSV or JSONL file')
+        parser.add_argument('--project', type=int, required=True, help='Target project ID')
+        parser.add_argument('--user', required=True, help='Email or username recorded as task creator')
+        parser.add_argument('--format', choices=SUPPORTED_FORMATS, help='File format (default: from extension)')
+        parser.add_argument('--chunk-size', type=int, default=TaskImporter.CHUNK_SIZE, help='Rows per insert batch')
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(id=options['project'])
+        except Project.DoesNotExist:
+            raise CommandError(f"Project {options['project']} not found")
+
+        user = User.objects.filter(email__iexact=options['user']).first() or \
+            User.objects.filter(username__iexact=options['user']).first()
+        if not user:
+            raise CommandError(f"User '{options['user']}' not found")
+
+        format_type = options['format'] or detect_format(options['path'])
+        started = time.monotonic()
+
+        try:
+            with open(options['path'], 'r', encoding='utf-8-sig', newline='') as stream:
+                result = TaskImporter(project, user, chunk_size=options['chunk_size']).run(stream, format_type)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"  Row {error['row']}: {'; '.join(error['errors'])}")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} of {result['rows']} rows into {project.name} "
+            f"({result['failed']} failed) in {elapsed:.1f}s"
+        ))
@@ -0,0 +1,30 @@
+"""
+Management command to permanently delete soft-deleted tasks and users.
+Deletes in small chunks with short transactions; see core.purge.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.purge import purge_soft_deleted
+
+
+class Command(BaseCommand):
+    help = 'Purge soft-deleted tasks and users older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.SOFT_DELETE_RETENTION_DAYS, help='Retention period in days')
+        parser.add_argument('--chunk-size', type=int, default=settings.PURGE_CHUNK_SIZE, help='Rows deleted per transaction')
+        parser.add_argument('--sleep', type=float, default=settings.PURGE_SLEEP_SECONDS, help='Seconds to pause between chunks')
+
+    def handle(self, *args, **options):
+        report = purge_soft_deleted(
+            retention_days=options['days'],
+            chunk_size=options['chunk_size'],
+            sleep_seconds=options['sleep']
+        )
+
+        for label, count in report['rows'].items():
+            self.stdout.write(f"  {label}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {sum(report['rows'].values())} rows in {report['chunks']} chunks ({report['seconds']:.1f}s)"
+        ))
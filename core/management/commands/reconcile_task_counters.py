@@ -0,0 +1,20 @@
+"""
+Management command to recompute the denormalized task counters on projects
+and sections from task rows, repairing any drift; see core.counters.
+"""
+from django.core.management.base import BaseCommand
+
+from core.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recompute active task counters on projects and sections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', dest='projects', help='Only this project id (repeatable)')
+
+    def handle(self, *args, **options):
+        fixed = reconcile(options['projects'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Corrected {fixed['projects']} projects and {fixed['sections']} sections"
+        ))
@@ -0,0 +1,69 @@
+"""
+Management command running a durable job queue worker.
+Start one or more per node; workers coordinate through the core.Job table
+only (see core.jobqueue), so no broker is needed.
+"""
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core import jobqueue
+
+
+class Command(BaseCommand):
+    help = 'Claim and run jobs from the database job queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues', help='Queue to consume (repeatable, default: default)')
+        parser.add_argument('--batch', type=int, default=10, help='Jobs claimed per poll')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when no job is ready')
+        parser.add_argument('--once', action='store_true', help='Drain ready jobs once and exit')
+        parser.add_argument('--no-schedule', action='store_true', help='Do not enqueue periodic jobs from the beat schedule')
+
+    def handle(self, *args, **options):
+        queues = options['queues'] or [jobqueue.DEFAULT_QUEUE]
+        worker_id = jobqueue.default_worker_id()
+        self.stopping = False
+
+        def stop(signum, frame):
+            # Finish the job in hand, then exit
+            self.stopping = True
+
+        if not options['once']:
+            signal.signal(signal.SIGTERM, stop)
+            signal.signal(signal.SIGINT, stop)
+
+        from core.tasks import app
+        self.stdout.write(f"Worker {worker_id} consuming {', '.join(queues)}")
+
+        processed = failed = 0
+        last_minute = last_checked = None
+        while not self.stopping:
+            close_old_connections()
+            now = timezone.now()
+            minute = int(now.timestamp() // 60)
+            if minute != last_minute:
+                if not options['no_schedule']:
+                    # Covers every minute since the last check, not just this one
+                    jobqueue.enqueue_periodic(app.conf.beat_schedule, now, since=last_checked)
+                    last_checked = now
+                jobqueue.requeue_stale(settings.JOB_VISIBILITY_TIMEOUT)
+                last_minute = minute
+
+            jobs = jobqueue.claim(queues, worker_id, options['batch'])
+            for job in jobs:
+                if jobqueue.run_job(job):
+                    processed += 1
+                else:
+                    failed += 1
+
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} stopped: {processed} succeeded, {failed} failed"))
@@ -0,0 +1,335 @@
+"""
+Prometheus metrics without an external client library.
+Each process keeps counters and histograms in memory and periodically writes
+them to its own file in METRICS_DIR; /metrics sums the files of all gunicorn
+workers and renders the Prometheus text format. Files are named by pid and
+process start time, so a reused pid never adopts another worker's file.
+Scrapes fold the files of exited workers into one archive file, keeping
+their totals in the sum (a drop would read as a counter reset) without
+letting restarts pile files up.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    # No flock (Windows): concurrent scrapes may archive a worker twice
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+FANOUT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+# metrics-<pid>-<start time>.json; files from before start times were recorded lack it
+WORKER_FILE = re.compile(r'metrics-(\d+)(?:-(\d+))?\.json')
+ARCHIVE_FILE = 'metrics-exited.json'
+LOCK_FILE = 'metrics.lock'
+
+# name -> (type, help, buckets)
+METRICS = {
+    'navflow_http_request_duration_seconds': ('histogram', 'Request latency by view and method', LATENCY_BUCKETS),
+    'navflow_db_queries_per_request': ('histogram', 'Database queries per request by view', QUERY_COUNT_BUCKETS),
+    'navflow_db_query_duration_seconds_total': ('counter', 'Time spent in database queries by view', None),
+    'navflow_cache_requests_total': ('counter', 'Cache lookups by cache and result (hit/miss)', None),
+    'navflow_background_tasks_total': ('counter', 'Background task runs by task and outcome', None),
+    'navflow_notification_fanout_size': ('histogram', 'Notifications created per fan-out by source', FANOUT_BUCKETS),
+    'navflow_ai_requests_total': ('counter', 'AI requests answered by kind and outcome (ok/error/timeout/fallback/rejected/dropped)', None),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Registry:
+    """Per-process metric store, flushed to METRICS_DIR in the background."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.pid = os.getpid()
+        self.counters: Dict[Tuple[str, LabelKey], float] = defaultdict(float)
+        self.histograms: Dict[Tuple[str, LabelKey], List] = {}
+        self._dirty = False
+        self._flusher = None
+
+    def _check_fork(self):
+        # A forked worker must not report (or write over) its parent's values
+        if os.getpid() != self.pid:
+            self._reset()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._check_fork()
+            self.counters[(name, _label_key(labels))] += value
+            self._dirty = True
+        self._ensure_flusher()
+
+    def observe(self, name: str, value: float, **labels):
+        buckets = METRICS[name][2]
+        with self._lock:
+            self._check_fork()
+            key = (name, _label_key(labels))
+            entry = self.histograms.get(key)
+            if entry is None:
+                entry = self.histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+            self._dirty = True
+        self._ensure_flusher()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            self._check_fork()
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, list(labels), list(buckets), total, count]
+                    for (name, labels), (buckets, total, count) in self.histograms.items()
+                ],
+            }
+
+    def path(self) -> str:
+        pid = os.getpid()
+        return os.path.join(settings.METRICS_DIR, f"metrics-{pid}-{_start_time(pid) or 0}.json")
+
+    def flush(self):
+        """Atomically write this process's values to its file."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+        data = self.snapshot()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        _write(self.path(), data)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_loop, name='navflow-metrics', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while os.getpid() == pid:
+            time.sleep(settings.METRICS_FLUSH_SECONDS)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+
+registry = Registry()
+
+
+def inc(name: str, value: float = 1, **labels):
+    if settings.METRICS_ENABLED:
+        registry.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    if settings.METRICS_ENABLED:
+        registry.observe(name, value, **labels)
+
+
+def record_cache(cache_name: str, hit: bool):
+    inc('navflow_cache_requests_total', cache=cache_name, result='hit' if hit else 'miss')
+
+
+def record_ai(kind: str, outcome: str, count: int = 1):
+    inc('navflow_ai_requests_total', count, kind=kind, outcome=outcome)
+
+
+def record_fanout(source: str, size: int):
+    if size:
+        observe('navflow_notification_fanout_size', size, source=source)
+
+
+def _start_time(pid: int) -> Optional[str]:
+    """A process's start time in clock ticks since boot, or None without /proc."""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # Fields after the parenthesised command name; starttime is field 22
+            return f.read().rsplit(')', 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+def _process_alive(pid: int, started: Optional[str]) -> bool:
+    """Whether the process that wrote a file still runs; a reused pid does not count."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by another user
+        pass
+    current = _start_time(pid)
+    return started is None or current is None or current == started
+
+
+def _merge(snapshots: Iterable[Dict]) -> Tuple[Dict, Dict]:
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot.get('counters', []):
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, buckets, total, count in snapshot.get('histograms', []):
+            key = (name, tuple(map(tuple, labels)))
+            entry = histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+            entry[0] = [a + b for a, b in zip(entry[0], buckets)]
+            entry[1] += total
+            entry[2] += count
+    return counters, histograms
+
+
+def _load(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path: str, data: Dict):
+    partial = f"{path}.tmp"
+    with open(partial, 'w') as f:
+        json.dump(data, f)
+    os.replace(partial, path)
+
+
+def _archive_exited(names: List[str]):
+    """
+    Fold the files of exited workers into ARCHIVE_FILE and delete them, so
+    their totals stay in the sum instead of looking like a counter reset.
+    Callers hold the directory lock.
+    """
+    exited = []
+    for name in names:
+        match = WORKER_FILE.fullmatch(name)
+        if match and not _process_alive(int(match.group(1)), match.group(2)):
+            exited.append(name)
+    if not exited:
+        return
+    directory = settings.METRICS_DIR
+    archive = os.path.join(directory, ARCHIVE_FILE)
+    snapshots = [_load(os.path.join(directory, name)) for name in [ARCHIVE_FILE] + exited]
+    counters, histograms = _merge(snapshot for snapshot in snapshots if snapshot)
+    _write(archive, {
+        'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+        'histograms': [
+            [name, list(labels), buckets, total, count]
+            for (name, labels), (buckets, total, count) in histograms.items()
+        ],
+    })
+    for name in exited:
+        for path in (name, f"{name}.tmp"):
+            try:
+                os.remove(os.path.join(directory, path))
+            except FileNotFoundError:
+                pass
+
+
+def _read_snapshots() -> List[Dict]:
+    """This process's live values, the last flush of every other live worker and the archive."""
+    own = os.path.basename(registry.path())
+    snapshots = [registry.snapshot()]
+    directory = settings.METRICS_DIR
+    if not os.path.isdir(directory):
+        return snapshots
+    # Concurrent scrapes must not archive a file twice or read half an archive
+    with open(os.path.join(directory, LOCK_FILE), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        _archive_exited(os.listdir(directory))
+        for name in os.listdir(directory):
+            if name.endswith('.json') and name != own:
+                snapshot = _load(os.path.join(directory, name))
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+    return snapshots
+
+
+def collect() -> Tuple[Dict, Dict]:
+    """Sum counters and histograms across all worker snapshots."""
+    return _merge(_read_snapshots())
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def job_queue_gauges() -> List[str]:
+    """Depth and latency of the database job queue, read live at scrape time."""
+    if settings.BACKGROUND_TASK_BACKEND != 'database':
+        return []
+    from core.jobqueue import queue_stats
+    lines = [
+        '# HELP navflow_job_queue_depth Jobs in the database queue by state',
+        '# TYPE navflow_job_queue_depth gauge',
+    ]
+    latency = [
+        '# HELP navflow_job_queue_latency_seconds Wait of the oldest ready job',
+        '# TYPE navflow_job_queue_latency_seconds gauge',
+    ]
+    for queue, stats in sorted(queue_stats().items()):
+        for state in ('ready', 'scheduled', 'running', 'dead'):
+            lines.append(f'navflow_job_queue_depth{_format_labels([("queue", queue), ("state", state)])} {stats[state]}')
+        latency.append(f'navflow_job_queue_latency_seconds{_format_labels([("queue", queue)])} {stats["latency_seconds"]}')
+    return lines + latency
+
+
+def render(extra_lines: Optional[List[str]] = None) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    counters, histograms = collect()
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            continue
+        for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", _format_value(bound)),))} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+    lines.extend(extra_lines or [])
+    return '\n'.join(lines) + '\n'
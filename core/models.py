@@ -0,0 +1,84 @@
+"""
+Core models shared by background jobs.
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class Watermark(models.Model):
+    """
+    Persisted progress marker for incremental jobs.
+    A job processes rows newer than its watermark, then advances it.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
+    
+    @classmethod
+    def get_value(cls, name):
+        """Current value of a watermark, or None if it was never set."""
+        return cls.objects.filter(name=name).values_list('value', flat=True).first()
+    
+    @classmethod
+    def advance(cls, name, value):
+        """Move a watermark forward to value."""
+        if not cls.objects.filter(name=name).update(value=value, updated_at=timezone.now()):
+            cls.objects.get_or_create(name=name, defaults={'value': value})
+    
+    @classmethod
+    def lock(cls, name):
+        """Hold the watermark's row lock until the current transaction ends."""
+        cls.objects.select_for_update().get_or_create(name=name)
+
+
+class Job(models.Model):
+    """
+    Durable background job, claimed by `manage.py run_jobs` workers with
+    SELECT ... FOR UPDATE SKIP LOCKED. Failed jobs are retried with
+    exponential backoff and dead-lettered after max_attempts.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_DEAD = 'dead'
+    
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_DEAD, 'Dead'),
+    ]
+    
+    queue = models.CharField(max_length=50, default='default')
+    task_name = models.CharField(max_length=200)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    last_error = models.TextField(blank=True, null=True)
+    # Set for scheduled jobs so several workers cannot enqueue the same run
+    dedupe_key = models.CharField(max_length=200, unique=True, blank=True, null=True)
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        indexes = [
+            # Workers only ever scan ready jobs
+            models.Index(
+                fields=['queue', '-priority', 'run_at'],
+                condition=models.Q(status='queued'),
+                name='job_ready_idx'
+            ),
+            models.Index(fields=['status', 'locked_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.task_name} [{self.queue}] ({self.status})"
@@ -0,0 +1,110 @@
+"""
+Incremental overdue task detection.
+Each run only looks at tasks whose due_date passed since the previous run,
+tracked by a persisted watermark, plus overdue tasks edited since then (a
+due date moved into the past, a reassignment, a reopened task), so hourly
+cost follows newly overdue tasks rather than every overdue task in the
+system; dedupe keys keep a task from being noticed twice for one due date.
+Overlapping runs take turns on the watermark's row lock while they check and
+insert a chunk, so each notification, and its email, belongs to exactly one
+run.
+"""
+from datetime import timedelta
+from typing import Dict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import Notification
+from core.metrics import record_fanout
+from core.models import Watermark
+from core.utils import chunked
+from projects.models import Task, TaskStatus
+
+WATERMARK = 'overdue_tasks.due_date'
+CHUNK_SIZE = 1000
+
+
+def dedupe_key(task_id: int, due_date) -> str:
+    # Moving the due date makes the task eligible for a fresh notice
+    return f"task_overdue:{task_id}:{int(due_date.timestamp())}"
+
+
+def notify_newly_overdue(now=None, chunk_size: int = CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Notify assignees of tasks that became overdue, or were edited while
+    overdue, in (watermark, now].
+    The first run looks back OVERDUE_INITIAL_LOOKBACK_HOURS. Notifications are
+    bulk inserted and deduplicated by key, so a re-run after a crash is safe,
+    and only notifications this run inserted are emailed.
+    Returns {'tasks', 'notified', 'emailed'}.
+    """
+    now = now or timezone.now()
+    since = Watermark.get_value(WATERMARK)
+    if since is None:
+        since = now - timedelta(hours=settings.OVERDUE_INITIAL_LOOKBACK_HOURS)
+
+    rows = Task.objects.filter(
+        deleted_at__isnull=True,
+        assigned_to__isnull=False,
+        assigned_to__is_active=True,
+        due_date__lte=now,
+    ).filter(
+        Q(due_date__gt=since) | Q(updated_at__gt=since)
+    ).exclude(
+        status=TaskStatus.DONE
+    ).order_by('due_date', 'id').values_list(
+        'id', 'title', 'due_date', 'project_id', 'project__name',
+        'assigned_to_id', 'assigned_to__email', 'assigned_to__notification_email'
+    )
+
+    stats = {'tasks': 0, 'notified': 0, 'emailed': 0}
+    with get_connection(fail_silently=True) as connection:
+        for chunk in chunked(rows.iterator(chunk_size=chunk_size), chunk_size):
+            stats['tasks'] += len(chunk)
+            keys = {row[0]: dedupe_key(row[0], row[2]) for row in chunk}
+            with transaction.atomic():
+                # Another run's inserts for these keys are committed before we look
+                Watermark.lock(WATERMARK)
+                already_sent = set(
+                    Notification.objects.filter(
+                        dedupe_key__in=keys.values()
+                    ).order_by().values_list('dedupe_key', flat=True)
+                )
+                fresh = [row for row in chunk if keys[row[0]] not in already_sent]
+                if not fresh:
+                    continue
+                Notification.objects.bulk_create([
+                    Notification(
+                        user_id=user_id,
+                        type='task_overdue',
+                        title='Task Overdue',
+                        message=f'"{title}" in {project_name} is now overdue',
+                        link=f'/tasks?task={task_id}',
+                        related_task_id=task_id,
+                        related_project_id=project_id,
+                        dedupe_key=keys[task_id],
+                    )
+                    for task_id, title, _, project_id, project_name, user_id, _, _ in fresh
+                ])
+            stats['notified'] += len(fresh)
+            record_fanout('task_overdue', len(fresh))
+
+            messages = [
+                EmailMessage(
+                    subject=f"Overdue Task: {title}",
+                    body=f"The task '{title}' in {project_name} is now overdue. Please take action.",
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[email],
+                )
+                for _, title, _, _, project_name, _, email, wants_email in fresh
+                if wants_email and email
+            ]
+            if messages:
+                stats['emailed'] += connection.send_messages(messages) or 0
+
+    Watermark.advance(WATERMARK, now)
+    return stats
@@ -8,8 +8,22 @@ from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 from django.core.cache import cache
 from functools import wraps
+from collections import Counter
+from contextlib import ExitStack
 import hashlib
 import json
+import logging
+import os
+import random
+import re
+import time
+import traceback
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from core.metrics import record_cache
+
+query_logger = logging.getLogger('navflow.queries')
 
 
 class CursorPaginationOptimized(CursorPagination):
@@ -117,6 +131,7 @@ def cache_result(timeout: int = 3600, key_prefix: str = ""):
             
             # Check cache
             result = cache.get(cache_key)
+            record_cache(key_prefix or func.__name__, result is not None)
             if result is not None:
                 return result
             
@@ -135,7 +150,8 @@ def cache_result(timeout: int = 3600, key_prefix: str = ""):
 class DatabaseOptimizationMiddleware:
     """
     Middleware to monitor and optimize database queries on each request.
-    Logs warnings for N+1 query problems.
+    Logs warnings for N+1 query problems. DEBUG only; in production use
+    QueryInstrumentationMiddleware.
     """
     
     def __init__(self, get_response):
@@ -157,6 +173,165 @@ class DatabaseOptimizationMiddleware:
         return response
 
 
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SQL_IN_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_SQL_SPACE = re.compile(r"\s+")
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def normalize_sql(sql: str) -> str:
+    """Strip literals and collapse IN lists so N+1 queries share one fingerprint."""
+    sql = _SQL_STRING.sub('?', sql)
+    sql = _SQL_NUMBER.sub('?', sql)
+    sql = _SQL_IN_LIST.sub('(?)', sql.replace('%s', '?'))
+    return _SQL_SPACE.sub(' ', sql).strip()
+
+
+def _call_site() -> str:
+    """Innermost frame in project code (outside Django, DRF and this module)."""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        filename = os.path.abspath(frame.filename)
+        if (filename.startswith(_PROJECT_ROOT) and 'site-packages' not in filename
+                and filename != os.path.abspath(__file__)):
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    return 'unknown'
+
+
+class QueryStats:
+    """
+    connection.execute_wrapper that counts queries and DB time and groups
+    them by normalized SQL. The Python call site is captured only once per
+    fingerprint, when it first repeats, to keep the hot path cheap.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.call_sites: Dict[str, str] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            fingerprint = normalize_sql(sql)
+            self.fingerprints[fingerprint] += 1
+            if self.fingerprints[fingerprint] == 2:
+                self.call_sites[fingerprint] = _call_site()
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        """Fingerprints executed at least `threshold` times, most frequent first."""
+        return [
+            {'count': count, 'sql': fingerprint[:300], 'call_site': self.call_sites.get(fingerprint, 'unknown')}
+            for fingerprint, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Production-safe query instrumentation.
+    Counts queries and DB time per request on every database alias, adds a
+    Server-Timing header, and logs a sample of requests that exceed the query
+    budget or repeat the same statement (N+1) to the 'navflow.queries' logger.
+    Latency and query counts per view also feed the /metrics registry.
+    Works in sync and async middleware chains.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+    
+    @staticmethod
+    def _enabled() -> bool:
+        from django.conf import settings
+        return settings.QUERY_INSTRUMENTATION_ENABLED or settings.METRICS_ENABLED
+    
+    @staticmethod
+    def _wrap_connections(stack: ExitStack, stats: QueryStats):
+        from django.db import connections
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(stats))
+    
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self._enabled():
+            return self.get_response(request)
+        
+        stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            self._wrap_connections(stack, stats)
+            response = self.get_response(request)
+        return self._finish(request, response, stats, started)
+    
+    async def __acall__(self, request):
+        if not self._enabled():
+            return await self.get_response(request)
+        
+        # Connections are per context; the async ORM and sync views run in
+        # the request's thread-sensitive executor, so wrap them there
+        stats = QueryStats()
+        started = time.perf_counter()
+        stack = ExitStack()
+        await sync_to_async(self._wrap_connections)(stack, stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._finish(request, response, stats, started)
+    
+    def _finish(self, request, response, stats: QueryStats, started: float):
+        from django.conf import settings
+        
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = stats.duration * 1000
+        
+        if settings.METRICS_ENABLED:
+            from core import metrics
+            match = getattr(request, 'resolver_match', None)
+            view = (match.view_name if match else None) or 'unmatched'
+            metrics.observe('navflow_http_request_duration_seconds', total_ms / 1000,
+                            view=view, method=request.method, status=f"{response.status_code // 100}xx")
+            metrics.observe('navflow_db_queries_per_request', stats.count, view=view)
+            metrics.inc('navflow_db_query_duration_seconds_total', stats.duration, view=view)
+        
+        if not settings.QUERY_INSTRUMENTATION_ENABLED:
+            return response
+        
+        if settings.QUERY_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{stats.count} queries", app;dur={total_ms - db_ms:.1f}'
+            )
+        
+        repeated = stats.repeated(settings.QUERY_REPEAT_THRESHOLD)
+        too_many = stats.count > settings.QUERY_COUNT_THRESHOLD
+        if (repeated or too_many) and random.random() < settings.QUERY_LOG_SAMPLE_RATE:
+            query_logger.warning(
+                "%s %s ran %d queries in %.1fms (total %.1fms)",
+                request.method, request.path, stats.count, db_ms, total_ms,
+                extra={
+                    'path': request.path,
+                    'query_count': stats.count,
+                    'db_ms': round(db_ms, 1),
+                    'repeated_queries': repeated[:5],
+                }
+            )
+            for entry in repeated[:5]:
+                query_logger.warning("  repeated %dx at %s: %s", entry['count'], entry['call_site'], entry['sql'])
+        
+        return response
+
+
 class BulkOperationHelper:
     """Helper for efficient bulk operations."""
     
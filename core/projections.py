@@ -0,0 +1,207 @@
+"""
+Read-model projections for hot list endpoints.
+A projection reads plain dicts with queryset.values() and turns each into a
+response row with mappers compiled once per class, skipping the per-row
+field binding, source traversal and method dispatch of a ModelSerializer.
+Each projection must render exactly what the serializer it replaces does;
+core.tests.ProjectionParityTests compares them. Endpoints opt in with
+ProjectionListMixin and are enabled by name in settings.READ_PROJECTIONS.
+"""
+from collections import defaultdict
+from operator import itemgetter
+from typing import Callable, Dict, List, Tuple, Union
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from projects.models import Task, TaskStatus
+from projects.serializers import catalog_labels, label_catalog
+
+# A field is a values() column or a function of the (prepared) row
+Source = Union[str, Callable[[Dict], object]]
+
+_datetime = serializers.DateTimeField().to_representation
+
+
+def datetime_field(column: str) -> Callable[[Dict], object]:
+    def get(row):
+        value = row[column]
+        return None if value is None else _datetime(value)
+    return get
+
+
+def decimal_field(column: str, max_digits: int, decimal_places: int) -> Callable[[Dict], object]:
+    to_representation = serializers.DecimalField(max_digits, decimal_places).to_representation
+
+    def get(row):
+        value = row[column]
+        return None if value is None else to_representation(value)
+    return get
+
+
+def display_field(column: str, choices) -> Callable[[Dict], object]:
+    """Like Model.get_FOO_display()."""
+    labels = {value: str(label) for value, label in choices}
+    return lambda row: labels.get(row[column], row[column])
+
+
+class Projection:
+    """
+    Subclasses set `name` (for settings.READ_PROJECTIONS), `columns` (the
+    values() lookups) and `fields` (response key and source, in response
+    order), and may override prepare() to batch-load related data into rows.
+    """
+    name = ''
+    columns: Tuple[str, ...] = ()
+    fields: Tuple[Tuple[str, Source], ...] = ()
+
+    def __init__(self, request=None):
+        self.request = request
+
+    @classmethod
+    def mappers(cls) -> List[Tuple[str, Callable]]:
+        if '_mappers' not in cls.__dict__:
+            cls._mappers = [
+                (key, itemgetter(source) if isinstance(source, str) else source)
+                for key, source in cls.fields
+            ]
+        return cls._mappers
+
+    def queryset(self, queryset):
+        # Prefetches cannot attach to dicts; prepare() loads what they did
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def prepare(self, rows: List[Dict]):
+        pass
+
+    def render(self, rows) -> List[Dict]:
+        rows = list(rows)
+        self.prepare(rows)
+        mappers = self.mappers()
+        return [{key: get(row) for key, get in mappers} for row in rows]
+
+
+def _assigned_to_username(row):
+    if row['assigned_to_deleted'] and row['assigned_to_username']:
+        return row['assigned_to_username'] + " (deleted)"
+    return row['assigned_to__username']
+
+
+def _assigned_to_name(row):
+    # CustomUser.get_full_name()
+    if row['assigned_to_id'] is None:
+        return None
+    return f"{row['assigned_to__first_name']} {row['assigned_to__last_name']}".strip() or row['assigned_to__email']
+
+
+def _assigned_to_initials(row):
+    # CustomUser.get_initials()
+    if row['assigned_to_id'] is None:
+        return None
+    if row['assigned_to__first_name'] and row['assigned_to__last_name']:
+        return f"{row['assigned_to__first_name'][0]}{row['assigned_to__last_name'][0]}".upper()
+    return row['assigned_to__email'][0].upper()
+
+
+def _time_spent_display(row):
+    # Task.get_time_spent_display()
+    hours, minutes = divmod(row['time_spent_minutes'], 60)
+    return f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+
+
+class TaskProjection(Projection):
+    """
+    TaskSerializer for lists. Expects Task.objects.with_list_stats(user)
+    (comment/attachment counts and the caller's focus id).
+    """
+    name = 'tasks'
+    columns = (
+        'id', 'title', 'description', 'rich_description', 'project_id', 'project__name',
+        'project__organization_id', 'project__organization__name', 'project__organization__version',
+        'status', 'section_id', 'section__name', 'section__color', 'priority',
+        'assigned_to_id', 'assigned_to__email', 'assigned_to__username', 'assigned_to__first_name',
+        'assigned_to__last_name', 'assigned_to__avatar', 'assigned_to_deleted', 'assigned_to_username',
+        'created_by__email', 'created_by__username', 'comment_count', 'attachment_count', 'caller_focus_id',
+        'due_date', 'created_at', 'updated_at', 'estimated_hours', 'time_spent_minutes', 'started_at',
+        'completed_at', 'is_timer_running', 'timer_started_at', 'position',
+    )
+    fields = (
+        ('id', 'id'),
+        ('title', 'title'),
+        ('description', 'description'),
+        ('rich_description', 'rich_description'),
+        ('project', 'project_id'),
+        ('project_name', 'project__name'),
+        ('organization_id', 'project__organization_id'),
+        ('organization_name', 'project__organization__name'),
+        ('status', 'status'),
+        ('status_display', display_field('status', TaskStatus.choices)),
+        ('section', 'section_id'),
+        ('section_name', 'section__name'),
+        ('section_color', 'section__color'),
+        ('priority', 'priority'),
+        ('priority_display', display_field('priority', Task._meta.get_field('priority').choices)),
+        ('assigned_to', 'assigned_to_id'),
+        ('assigned_to_email', 'assigned_to__email'),
+        ('assigned_to_username', _assigned_to_username),
+        ('assigned_to_name', _assigned_to_name),
+        ('assigned_to_avatar', lambda row: None if row['assigned_to_deleted'] else row['assigned_to__avatar']),
+        ('assigned_to_initials', _assigned_to_initials),
+        ('assigned_to_deleted', 'assigned_to_deleted'),
+        ('created_by_email', 'created_by__email'),
+        ('created_by_username', 'created_by__username'),
+        ('labels', 'label_ids'),
+        ('labels_data', 'labels_data'),
+        ('comments_count', 'comment_count'),
+        ('attachments_count', 'attachment_count'),
+        ('is_focused', lambda row: row['caller_focus_id'] is not None),
+        ('focused_id', 'caller_focus_id'),
+        ('due_date', datetime_field('due_date')),
+        ('created_at', datetime_field('created_at')),
+        ('updated_at', datetime_field('updated_at')),
+        ('estimated_hours', decimal_field('estimated_hours', 6, 2)),
+        ('time_spent_minutes', 'time_spent_minutes'),
+        ('time_spent_display', _time_spent_display),
+        ('started_at', datetime_field('started_at')),
+        ('completed_at', datetime_field('completed_at')),
+        ('is_timer_running', 'is_timer_running'),
+        ('timer_started_at', datetime_field('timer_started_at')),
+        ('position', 'position'),
+    )
+
+    def prepare(self, rows):
+        """Label ids for the page in one query, label data from the catalogs."""
+        links = defaultdict(list)
+        # Same order as the serializer's labels prefetch (TaskLabel.Meta.ordering)
+        for task_id, label_id in Task.labels.through.objects.filter(
+            task_id__in=[row['id'] for row in rows]
+        ).order_by('tasklabel__name', 'tasklabel_id').values_list('task_id', 'tasklabel_id'):
+            links[task_id].append(label_id)
+
+        catalogs = {}
+        for row in rows:
+            key = (row['project__organization_id'], row['project__organization__version'])
+            if key not in catalogs:
+                catalogs[key] = label_catalog(*key)
+            row['label_ids'] = links[row['id']]
+            row['labels_data'] = catalog_labels(catalogs[key], row['label_ids'])
+
+
+class ProjectionListMixin:
+    """
+    ViewSet mixin serving list() from `list_projection` when its name is in
+    settings.READ_PROJECTIONS. Filtering and pagination are unchanged.
+    """
+    list_projection = None
+
+    def list(self, request, *args, **kwargs):
+        if self.list_projection is None or self.list_projection.name not in settings.READ_PROJECTIONS:
+            return super().list(request, *args, **kwargs)
+
+        projection = self.list_projection(request)
+        queryset = projection.queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projection.render(page))
+        return Response(projection.render(queryset))
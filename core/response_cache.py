@@ -0,0 +1,93 @@
+"""
+Version-keyed response cache for read-mostly endpoints.
+A cached view declares how to resolve its scope: one query returning the
+scope id, the caller's role and the scope's version counter
+(Project.version or Organization.version, bumped by model signals on every
+write). Response data is cached under (endpoint, scope id, role, version,
+query string), so a write makes the old entries unreachable instead of
+waiting for a TTL. The timeout only bounds memory use.
+"""
+import hashlib
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from core import metrics
+from orgs.models import Membership
+from projects.models import ProjectRole
+
+# (scope id, caller role, version); None means "not cacheable, run the view"
+Scope = Optional[Tuple[object, str, object]]
+
+
+def project_scope(request, project_id) -> Scope:
+    """Caller's role in the project and the project's version."""
+    if not str(project_id or '').isdigit():
+        return None
+    row = ProjectRole.objects.filter(
+        user=request.user, project_id=project_id
+    ).values_list('role', 'project__version').first()
+    return (int(project_id), row[0], row[1]) if row else None
+
+
+def organization_scope(request, organization_id) -> Scope:
+    """Caller's role in the organization and the organization's version."""
+    if not str(organization_id or '').isdigit():
+        return None
+    row = Membership.objects.filter(
+        user=request.user, organization_id=organization_id
+    ).values_list('role', 'organization__version').first()
+    return (int(organization_id), row[0], row[1]) if row else None
+
+
+def member_organizations_scope(request, scope_id=None) -> Scope:
+    """Versions of every organization the caller belongs to, as one scope."""
+    rows = Membership.objects.filter(user=request.user).order_by('organization_id').values_list(
+        'organization_id', 'organization__version'
+    )
+    return (f'user:{request.user.pk}', '', ','.join(f'{org}:{version}' for org, version in rows))
+
+
+def cache_key(endpoint: str, request, scope: Tuple) -> str:
+    scope_id, role, version = scope
+    query = request.GET.urlencode()
+    if len(query) > 100:
+        query = hashlib.md5(query.encode()).hexdigest()
+    version = str(version)
+    if len(version) > 100:
+        version = hashlib.md5(version.encode()).hexdigest()
+    return f"response:{endpoint}:{scope_id}:{role}:{version}:{query}"
+
+
+def cached_response(endpoint: str, scope: Callable[..., Scope], query_param: Optional[str] = None):
+    """
+    Cache a viewset action's 200 response data.
+    `scope(request, scope_id)` resolves the scope from the `pk` URL kwarg, or
+    from `query_param` when given. When it returns None (missing parameter,
+    no access) the view runs uncached and produces its own error.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED:
+                return method(self, request, *args, **kwargs)
+            scope_id = request.query_params.get(query_param) if query_param else kwargs.get('pk')
+            resolved = scope(request, scope_id)
+            if resolved is None:
+                return method(self, request, *args, **kwargs)
+
+            key = cache_key(endpoint, request, resolved)
+            data = cache.get(key)
+            metrics.record_cache(endpoint, data is not None)
+            if data is not None:
+                return Response(data)
+
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
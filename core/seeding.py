@@ -0,0 +1,317 @@
+"""
+Scale data generation for capacity and load testing.
+Organizations are sized on a Zipf curve (a few huge, many tiny). Rows are
+generated lazily in batches with pre-assigned ids and written with COPY on
+PostgreSQL or bulk_create elsewhere, so millions of tasks build in minutes.
+"""
+import csv
+import io
+import json
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Type
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from accounts.models import CustomUser, Notification
+from core import counters
+from orgs.models import Membership, Organization
+from projects.models import (
+    AuditLog, Project, ProjectRole, Task, TaskAttachment, TaskComment, TaskLabel,
+    TaskSection, TaskStatus, TimeEntry,
+)
+
+SCALE_PASSWORD = 'NavFlowScale123!'
+
+SECTIONS = [
+    ('To Do', 'todo', '#6b7280'),
+    ('In Progress', 'in_progress', '#3b82f6'),
+    ('In Review', 'review', '#f59e0b'),
+    ('Done', 'done', '#10b981'),
+]
+LABELS = [
+    ('Bug', '#ef4444'), ('Feature', '#6366f1'), ('Chore', '#6b7280'),
+    ('Urgent', '#f97316'), ('Design', '#ec4899'), ('Docs', '#10b981'),
+]
+STATUSES = list(TaskStatus.values)
+STATUS_WEIGHTS = [40, 25, 10, 25]
+PRIORITIES = ['low', 'medium', 'high', 'urgent']
+PRIORITY_WEIGHTS = [25, 45, 22, 8]
+ATTACHMENT_TYPES = [('image', 'png'), ('pdf', 'pdf'), ('document', 'docx'), ('video', 'mp4')]
+
+
+def zipf_weights(count: int, exponent: float) -> List[float]:
+    """Normalized weights 1/rank^exponent: rank 1 gets the largest share."""
+    raw = [1 / (rank ** exponent) for rank in range(1, count + 1)]
+    total = sum(raw)
+    return [w / total for w in raw]
+
+
+def split(total: int, weights: List[float], minimum: int = 0) -> List[int]:
+    """Apportion total across weights, each share at least minimum."""
+    shares = [max(minimum, int(total * w)) for w in weights]
+    remainder = total - sum(shares)
+    for i in range(max(0, remainder)):
+        shares[i % len(shares)] += 1
+    return shares
+
+
+class BulkWriter:
+    """
+    Buffered inserts of plain column dicts with caller-assigned primary keys.
+    Uses COPY on PostgreSQL (psycopg2 or psycopg 3) without building model
+    instances, and bulk_create otherwise.
+    """
+
+    def __init__(self, batch_size: int = 10000, use_copy: bool = True):
+        self.batch_size = batch_size
+        self.use_copy = use_copy and connection.vendor == 'postgresql'
+        self.buffers: Dict[Type[models.Model], List[Dict]] = {}
+        self.counts = Counter()
+        self._next_ids: Dict[Type[models.Model], int] = {}
+        self._columns: Dict[Type[models.Model], List] = {}
+        self.now = timezone.now()
+
+    def next_id(self, model: Type[models.Model]) -> int:
+        if model not in self._next_ids:
+            current = model.objects.aggregate(m=models.Max('pk'))['m'] or 0
+            self._next_ids[model] = current + 1
+        value = self._next_ids[model]
+        self._next_ids[model] = value + 1
+        return value
+
+    def add(self, model: Type[models.Model], **values) -> int:
+        """Queue one row keyed by attname (e.g. project_id). Returns its id."""
+        pk = values.setdefault(model._meta.pk.attname, None) or self.next_id(model)
+        values[model._meta.pk.attname] = pk
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(values)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+        return pk
+
+    def flush(self):
+        """
+        Write every buffer in one transaction. Models are written in the order
+        they were first added, which is parents before children, so each
+        commit leaves foreign keys consistent.
+        """
+        with transaction.atomic():
+            for model, rows in self.buffers.items():
+                if not rows:
+                    continue
+                if self.use_copy:
+                    self._copy(model, rows)
+                else:
+                    model.objects.bulk_create([model(**row) for row in rows], batch_size=2000)
+                self.counts[model._meta.label] += len(rows)
+                self.buffers[model] = []
+
+    def _column_spec(self, model: Type[models.Model]) -> List:
+        """(attname, default, is_json) per concrete field, computed once per model."""
+        if model not in self._columns:
+            spec = []
+            for field in model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                    default = self.now
+                else:
+                    default = field.get_default()
+                spec.append((field.attname, default, isinstance(field, models.JSONField)))
+            self._columns[model] = spec
+        return self._columns[model]
+
+    def _copy(self, model: Type[models.Model], rows: List[Dict]):
+        spec = self._column_spec(model)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            values = []
+            for attname, default, is_json in spec:
+                value = row.get(attname, default)
+                if value is None:
+                    value = '\\N'
+                elif is_json:
+                    value = json.dumps(value)
+                elif isinstance(value, datetime):
+                    value = value.isoformat()
+                values.append(value)
+            writer.writerow(values)
+        buffer.seek(0)
+
+        columns = ', '.join(connection.ops.quote_name(f.column) for f in model._meta.concrete_fields)
+        sql = f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):
+                raw.copy_expert(sql, buffer)
+            else:
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def reset_sequences(self):
+        """Move id sequences past the pre-assigned keys (no-op on SQLite)."""
+        statements = connection.ops.sequence_reset_sql(no_style(), list(self._next_ids))
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+class ScaleSeeder:
+    """
+    Generate a skewed multi-tenant dataset.
+    Task, user and project counts are split across organizations with Zipf
+    weights; each task gets labels, comments, attachments and an audit entry
+    at the configured rates.
+    """
+
+    def __init__(self, orgs: int = 100, users: int = 2000, tasks: int = 100000,
+                 tasks_per_project: int = 2000, skew: float = 1.1,
+                 comments_per_task: float = 1.5, attachment_rate: float = 0.1,
+                 notifications_per_user: int = 20, batch_size: int = 10000,
+                 use_copy: bool = True, random_seed: int = 42, progress=None):
+        self.orgs = orgs
+        self.users = max(users, orgs)
+        self.tasks = tasks
+        self.tasks_per_project = tasks_per_project
+        self.skew = skew
+        self.comments_per_task = comments_per_task
+        self.attachment_rate = attachment_rate
+        self.notifications_per_user = notifications_per_user
+        self.rng = random.Random(random_seed)
+        self.writer = BulkWriter(batch_size=batch_size, use_copy=use_copy)
+        self.progress = progress or (lambda message: None)
+        self.now = timezone.now()
+        self.password = make_password(SCALE_PASSWORD)
+        self.first_project_id = None
+
+    def run(self) -> Dict:
+        """Build the dataset. Returns {'rows': {model label: count}, 'seconds'}."""
+        started = time.monotonic()
+        weights = zipf_weights(self.orgs, self.skew)
+        users_per_org = split(self.users, weights, minimum=1)
+        tasks_per_org = split(self.tasks, weights)
+
+        for index, (member_count, task_count) in enumerate(zip(users_per_org, tasks_per_org)):
+            self._seed_org(index, member_count, task_count)
+            if index < 10 or index % 50 == 0:
+                self.progress(
+                    f"org {index + 1}/{self.orgs}: {member_count} members, {task_count} tasks "
+                    f"({sum(self.writer.counts.values())} rows so far)"
+                )
+
+        self.writer.flush()
+        self.writer.reset_sequences()
+        # Rows were written without signals; set the task counters from them
+        if self.first_project_id is not None:
+            counters.reconcile(Project.objects.filter(id__gte=self.first_project_id).values('id'))
+        return {
+            'rows': dict(sorted(self.writer.counts.items())),
+            'seconds': round(time.monotonic() - started, 1),
+        }
+
+    def _seed_org(self, index: int, member_count: int, task_count: int):
+        rng, add = self.rng, self.writer.add
+        org_id = self.writer.next_id(Organization)
+        add(Organization, id=org_id, name=f"Scale Org {org_id}", description=f"Size rank {index + 1}")
+
+        members = []
+        for i in range(member_count):
+            user_id = add(
+                CustomUser,
+                email=f"scale-{org_id}-{i}@example.com",
+                username=f"s{org_id}_{i}",
+                first_name='Scale',
+                last_name=f"User {i}",
+                password=self.password,
+                notification_email=False,
+            )
+            members.append(user_id)
+            role = Membership.OWNER if i == 0 else (Membership.ADMIN if i % 20 == 1 else Membership.MEMBER)
+            add(Membership, user_id=user_id, organization_id=org_id, role=role)
+
+        labels = [
+            add(TaskLabel, name=name, color=color, organization_id=org_id)
+            for name, color in LABELS
+        ]
+
+        owner = members[0]
+        project_count = max(1, -(-task_count // self.tasks_per_project))
+        for p, project_tasks in enumerate(split(task_count, [1 / project_count] * project_count)):
+            project_id = add(Project, name=f"Project {p + 1}", organization_id=org_id, created_by_id=owner)
+            if self.first_project_id is None:
+                self.first_project_id = project_id
+            # Big orgs staff each project with a subset of members
+            team = [owner] + rng.sample(members[1:], min(len(members) - 1, 50))
+            for user_id in team:
+                add(
+                    ProjectRole, user_id=user_id, project_id=project_id,
+                    role=ProjectRole.OWNER if user_id == owner else ProjectRole.MEMBER
+                )
+            sections = [
+                add(
+                    TaskSection, project_id=project_id, name=name, slug=slug, color=color,
+                    position=position, is_default=True, created_by_id=owner
+                )
+                for position, (name, slug, color) in enumerate(SECTIONS)
+            ]
+            self._seed_tasks(org_id, project_id, project_tasks, team, sections, labels)
+
+        for user_id in members:
+            for _ in range(self.notifications_per_user):
+                add(
+                    Notification, user_id=user_id, type='task_assigned', title='Task Assigned to You',
+                    message='You have been assigned a task', is_read=rng.random() < 0.7
+                )
+
+    def _seed_tasks(self, org_id: int, project_id: int, count: int, team: List[int],
+                    sections: List[int], labels: List[int]):
+        rng, add, now = self.rng, self.writer.add, self.now
+        through = Task.labels.through
+        for position in range(count):
+            status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+            author = rng.choice(team)
+            assignee = rng.choice(team) if rng.random() < 0.85 else None
+            minutes = rng.choice((0, 0, 15, 30, 60, 240))
+            title = f"Task {position + 1}"
+            task_id = add(
+                Task,
+                project_id=project_id,
+                title=title,
+                description='Generated for load testing',
+                status=status,
+                priority=rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+                section_id=sections[STATUSES.index(status)],
+                assigned_to_id=assignee,
+                created_by_id=author,
+                position=position,
+                due_date=now + timedelta(days=rng.randint(-30, 60)) if rng.random() < 0.6 else None,
+                completed_at=now - timedelta(days=rng.randint(0, 90)) if status == TaskStatus.DONE else None,
+                time_spent_minutes=minutes,
+            )
+            if minutes:
+                # The column caches the sum of the task's entries
+                started_at = now - timedelta(days=rng.randint(1, 30), minutes=minutes)
+                add(
+                    TimeEntry, task_id=task_id, project_id=project_id, user_id=assignee or author,
+                    started_at=started_at, ended_at=started_at + timedelta(minutes=minutes), minutes=minutes,
+                )
+            for label_id in rng.sample(labels, rng.choice((0, 1, 1, 2))):
+                add(through, task_id=task_id, tasklabel_id=label_id)
+            for _ in range(int(self.comments_per_task * 2 * rng.random() + 0.5)):
+                add(TaskComment, task_id=task_id, author_id=rng.choice(team), content='Generated comment')
+            if rng.random() < self.attachment_rate:
+                file_type, extension = rng.choice(ATTACHMENT_TYPES)
+                add(
+                    TaskAttachment, task_id=task_id, file_url=f"https://files.example.com/{task_id}.{extension}",
+                    file_name=f"file-{task_id}.{extension}", file_type=file_type,
+                    file_size=rng.randint(10_000, 5_000_000), uploaded_by_id=author
+                )
+            add(
+                AuditLog, organization_id=org_id, project_id=project_id, user_id=author,
+                action=AuditLog.ACTION_CREATE, target_type='task', target_id=task_id, target_name=title
+            )
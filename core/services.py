@@ -5,14 +5,18 @@ Follows the Single Responsibility Principle.
 """
 from typing import List, Dict, Any, Optional, Tuple
 from django.db import transaction
-from django.db.models import Q, Count, F, QuerySet
+from django.conf import settings
+from django.db.models import Q, Count, F, Value, QuerySet, DurationField, ExpressionWrapper
+from django.db.models.functions import Coalesce, Now
 from django.utils import timezone
 from django.core.cache import cache
 from datetime import timedelta
 
-from projects.models import Task, Project, TaskSection, AuditLog
+from projects.models import Task, Project, TaskSection, AuditLog, TimeEntry
 from orgs.models import Organization, Membership
 from accounts.models import CustomUser
+from core import counters
+from core.metrics import record_cache, record_fanout
 
 
 class ProjectService:
@@ -59,6 +63,7 @@ class ProjectService:
         """Get comprehensive project statistics."""
         cache_key = f'project_stats_{project.id}'
         stats = cache.get(cache_key)
+        record_cache('project_stats', stats is not None)
         
         if stats is None:
             tasks = project.tasks.all()
@@ -139,6 +144,13 @@ class TaskService:
         
         return task
     
+    # Fields bulk_update_tasks can change, and the cap on tasks per call
+    BULK_UPDATE_FIELDS = {
+        'status', 'priority', 'assigned_to', 'section', 'due_date',
+        'add_labels', 'remove_labels', 'delete',
+    }
+    BULK_MAX_TASKS = 5000
+    
     @staticmethod
     def bulk_update_tasks(
         task_ids: List[int],
@@ -147,45 +159,166 @@ class TaskService:
     ) -> Tuple[int, List[str]]:
         """
         Bulk update multiple tasks efficiently.
+        
+        update_data may contain status, priority, assigned_to (user id or None),
+        section (section id or None), due_date, add_labels / remove_labels
+        (label ids) and delete (soft delete). Access is checked with one
+        set-based query (moderator+ in every affected project); changes,
+        label links, audit entries and notifications are each written with a
+        single statement per kind.
         Returns: (updated_count, error_messages)
         """
+        from projects.models import ProjectRole, TaskLabel
+        from accounts.models import Notification
+        
         errors = []
-        updated_count = 0
+        task_ids = list(dict.fromkeys(task_ids))
+        unknown = set(update_data) - TaskService.BULK_UPDATE_FIELDS
+        if unknown:
+            return 0, [f"Unsupported fields: {', '.join(sorted(unknown))}"]
+        if not task_ids:
+            return 0, ['No tasks given']
+        if len(task_ids) > TaskService.BULK_MAX_TASKS:
+            return 0, [f'At most {TaskService.BULK_MAX_TASKS} tasks per request']
+        
+        # Validate all tasks exist and user can manage them, in one query
+        manageable_projects = ProjectRole.objects.filter(
+            user=user,
+            role__in=[ProjectRole.OWNER, ProjectRole.ADMIN, ProjectRole.MODERATOR]
+        ).values('project_id')
+        rows = list(
+            Task.objects.filter(
+                id__in=task_ids,
+                deleted_at__isnull=True,
+                project_id__in=manageable_projects
+            ).values_list('id', 'title', 'assigned_to_id', 'project_id', 'project__organization_id', 'project__name')
+        )
+        if len(rows) != len(task_ids):
+            return 0, ['Some tasks not found or not accessible']
+        
+        project_ids = {row[3] for row in rows}
+        changes = {}
+        
+        for field in ('status', 'priority'):
+            if field in update_data:
+                changes[field] = update_data[field]
+        if 'due_date' in update_data:
+            changes['due_date'] = update_data['due_date']
+        
+        assignee = None
+        if 'assigned_to' in update_data:
+            assignee_id = update_data['assigned_to']
+            if assignee_id is not None:
+                # Assignee must belong to every affected project
+                member_of = ProjectRole.objects.filter(
+                    user_id=assignee_id, project_id__in=project_ids
+                ).count()
+                if member_of != len(project_ids):
+                    return 0, ['Assignee is not a member of every affected project']
+                assignee = CustomUser.objects.get(id=assignee_id)
+            changes['assigned_to_id'] = assignee_id
+        
+        if 'section' in update_data:
+            section_id = update_data['section']
+            if section_id is not None:
+                section_project = TaskSection.objects.filter(id=section_id).values_list('project_id', flat=True).first()
+                if section_project is None or project_ids != {section_project}:
+                    return 0, ['Section must belong to the project of every task']
+            changes['section_id'] = section_id
+        
+        label_ids = set(update_data.get('add_labels') or []) | set(update_data.get('remove_labels') or [])
+        if label_ids:
+            org_ids = {row[4] for row in rows}
+            found = TaskLabel.objects.filter(id__in=label_ids).filter(
+                Q(is_default=True) | Q(organization_id__in=org_ids) | Q(project_id__in=project_ids)
+            ).count()
+            if found != len(label_ids):
+                return 0, ['Some labels not found or not accessible']
+        
+        now = timezone.now()
+        if changes.get('status') == 'done':
+            changes['completed_at'] = Coalesce('completed_at', Value(now))
+        elif 'status' in changes:
+            changes['completed_at'] = None
+        if update_data.get('delete'):
+            changes['deleted_at'] = now
         
         try:
             with transaction.atomic():
-                # Validate all tasks exist and user has access
                 tasks = Task.objects.filter(id__in=task_ids)
+                if changes.keys() & {'status', 'section_id', 'deleted_at'}:
+                    with counters.tracking(task_ids):
+                        tasks.update(updated_at=now, **changes)
+                elif changes:
+                    tasks.update(updated_at=now, **changes)
+                Project.objects.filter(id__in=project_ids).touch()
                 
-                if tasks.count() != len(task_ids):
-                    errors.append('Some tasks not found')
-                    return 0, errors
-                
-                # Check authorization
-                org_ids = set(tasks.values_list('project__organization_id', flat=True))
-                for org_id in org_ids:
-                    if not user.memberships.filter(organization_id=org_id).exists():
-                        errors.append('Unauthorized: No access to some tasks')
-                        return 0, errors
-                
-                # Perform bulk update
-                updated_count = tasks.update(**update_data)
+                label_through = Task.labels.through
+                if update_data.get('add_labels'):
+                    label_through.objects.bulk_create(
+                        [
+                            label_through(task_id=task_id, tasklabel_id=label_id)
+                            for task_id in task_ids
+                            for label_id in update_data['add_labels']
+                        ],
+                        batch_size=1000,
+                        ignore_conflicts=True
+                    )
+                if update_data.get('remove_labels'):
+                    label_through.objects.filter(
+                        task_id__in=task_ids,
+                        tasklabel_id__in=update_data['remove_labels']
+                    ).delete()
                 
-                # Log for audit trail
-                AuditLog.objects.create(
-                    organization_id=list(org_ids)[0],
-                    user=user,
-                    action='tasks_bulk_updated',
-                    resource_type='Task',
-                    details={
-                        'task_count': updated_count,
-                        'update_fields': list(update_data.keys())
-                    }
+                # Log for audit trail, one row per task
+                action = AuditLog.ACTION_DELETE if update_data.get('delete') else AuditLog.ACTION_UPDATE
+                details = {
+                    key: (value.isoformat() if hasattr(value, 'isoformat') else value)
+                    for key, value in update_data.items()
+                }
+                AuditLog.objects.bulk_create(
+                    [
+                        AuditLog(
+                            organization_id=org_id,
+                            project_id=project_id,
+                            user=user,
+                            action=action,
+                            target_type='task',
+                            target_id=task_id,
+                            target_name=title,
+                            details={'bulk': True, **details}
+                        )
+                        for task_id, title, _, project_id, org_id, _ in rows
+                    ],
+                    batch_size=1000
                 )
+                
+                # Notify a new assignee about tasks that were not theirs before
+                if assignee and assignee != user and not update_data.get('delete'):
+                    notified = Notification.objects.bulk_create(
+                        [
+                            Notification(
+                                user=assignee,
+                                type='task_assigned',
+                                title='Task Assigned to You',
+                                message=f'You have been assigned to "{title}" in {project_name}',
+                                link=f'/tasks?task={task_id}',
+                                related_task_id=task_id,
+                                related_project_id=project_id,
+                                actor_id=user.id,
+                                actor_name=user.get_full_name()
+                            )
+                            for task_id, title, assigned_to_id, project_id, _, project_name in rows
+                            if assigned_to_id != assignee.id
+                        ],
+                        batch_size=1000
+                    )
+                    record_fanout('bulk_assign', len(notified))
         except Exception as e:
             errors.append(str(e))
+            return 0, errors
         
-        return updated_count, errors
+        return len(rows), errors
     
     @staticmethod
     def get_user_tasks(
@@ -199,15 +332,15 @@ class TaskService:
         Optimized with prefetch_related and select_related.
         """
         tasks = Task.objects.filter(
-            assigned_to=user
+            assigned_to=user,
+            deleted_at__isnull=True
         ).select_related(
             'project',
             'project__organization',
             'created_by',
             'assigned_to'
         ).prefetch_related(
-            'labels',
-            'subtasks'
+            'labels'
         )
         
         if status:
@@ -291,6 +424,7 @@ class OrganizationService:
         """Get organization-wide analytics."""
         cache_key = f'org_analytics_{organization.id}'
         analytics = cache.get(cache_key)
+        record_cache('org_analytics', analytics is not None)
         
         if analytics is None:
             projects = organization.projects.all()
@@ -355,3 +489,104 @@ class UserService:
             }
         
         return data
+
+
+class TimerService:
+    """Service for running task timers."""
+    
+    SWEEP_BATCH_SIZE = 1000
+    
+    @staticmethod
+    def get_active_timers(organization: Organization, project_ids: Optional[QuerySet] = None) -> QuerySet:
+        """
+        Running timers in an organization, oldest first.
+        Elapsed time is computed by the database, so no task instances are loaded.
+        """
+        timers = Task.objects.filter(
+            is_timer_running=True,
+            deleted_at__isnull=True,
+            project__organization=organization
+        )
+        if project_ids is not None:
+            timers = timers.filter(project_id__in=project_ids)
+        
+        return timers.annotate(
+            elapsed=ExpressionWrapper(Now() - F('timer_started_at'), output_field=DurationField())
+        ).values(
+            'id', 'title', 'project_id', 'project__name', 'timer_started_at',
+            'timer_started_by_id', 'timer_started_by__username', 'elapsed'
+        ).order_by('timer_started_at')
+    
+    @staticmethod
+    def pause_stale_timers(max_minutes: Optional[int] = None) -> int:
+        """
+        Auto-pause timers running longer than max_minutes (TIMER_MAX_RUNNING_MINUTES
+        by default), crediting exactly the cap. Each batch is one UPDATE plus bulk
+        inserts of time entries and audit rows. Returns the number of timers paused.
+        """
+        max_minutes = max_minutes or settings.TIMER_MAX_RUNNING_MINUTES
+        now = timezone.now()
+        cutoff = now - timedelta(minutes=max_minutes)
+        batch_size = TimerService.SWEEP_BATCH_SIZE
+        paused = 0
+        
+        while True:
+            with transaction.atomic():
+                # Lock the task rows only, not the joined projects and organizations
+                rows = list(
+                    Task.objects.select_for_update(skip_locked=True, of=('self',)).filter(
+                        is_timer_running=True,
+                        timer_started_at__lt=cutoff
+                    ).order_by('timer_started_at').values_list(
+                        'id', 'title', 'project_id', 'project__organization_id',
+                        'timer_started_at', 'timer_started_by_id'
+                    )[:batch_size]
+                )
+                if not rows:
+                    break
+                
+                Task.objects.filter(id__in=[row[0] for row in rows]).update(
+                    is_timer_running=False,
+                    timer_started_at=None,
+                    timer_started_by=None,
+                    time_spent_minutes=F('time_spent_minutes') + max_minutes,
+                    updated_at=now
+                )
+                Project.objects.filter(id__in={row[2] for row in rows}).touch()
+                TimeEntry.objects.bulk_create([
+                    TimeEntry(
+                        task_id=task_id,
+                        project_id=project_id,
+                        user_id=user_id,
+                        started_at=started_at,
+                        ended_at=started_at + timedelta(minutes=max_minutes),
+                        minutes=max_minutes,
+                        source=TimeEntry.SOURCE_AUTO_PAUSED
+                    )
+                    for task_id, _, project_id, _, started_at, user_id in rows
+                ])
+                AuditLog.objects.bulk_create([
+                    AuditLog(
+                        organization_id=org_id,
+                        project_id=project_id,
+                        user_id=user_id,
+                        action=AuditLog.ACTION_TIMER_PAUSED,
+                        target_type='task',
+                        target_id=task_id,
+                        target_name=title,
+                        details={
+                            'task_id': task_id,
+                            'task_title': title,
+                            'elapsed_minutes': max_minutes,
+                            'running_minutes': int((now - started_at).total_seconds() / 60),
+                            'auto_paused': True,
+                        }
+                    )
+                    for task_id, title, project_id, org_id, started_at, user_id in rows
+                ])
+            
+            paused += len(rows)
+            if len(rows) < batch_size:
+                break
+        
+        return paused
@@ -1,10 +1,11 @@
 """
 Celery configuration and async task definitions.
 Handles background jobs, notifications, and automation workflows.
+Without a configured broker (or without Celery installed) the same tasks run
+on the in-process executor in core.background.
 """
 import os
-from celery import Celery
-from celery.schedules import crontab
+from django.conf import settings
 from django.core.mail import send_mail
 from django.utils import timezone
 from datetime import timedelta
@@ -12,9 +13,19 @@ from datetime import timedelta
 # Set default Django settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'navflow.settings')
 
-app = Celery('navflow')
-app.config_from_object('django.conf:settings', namespace='CELERY')
-app.autodiscover_tasks()
+try:
+    from celery import Celery
+    from celery.schedules import crontab
+except ImportError:
+    Celery = None
+
+if Celery is not None and settings.CELERY_BROKER_URL:
+    app = Celery('navflow')
+    app.config_from_object('django.conf:settings', namespace='CELERY')
+    app.autodiscover_tasks()
+else:
+    from core.background import LocalApp, crontab
+    app = LocalApp('navflow')
 
 
 # ================================
@@ -24,79 +35,33 @@ app.autodiscover_tasks()
 @app.task(bind=True)
 def send_daily_digest(self):
     """Send daily digest email to all users with pending tasks."""
-    from projects.models import Task
-    from accounts.models import CustomUser
-    from core.services import TaskService
+    from core.digest import send_daily_digest as deliver_digest
     
-    users = CustomUser.objects.filter(notification_email=True, is_deleted=False)
-    
-    for user in users:
-        tasks = TaskService.get_user_tasks(user, days_ahead=1)
-        
-        if tasks.exists():
-            task_list = '\n'.join([f"- {t.title} (Due: {t.due_date})" for t in tasks])
-            
-            send_mail(
-                subject=f"Your Daily Task Digest - {timezone.now().strftime('%B %d')}",
-                message=f"You have {tasks.count()} tasks due today:\n\n{task_list}",
-                from_email=os.getenv('DEFAULT_FROM_EMAIL', 'noreply@navflow.app'),
-                recipient_list=[user.email],
-                fail_silently=True,
-            )
+    return deliver_digest()
 
 
 @app.task(bind=True)
 def find_and_notify_overdue_tasks(self):
-    """Find overdue tasks and notify assignees."""
-    from projects.models import Task, Notification
-    from orgs.models import Organization
-    from core.services import TaskService
-    
-    organizations = Organization.objects.all()
+    """Notify assignees of tasks that became overdue since the last run."""
+    from core.overdue import notify_newly_overdue
     
-    for org in organizations:
-        overdue_tasks = TaskService.get_overdue_tasks(org)
-        
-        for task in overdue_tasks:
-            if task.assigned_to and task.assigned_to.notification_email:
-                # Create notification
-                Notification.objects.get_or_create(
-                    user=task.assigned_to,
-                    task=task,
-                    notification_type='overdue',
-                    defaults={'message': f"Task '{task.title}' is overdue"}
-                )
-                
-                # Send email
-                send_mail(
-                    subject=f"Overdue Task: {task.title}",
-                    message=f"The task '{task.title}' is now overdue. Please take action.",
-                    from_email=os.getenv('DEFAULT_FROM_EMAIL', 'noreply@navflow.app'),
-                    recipient_list=[task.assigned_to.email],
-                    fail_silently=True,
-                )
+    return notify_newly_overdue()
 
 
 @app.task(bind=True)
 def cleanup_soft_deleted_records(self):
-    """Permanently delete soft-deleted records older than 30 days."""
-    from django.db.models import Q
-    from projects.models import Task
-    from accounts.models import CustomUser
-    
-    cutoff_date = timezone.now() - timedelta(days=30)
+    """Permanently delete soft-deleted records past the retention period."""
+    from core.purge import purge_soft_deleted
     
-    # Delete soft-deleted tasks
-    Task.objects.filter(
-        is_deleted=True,
-        deleted_at__lt=cutoff_date
-    ).hard_delete()
+    return purge_soft_deleted()
+
+
+@app.task(bind=True)
+def pause_stale_timers(self):
+    """Auto-pause timers left running past TIMER_MAX_RUNNING_MINUTES."""
+    from core.services import TimerService
     
-    # Delete soft-deleted users
-    CustomUser.objects.filter(
-        is_deleted=True,
-        deleted_at__lt=cutoff_date
-    ).delete()
+    return TimerService.pause_stale_timers()
 
 
 @app.task(bind=True)
@@ -123,33 +88,36 @@ def generate_organization_report(self, org_id: int):
 # ================================
 
 @app.task(bind=True)
-def send_task_assigned_notification(self, task_id: int):
-    """Send notification when task is assigned."""
-    from projects.models import Task, Notification
+def send_task_assigned_notification(self, task_id: int, actor_id: int = None):
+    """Notify and email a task's assignee that the task was assigned to them."""
+    from projects.models import Task
+    from accounts.models import CustomUser, Notification
     
-    try:
-        task = Task.objects.get(id=task_id)
-        
-        if task.assigned_to and task.assigned_to.notification_email:
-            # Create notification
-            Notification.objects.create(
-                user=task.assigned_to,
-                task=task,
-                notification_type='assigned',
-                message=f"You've been assigned to '{task.title}'"
-            )
-            
-            # Send email
-            send_mail(
-                subject=f"New Task Assigned: {task.title}",
-                message=f"You've been assigned to task: {task.title}\n\nPriority: {task.priority}\nDue: {task.due_date}",
-                from_email=os.getenv('DEFAULT_FROM_EMAIL', 'noreply@navflow.app'),
-                recipient_list=[task.assigned_to.email],
-                fail_silently=True,
-            )
+    task = Task.objects.select_related('project', 'assigned_to').filter(id=task_id).first()
+    if not task or not task.assigned_to:
+        return
     
-    except Task.DoesNotExist:
-        pass
+    actor = CustomUser.objects.filter(id=actor_id).first() if actor_id else None
+    Notification.objects.create(
+        user=task.assigned_to,
+        type='task_assigned',
+        title='Task Assigned to You',
+        message=f'You have been assigned to "{task.title}" in {task.project.name}',
+        link=f'/tasks?task={task.id}',
+        related_task_id=task.id,
+        related_project_id=task.project_id,
+        actor_id=actor.id if actor else None,
+        actor_name=actor.get_full_name() if actor else None
+    )
+    
+    if task.assigned_to.notification_email:
+        send_mail(
+            subject=f"New Task Assigned: {task.title}",
+            message=f"You've been assigned to task: {task.title}\n\nPriority: {task.priority}\nDue: {task.due_date}",
+            from_email=os.getenv('DEFAULT_FROM_EMAIL', 'noreply@navflow.app'),
+            recipient_list=[task.assigned_to.email],
+            fail_silently=True,
+        )
 
 
 @app.task(bind=True)
@@ -182,39 +150,34 @@ def send_project_invitation_email(self, membership_id: int):
 
 
 @app.task(bind=True)
-def bulk_export_tasks(self, project_id: int, user_id: int, format_type: str = 'csv'):
-    """Generate bulk task export (CSV/Excel)."""
-    from projects.models import Task
-    from accounts.models import CustomUser
-    import csv
+def bulk_export_tasks(self, project_id: int = None, user_id: int = None, format_type: str = 'csv', export_id: int = None):
+    """
+    Export a project's tasks to a gzipped CSV/JSONL file and email the link.
+    Pass export_id to run an existing TaskExport job, or project_id/user_id to create one.
+    """
+    from projects.models import TaskExport
+    from core.exports import run_export, notify_export_ready
     
-    try:
-        user = CustomUser.objects.get(id=user_id)
-        tasks = Task.objects.filter(project_id=project_id)
-        
-        # Generate CSV
-        if format_type == 'csv':
-            filename = f"tasks_export_{project_id}_{timezone.now().timestamp()}.csv"
-            # Implementation would write to storage and send email link
-            
-            send_mail(
-                subject="Your task export is ready",
-                message=f"Your export is ready: {filename}",
-                from_email=os.getenv('DEFAULT_FROM_EMAIL', 'noreply@navflow.app'),
-                recipient_list=[user.email],
-                fail_silently=True,
-            )
+    if export_id is None:
+        export = TaskExport.objects.create(
+            project_id=project_id,
+            requested_by_id=user_id,
+            format=format_type
+        )
+    else:
+        try:
+            export = TaskExport.objects.select_related('project', 'requested_by').get(id=export_id)
+        except TaskExport.DoesNotExist:
+            return
     
-    except Exception as e:
-        print(f"Export failed: {str(e)}")
+    export = run_export(export)
+    notify_export_ready(export)
 
 
 # ================================
 # Celery Beat Schedule
 # ================================
 
-from celery.schedules import crontab
-
 app.conf.beat_schedule = {
     'send-daily-digest': {
         'task': 'core.tasks.send_daily_digest',
@@ -224,6 +187,10 @@ app.conf.beat_schedule = {
         'task': 'core.tasks.find_and_notify_overdue_tasks',
         'schedule': crontab(minute=0),  # Every hour
     },
+    'pause-stale-timers': {
+        'task': 'core.tasks.pause_stale_timers',
+        'schedule': crontab(minute='*/15'),  # Every 15 minutes
+    },
     'cleanup-deleted-records': {
         'task': 'core.tasks.cleanup_soft_deleted_records',
         'schedule': crontab(hour=2, minute=0),  # 2 AM daily
@@ -2,32 +2,52 @@
 Multi-tenant context and middleware for SaaS architecture.
 Handles tenant isolation and organization-scoped data access.
 """
-import threading
-from typing import Optional
+import contextvars
+import logging
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.http import JsonResponse
 from orgs.models import Organization
 
-# Thread-local storage for current tenant context
-_tenant_context = threading.local()
+logger = logging.getLogger(__name__)
+
+# Current tenant. A ContextVar rather than a thread-local: under ASGI one
+# thread serves many requests and one request can hop threads, while
+# asgiref's sync_to_async/async_to_sync carry the context across
+_current_organization: contextvars.ContextVar[Optional[Organization]] = contextvars.ContextVar(
+    'tenant_organization', default=None
+)
 
 
 class TenantContext:
-    """Thread-safe tenant context manager."""
+    """Request-scoped tenant context, safe in sync and async code."""
     
     @staticmethod
-    def set_tenant(organization: Optional[Organization]):
-        """Set current tenant in thread-local storage."""
-        _tenant_context.organization = organization
+    def set_tenant(organization: Optional[Organization]) -> contextvars.Token:
+        """Set the current tenant; the token restores the previous one."""
+        return _current_organization.set(organization)
     
     @staticmethod
     def get_tenant() -> Optional[Organization]:
-        """Get current tenant from thread-local storage."""
-        return getattr(_tenant_context, 'organization', None)
+        """Get the current tenant."""
+        return _current_organization.get()
     
     @staticmethod
     def clear_tenant():
         """Clear tenant context."""
-        _tenant_context.organization = None
+        _current_organization.set(None)
+    
+    @staticmethod
+    @contextmanager
+    def use(organization: Optional[Organization]):
+        """Make `organization` the tenant for the enclosed code, then restore."""
+        token = _current_organization.set(organization)
+        try:
+            yield organization
+        finally:
+            _current_organization.reset(token)
 
 
 class MultiTenantMiddleware:
@@ -40,59 +60,67 @@ class MultiTenantMiddleware:
     
     Sets tenant context for the entire request lifecycle.
     Gracefully handles requests without organization context.
+    Works in sync and async middleware chains.
     """
+    sync_capable = True
+    async_capable = True
     
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
     
     def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        organization, error = self._resolve(request)
+        if error is not None:
+            return error
+        with TenantContext.use(organization):
+            return self.get_response(request)
+    
+    async def __acall__(self, request):
+        # The lookups touch request.user and the ORM, which are sync-only
+        organization, error = await sync_to_async(self._resolve)(request)
+        if error is not None:
+            return error
+        with TenantContext.use(organization):
+            return await self.get_response(request)
+    
+    def _resolve(self, request) -> Tuple[Optional[Organization], Optional[JsonResponse]]:
+        """(tenant organization, error response) for the request."""
         try:
-            # Extract organization
             org_id = self._get_org_id(request)
             
             if org_id:
                 try:
                     # Verify user has access to this organization
                     organization = Organization.objects.get(id=org_id)
-                    
-                    # Check if user is member of organization
-                    if request.user.is_authenticated:
-                        if not request.user.memberships.filter(organization=organization).exists():
-                            TenantContext.clear_tenant()
-                            return JsonResponse(
-                                {'error': 'Unauthorized: No access to this organization'},
-                                status=403
-                            )
-                    
-                    TenantContext.set_tenant(organization)
-                    request.organization = organization
                 except Organization.DoesNotExist:
-                    TenantContext.clear_tenant()
-                    return JsonResponse({'error': 'Organization not found'}, status=404)
-            elif request.user.is_authenticated:
-                # Try to use user's first organization as default (optional)
-                try:
-                    first_org = request.user.memberships.select_related('organization').first()
-                    if first_org:
-                        TenantContext.set_tenant(first_org.organization)
-                        request.organization = first_org.organization
-                except Exception:
-                    # If there's any issue, just proceed without tenant context
-                    pass
+                    return None, JsonResponse({'error': 'Organization not found'}, status=404)
+                
+                # Check if user is member of organization
+                if request.user.is_authenticated:
+                    if not request.user.memberships.filter(organization=organization).exists():
+                        return None, JsonResponse(
+                            {'error': 'Unauthorized: No access to this organization'},
+                            status=403
+                        )
+                
+                request.organization = organization
+                return organization, None
             
-            response = self.get_response(request)
-            TenantContext.clear_tenant()
-            return response
+            if request.user.is_authenticated:
+                # Use user's first organization as default (optional)
+                first_org = request.user.memberships.select_related('organization').first()
+                if first_org:
+                    request.organization = first_org.organization
+                    return first_org.organization, None
         except Exception as e:
-            # Log the error and proceed
-            import logging
-            logger = logging.getLogger(__name__)
+            # Log the error and proceed without tenant context
             logger.error(f"MultiTenantMiddleware error: {str(e)}")
-            TenantContext.clear_tenant()
-            
-            response = self.get_response(request)
-            TenantContext.clear_tenant()
-            return response
+        return None, None
     
     def _get_org_id(self, request) -> Optional[int]:
         """Extract organization ID from request."""
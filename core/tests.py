@@ -8,6 +8,7 @@ from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from datetime import timedelta
+import json
 
 from projects.models import Project, Task, TaskSection, AuditLog
 from orgs.models import Organization, Membership
@@ -218,6 +219,26 @@ class TenantContextTests(TestCase):
         
         current = TenantContext.get_tenant()
         self.assertIsNone(current)
+    
+    def test_tenant_isolated_between_async_tasks(self):
+        """Test concurrent tasks each see their own tenant and use() restores the outer one."""
+        import asyncio
+        
+        async def request(org, seen):
+            with TenantContext.use(org):
+                await asyncio.sleep(0)
+                seen.append(TenantContext.get_tenant())
+        
+        async def main():
+            seen1, seen2 = [], []
+            with TenantContext.use(self.org1):
+                await asyncio.gather(request(self.org2, seen2), request(None, seen1))
+                return seen1, seen2, TenantContext.get_tenant()
+        
+        seen1, seen2, outer = asyncio.run(main())
+        self.assertEqual(seen1, [None])
+        self.assertEqual(seen2, [self.org2])
+        self.assertEqual(outer, self.org1)
 
 
 class APITests(APITestCase):
@@ -364,3 +385,1795 @@ class IntegrationTests(TestCase):
         # Verify audit trail
         logs = AuditLog.objects.filter(organization=org)
         self.assertGreaterEqual(logs.count(), 3)
+
+
+class ProjectListQueryTests(APITestCase):
+    """Project list should not run per-project queries."""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            username='testuser',
+            password='testpass123'
+        )
+        self.org = Organization.objects.create(name="Test Org")
+        Membership.objects.create(user=self.user, organization=self.org, role=Membership.OWNER)
+        self.client.force_authenticate(self.user)
+    
+    def _create_projects(self, count, start=0):
+        from projects.models import ProjectRole
+        for i in range(start, start + count):
+            project = Project.objects.create(name=f"Project {i}", organization=self.org, created_by=self.user)
+            ProjectRole.objects.create(user=self.user, project=project, role=ProjectRole.OWNER)
+            Task.objects.create(title="Live", project=project)
+            Task.objects.create(title="Gone", project=project, deleted_at=timezone.now())
+    
+    def test_list_query_count_is_constant(self):
+        """Test project list costs the same number of queries for 1 or 10 projects."""
+        # ETag validators, count, page and owner prefetch
+        self._create_projects(1)
+        with self.assertNumQueries(4):
+            self.client.get('/api/v1/projects/')
+        
+        self._create_projects(9, start=1)
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/v1/projects/')
+        self.assertEqual(response.data['count'], 10)
+    
+    def test_list_counts_exclude_deleted_tasks(self):
+        """Test task_count skips soft-deleted tasks and owner/role are resolved."""
+        self._create_projects(1)
+        response = self.client.get('/api/v1/projects/')
+        row = response.data['results'][0]
+        
+        self.assertEqual(row['task_count'], 1)
+        self.assertEqual(row['member_count'], 1)
+        self.assertEqual(row['owner_email'], self.user.email)
+        self.assertEqual(row['user_role'], 'owner')
+
+
+class ProjectAccessSyncTests(TestCase):
+    """Tests for diff-based member project access sync."""
+    
+    def setUp(self):
+        from projects.models import ProjectRole
+        self.owner = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.member = User.objects.create_user(email='member@example.com', username='member', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        Membership.objects.create(user=self.owner, organization=self.org, role=Membership.OWNER)
+        self.membership = Membership.objects.create(user=self.member, organization=self.org, role=Membership.MEMBER)
+        self.projects = [
+            Project.objects.create(name=f"Project {i}", organization=self.org, created_by=self.owner)
+            for i in range(3)
+        ]
+        self.kept = ProjectRole.objects.create(user=self.member, project=self.projects[0], role=ProjectRole.MODERATOR)
+        ProjectRole.objects.create(user=self.member, project=self.projects[1], role=ProjectRole.MEMBER)
+    
+    def test_sync_applies_diff_and_keeps_unchanged_roles(self):
+        """Test sync adds/removes only the difference and preserves kept roles."""
+        from projects.models import ProjectRole
+        from projects.services import ProjectAccessService
+        
+        result = ProjectAccessService.sync_member_projects(
+            self.org, {self.membership: [self.projects[0].id, self.projects[2].id]}
+        )
+        
+        self.assertEqual(result, {'added': 1, 'removed': 1, 'unchanged': 1})
+        kept = ProjectRole.objects.get(id=self.kept.id)
+        self.assertEqual(kept.role, ProjectRole.MODERATOR)
+        self.assertEqual(
+            set(ProjectRole.objects.filter(user=self.member).values_list('project_id', flat=True)),
+            {self.projects[0].id, self.projects[2].id}
+        )
+    
+    def test_sync_rejects_foreign_projects(self):
+        """Test projects from another organization are rejected."""
+        from django.core.exceptions import ValidationError
+        from projects.services import ProjectAccessService
+        other_org = Organization.objects.create(name="Other Org")
+        foreign = Project.objects.create(name="Foreign", organization=other_org)
+        
+        with self.assertRaises(ValidationError):
+            ProjectAccessService.sync_member_projects(self.org, {self.membership: [foreign.id]})
+    
+    def test_bulk_endpoint(self):
+        """Test bulk endpoint syncs several members in one call."""
+        from projects.models import ProjectRole
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        
+        response = client.post(
+            f'/api/v1/orgs/{self.org.id}/members/projects/bulk-update/',
+            {'members': [
+                {'user_email': 'member@example.com', 'project_ids': [self.projects[2].id]},
+                {'user_email': 'owner@example.com', 'project_ids': [p.id for p in self.projects]},
+            ]},
+            format='json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['added'], 4)
+        self.assertEqual(response.data['removed'], 2)
+        self.assertEqual(ProjectRole.objects.filter(user=self.owner, role=ProjectRole.OWNER).count(), 3)
+
+
+class BulkTaskEndpointTests(APITestCase):
+    """Tests for the /tasks/bulk/ endpoint."""
+    
+    def setUp(self):
+        from projects.models import ProjectRole, TaskLabel
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.assignee = User.objects.create_user(email='dev@example.com', username='dev', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        self.project = Project.objects.create(name="Test Project", organization=self.org, created_by=self.user)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        ProjectRole.objects.create(user=self.assignee, project=self.project, role=ProjectRole.MEMBER)
+        self.label = TaskLabel.objects.create(name="Triage", project=self.project)
+        self.tasks = [Task.objects.create(title=f"Task {i}", project=self.project) for i in range(5)]
+        self.client.force_authenticate(self.user)
+    
+    def test_bulk_update(self):
+        """Test status, assignee and labels are applied to every task with audit and notifications."""
+        from accounts.models import Notification
+        response = self.client.post('/api/v1/tasks/bulk/', {
+            'task_ids': [t.id for t in self.tasks],
+            'status': 'done',
+            'assigned_to': self.assignee.id,
+            'add_labels': [self.label.id],
+        }, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 5)
+        self.assertEqual(Task.objects.filter(status='done', assigned_to=self.assignee, completed_at__isnull=False).count(), 5)
+        self.assertEqual(self.label.tasks.count(), 5)
+        self.assertEqual(AuditLog.objects.filter(target_type='task', action='update').count(), 5)
+        self.assertEqual(Notification.objects.filter(user=self.assignee).count(), 5)
+    
+    def test_bulk_soft_delete(self):
+        """Test delete flag soft-deletes tasks."""
+        response = self.client.post('/api/v1/tasks/bulk/', {
+            'task_ids': [self.tasks[0].id, self.tasks[1].id],
+            'delete': True,
+        }, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.get_active().count(), 3)
+    
+    def test_bulk_without_a_real_change_is_rejected(self):
+        """Test no-op payloads write no audit rows or version bumps."""
+        version = Project.objects.get(pk=self.project.pk).version
+        task_ids = [t.id for t in self.tasks]
+        for noop in ({}, {'delete': False}, {'add_labels': []}, {'remove_labels': [], 'delete': False}):
+            response = self.client.post('/api/v1/tasks/bulk/', {'task_ids': task_ids, **noop}, format='json')
+            self.assertEqual(response.status_code, 400, noop)
+        self.assertFalse(AuditLog.objects.filter(target_type='task', action='update').exists())
+        self.assertEqual(Project.objects.get(pk=self.project.pk).version, version)
+        
+        response = self.client.post('/api/v1/tasks/bulk/', {'task_ids': task_ids, 'due_date': None}, format='json')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_bulk_requires_moderator(self):
+        """Test members cannot bulk update tasks."""
+        self.client.force_authenticate(self.assignee)
+        response = self.client.post('/api/v1/tasks/bulk/', {
+            'task_ids': [self.tasks[0].id],
+            'priority': 'high',
+        }, format='json')
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Task.objects.filter(priority='high').exists())
+
+
+class TaskImportTests(APITestCase):
+    """Tests for streaming CSV/JSONL task import."""
+    
+    def setUp(self):
+        from projects.models import ProjectRole, TaskLabel
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.dev = User.objects.create_user(email='dev@example.com', username='dev', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        self.project = Project.objects.create(name="Test Project", organization=self.org, created_by=self.user)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        ProjectRole.objects.create(user=self.dev, project=self.project, role=ProjectRole.MEMBER)
+        TaskSection.objects.create(project=self.project, name="Backlog", slug="backlog")
+        self.label = TaskLabel.objects.create(name="Bug", project=self.project)
+        self.client.force_authenticate(self.user)
+    
+    def test_csv_import_reports_row_errors(self):
+        """Test valid rows are inserted with labels and invalid rows are reported."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        content = (
+            "title,status,priority,assignee,section,labels,due_date\n"
+            "Fix login,in_progress,high,dev,backlog,Bug,2030-01-01\n"
+            ",todo,low,,,,\n"
+            "Write docs,todo,medium,nobody,,,\n"
+            "Ship it,done,urgent,,Backlog,,\n"
+        )
+        upload = SimpleUploadedFile('tasks.csv', content.encode(), content_type='text/csv')
+        
+        response = self.client.post('/api/v1/tasks/import/', {'file': upload, 'project_id': self.project.id})
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([e['row'] for e in response.data['errors']], [2, 3])
+        task = Task.objects.get(title='Fix login')
+        self.assertEqual(task.assigned_to, self.dev)
+        self.assertEqual(task.section.slug, 'backlog')
+        self.assertEqual(list(task.labels.all()), [self.label])
+        self.assertIsNotNone(Task.objects.get(title='Ship it').completed_at)
+    
+    def test_jsonl_import_in_chunks(self):
+        """Test JSONL import across several chunks, including a malformed line."""
+        import io
+        from core.imports import TaskImporter
+        lines = [json.dumps({'title': f'Task {i}', 'labels': ['bug']}) for i in range(25)]
+        lines.insert(5, '{not json')
+        
+        result = TaskImporter(self.project, self.user, chunk_size=10).run(io.StringIO('\n'.join(lines)), 'jsonl')
+        
+        self.assertEqual(result['created'], 25)
+        self.assertEqual(result['errors'][0]['row'], 6)
+        self.assertEqual(self.label.tasks.count(), 25)
+    
+    def test_impossible_dates_and_unreadable_files(self):
+        """Test an impossible date is a row error and undecodable bytes a 400, not a crash."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        upload = SimpleUploadedFile('tasks.csv', b"title,due_date\nLeap,2024-02-30\nOk,2024-02-28\n")
+        response = self.client.post('/api/v1/tasks/import/', {'file': upload, 'project_id': self.project.id})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['errors'], [{'row': 1, 'errors': ["invalid due_date '2024-02-30'"]}])
+        
+        upload = SimpleUploadedFile('tasks.csv', b"title\n\xff\xfe broken\n")
+        response = self.client.post('/api/v1/tasks/import/', {'file': upload, 'project_id': self.project.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Could not read the file', response.data['detail'])
+    
+    def test_import_requires_moderator(self):
+        """Test members cannot import tasks."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        self.client.force_authenticate(self.dev)
+        upload = SimpleUploadedFile('tasks.csv', b"title\nA\n")
+        
+        response = self.client.post('/api/v1/tasks/import/', {'file': upload, 'project_id': self.project.id})
+        
+        self.assertEqual(response.status_code, 403)
+
+
+class TaskExportTests(APITestCase):
+    """Tests for streaming and background task export."""
+    
+    def setUp(self):
+        from projects.models import ProjectRole, TaskLabel
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.outsider = User.objects.create_user(email='out@example.com', username='outsider', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        self.project = Project.objects.create(name="Test Project", organization=self.org, created_by=self.user)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        label = TaskLabel.objects.create(name="Bug", organization=self.org)
+        for i in range(5):
+            task = Task.objects.create(title=f"Task {i}", project=self.project, created_by=self.user, assigned_to=self.user)
+            task.labels.add(label)
+        Task.objects.create(title="Gone", project=self.project, created_by=self.user, deleted_at=timezone.now())
+        self.client.force_authenticate(self.user)
+    
+    def test_stream_csv_round_trips_through_import(self):
+        """Test streamed CSV skips deleted tasks and can be imported again."""
+        import io
+        from core.imports import TaskImporter
+        response = self.client.get('/api/v1/tasks/export/', {'project_id': self.project.id})
+        
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(len(content.strip().splitlines()), 6)
+        self.assertNotIn('Gone', content)
+        
+        other = Project.objects.create(name="Copy", organization=self.org, created_by=self.user)
+        from projects.models import ProjectRole
+        ProjectRole.objects.create(user=self.user, project=other, role=ProjectRole.OWNER)
+        result = TaskImporter(other, self.user).run(io.StringIO(content), 'csv')
+        self.assertEqual(result['created'], 5)
+    
+    def test_stream_jsonl_in_chunks(self):
+        """Test JSONL export yields one record per task across chunks."""
+        from core.exports import iter_export
+        chunks = list(iter_export(self.project.id, 'jsonl', chunk_size=2))
+        
+        self.assertEqual(len(chunks), 3)
+        records = [json.loads(line) for line in ''.join(chunks).splitlines()]
+        self.assertEqual([r['title'] for r in records], [f"Task {i}" for i in range(5)])
+        self.assertEqual(records[0]['labels'], ['Bug'])
+        self.assertEqual(records[0]['assignee'], 'owner')
+    
+    def test_background_export_writes_gzip(self):
+        """Test large exports return a job, and the job writes a gzipped file."""
+        import gzip
+        import tempfile
+        from django.test import override_settings
+        from projects.models import TaskExport
+        from core.exports import run_export
+        
+        with tempfile.TemporaryDirectory() as root, override_settings(EXPORTS_ROOT=root, TASK_EXPORT_STREAM_MAX_ROWS=3):
+            response = self.client.get('/api/v1/tasks/export/', {'project_id': self.project.id, 'export_format': 'jsonl'})
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.data['status'], TaskExport.STATUS_PENDING)
+            
+            export = run_export(TaskExport.objects.get(id=response.data['id']), chunk_size=2)
+            self.assertEqual(export.status, TaskExport.STATUS_COMPLETED)
+            self.assertEqual((export.total_rows, export.rows_written, export.progress), (5, 5, 100))
+            with gzip.open(export.file_path, 'rt') as f:
+                self.assertEqual(len(f.read().splitlines()), 5)
+            
+            status_response = self.client.get(f'/api/v1/tasks/exports/{export.id}/')
+            self.assertEqual(status_response.data['download_url'], f'/api/v1/tasks/exports/{export.id}/download/')
+            download = self.client.get(f'/api/v1/tasks/exports/{export.id}/download/')
+            self.assertEqual(download.status_code, 200)
+            download.close()
+    
+    def test_non_member_cannot_export(self):
+        """Test users outside the project cannot export or see jobs."""
+        self.client.force_authenticate(self.outsider)
+        response = self.client.get('/api/v1/tasks/export/', {'project_id': self.project.id})
+        self.assertEqual(response.status_code, 403)
+
+
+class TimeEntryTests(APITestCase):
+    """Tests for append-only time entries and timesheet aggregation."""
+    
+    def setUp(self):
+        from projects.models import ProjectRole
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.dev = User.objects.create_user(email='dev@example.com', username='dev', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        self.project = Project.objects.create(name="Test Project", organization=self.org, created_by=self.user)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        ProjectRole.objects.create(user=self.dev, project=self.project, role=ProjectRole.MEMBER)
+        self.task = Task.objects.create(title="Timed", project=self.project, created_by=self.user)
+        self.client.force_authenticate(self.user)
+    
+    def test_timer_endpoints_write_entries(self):
+        """Test stop, add_time and reset append entries and keep the cache in sync."""
+        from projects.models import TimeEntry
+        Task.objects.filter(id=self.task.id).update(
+            is_timer_running=True,
+            timer_started_at=timezone.now() - timedelta(minutes=30)
+        )
+        self.client.post(f'/api/v1/tasks/{self.task.id}/stop_timer/')
+        self.client.post(f'/api/v1/tasks/{self.task.id}/add_time/', {'minutes': 15})
+        
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.time_spent_minutes, 45)
+        self.assertEqual(
+            sorted(TimeEntry.objects.filter(task=self.task).values_list('source', 'minutes')),
+            [('manual', 15), ('timer', 30)]
+        )
+        
+        self.client.post(f'/api/v1/tasks/{self.task.id}/reset_timer/')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.time_spent_minutes, 0)
+        self.assertEqual(TimeEntry.objects.filter(task=self.task).count(), 3)
+        self.assertEqual(self.task.recalculate_time_spent(), 0)
+    
+    def test_timesheet_groups_by_user_project_and_day(self):
+        """Test timesheets aggregate in one grouped query and members only see their own time."""
+        self.task.add_time(60, user=self.user)
+        self.task.add_time(30, user=self.user)
+        self.task.add_time(20, user=self.dev)
+        
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/timesheets/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_minutes'], 110)
+        by_user = {row['username']: row for row in response.data['rows']}
+        self.assertEqual((by_user['owner']['minutes'], by_user['owner']['entries']), (90, 2))
+        
+        self.client.force_authenticate(self.dev)
+        response = self.client.get('/api/v1/timesheets/', {'start': '2000-01-01'})
+        self.assertEqual([row['username'] for row in response.data['rows']], ['dev'])
+        
+        response = self.client.get('/api/v1/timesheets/', {'start': 'soon'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_resets_stay_out_of_timesheets_and_totals_are_read_only(self):
+        """Test a reset keeps the workers' hours and PATCH cannot set time_spent_minutes."""
+        self.task.add_time(60, user=self.dev)
+        self.client.post(f'/api/v1/tasks/{self.task.id}/reset_timer/')
+        response = self.client.get('/api/v1/timesheets/')
+        self.assertEqual(response.data['total_minutes'], 60)
+        self.assertEqual([row['username'] for row in response.data['rows']], ['dev'])
+        
+        self.client.patch(f'/api/v1/tasks/{self.task.id}/', {'time_spent_minutes': 500}, format='json')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.time_spent_minutes, 0)
+
+
+class RunningTimerTests(APITestCase):
+    """Tests for the active timers dashboard and stale timer sweeper."""
+    
+    def setUp(self):
+        from projects.models import ProjectRole
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        Membership.objects.create(user=self.user, organization=self.org, role=Membership.OWNER)
+        self.project = Project.objects.create(name="Test Project", organization=self.org, created_by=self.user)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        now = timezone.now()
+        self.fresh = Task.objects.create(
+            title="Fresh", project=self.project, created_by=self.user, is_timer_running=True,
+            timer_started_at=now - timedelta(minutes=10), timer_started_by=self.user
+        )
+        self.stale = Task.objects.create(
+            title="Stale", project=self.project, created_by=self.user, is_timer_running=True,
+            timer_started_at=now - timedelta(days=3), timer_started_by=self.user
+        )
+        self.client.force_authenticate(self.user)
+    
+    def test_active_timers_compute_elapsed(self):
+        """Test active timers are listed oldest first with elapsed time from SQL."""
+        response = self.client.get('/api/v1/timers/active/', {'organization_id': self.org.id})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t['title'] for t in response.data], ['Stale', 'Fresh'])
+        self.assertEqual(response.data[0]['username'], 'owner')
+        self.assertAlmostEqual(response.data[1]['elapsed_seconds'], 600, delta=30)
+    
+    def test_sweeper_pauses_stale_timers_at_cap(self):
+        """Test stale timers are paused with the cap credited and audited."""
+        from core.services import TimerService
+        from projects.models import TimeEntry
+        
+        self.assertEqual(TimerService.pause_stale_timers(max_minutes=60), 1)
+        
+        self.stale.refresh_from_db()
+        self.fresh.refresh_from_db()
+        self.assertFalse(self.stale.is_timer_running)
+        self.assertEqual(self.stale.time_spent_minutes, 60)
+        self.assertTrue(self.fresh.is_timer_running)
+        entry = TimeEntry.objects.get(task=self.stale)
+        self.assertEqual((entry.minutes, entry.source, entry.user), (60, TimeEntry.SOURCE_AUTO_PAUSED, self.user))
+        self.assertTrue(AuditLog.objects.get(target_id=self.stale.id).details['auto_paused'])
+        self.assertEqual(TimerService.pause_stale_timers(max_minutes=60), 0)
+
+
+class DailyDigestTests(TestCase):
+    """Tests for the set-based daily digest."""
+    
+    def setUp(self):
+        owner = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        org = Organization.objects.create(name="Test Org")
+        project = Project.objects.create(name="Test Project", organization=org, created_by=owner)
+        soon = timezone.now() + timedelta(hours=3)
+        self.users = []
+        for i in range(7):
+            user = User.objects.create_user(email=f'user{i}@example.com', username=f'user{i}', password='testpass123')
+            self.users.append(user)
+            for j in range(i % 3 + 1):
+                Task.objects.create(title=f"Task {i}-{j}", project=project, created_by=owner, assigned_to=user, due_date=soon)
+        # Not included: done, deleted, far future, opted out
+        Task.objects.create(title="Done", project=project, assigned_to=owner, due_date=soon, status='done')
+        Task.objects.create(title="Deleted", project=project, assigned_to=owner, due_date=soon, deleted_at=timezone.now())
+        Task.objects.create(title="Later", project=project, assigned_to=owner, due_date=soon + timedelta(days=7))
+        User.objects.filter(id=self.users[0].id).update(notification_email=False)
+    
+    def test_digest_uses_one_query(self):
+        """Test every digest is built from a single query and sent in chunks."""
+        from django.core import mail
+        from core.digest import send_daily_digest
+        
+        with self.assertNumQueries(1):
+            stats = send_daily_digest(workers=1, chunk_size=2)
+        
+        self.assertEqual(stats, {'users': 6, 'sent': 6})
+        self.assertEqual(len(mail.outbox), 6)
+        message = next(m for m in mail.outbox if m.to == ['user2@example.com'])
+        self.assertIn('You have 3 tasks due today', message.body)
+    
+    def test_digest_with_sender_threads(self):
+        """Test parallel sender threads deliver every digest exactly once."""
+        from django.core import mail
+        from core.digest import send_daily_digest
+        
+        stats = send_daily_digest(workers=3, chunk_size=1)
+        
+        self.assertEqual(stats['sent'], 6)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [f'user{i}@example.com' for i in range(1, 7)])
+
+
+class OverdueDetectionTests(TestCase):
+    """Tests for watermark-based overdue detection."""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(email='dev@example.com', username='dev', password='testpass123')
+        org = Organization.objects.create(name="Test Org")
+        self.project = Project.objects.create(name="Test Project", organization=org, created_by=self.user)
+        now = timezone.now()
+        self.recent = Task.objects.create(title="Recent", project=self.project, assigned_to=self.user, due_date=now - timedelta(hours=1))
+        ancient = Task.objects.create(title="Ancient", project=self.project, assigned_to=self.user, due_date=now - timedelta(days=30))
+        Task.objects.filter(id=ancient.id).update(updated_at=now - timedelta(days=30))
+        Task.objects.create(title="Finished", project=self.project, assigned_to=self.user, due_date=now - timedelta(hours=1), status='done')
+        Task.objects.create(title="Future", project=self.project, assigned_to=self.user, due_date=now + timedelta(hours=1))
+    
+    def test_only_newly_overdue_tasks_are_processed(self):
+        """Test each run covers only tasks due since the watermark."""
+        from django.core import mail
+        from accounts.models import Notification
+        from core.overdue import notify_newly_overdue
+        
+        stats = notify_newly_overdue()
+        self.assertEqual(stats, {'tasks': 1, 'notified': 1, 'emailed': 1})
+        self.assertEqual(Notification.objects.get(type='task_overdue').related_task_id, self.recent.id)
+        self.assertEqual(mail.outbox[0].subject, 'Overdue Task: Recent')
+        
+        # Nothing new became overdue since the last run
+        self.assertEqual(notify_newly_overdue()['tasks'], 0)
+        
+        # Each chunk is checked and inserted in a transaction holding the watermark lock
+        with self.assertNumQueries(8):
+            stats = notify_newly_overdue(now=timezone.now() + timedelta(hours=2))
+        self.assertEqual(stats['notified'], 1)
+    
+    def test_rerun_after_lost_watermark_is_deduplicated(self):
+        """Test replaying the same window does not notify or email twice."""
+        from django.core import mail
+        from accounts.models import Notification
+        from core.models import Watermark
+        from core.overdue import notify_newly_overdue
+        
+        notify_newly_overdue()
+        Watermark.objects.all().delete()
+        stats = notify_newly_overdue()
+        
+        self.assertEqual((stats['tasks'], stats['notified'], stats['emailed']), (1, 0, 0))
+        self.assertEqual(Notification.objects.filter(type='task_overdue').count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+    
+    def test_due_date_moved_into_the_past_is_noticed(self):
+        """Test a task edited to be overdue behind the watermark still gets one notice."""
+        from django.core import mail
+        from accounts.models import Notification
+        from core.overdue import notify_newly_overdue
+        
+        notify_newly_overdue()
+        future = Task.objects.get(title="Future")
+        future.due_date = timezone.now() - timedelta(days=3)
+        future.save()
+        
+        stats = notify_newly_overdue()
+        self.assertEqual((stats['tasks'], stats['notified'], stats['emailed']), (1, 1, 1))
+        self.assertEqual(mail.outbox[-1].subject, 'Overdue Task: Future')
+        
+        # The edit is still inside the next window, but the dedupe key holds
+        stats = notify_newly_overdue()
+        self.assertEqual(stats['notified'], 0)
+        self.assertEqual(Notification.objects.filter(related_task_id=future.id).count(), 1)
+
+
+class PurgeSoftDeletedTests(TestCase):
+    """Tests for the chunked purge of soft-deleted records."""
+    
+    def setUp(self):
+        from projects.models import FocusedTask, TaskComment, TaskLabel
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        org = Organization.objects.create(name="Test Org")
+        project = Project.objects.create(name="Test Project", organization=org, created_by=self.user)
+        label = TaskLabel.objects.create(name="Bug", project=project)
+        old = timezone.now() - timedelta(days=45)
+        for i in range(5):
+            task = Task.objects.create(title=f"Old {i}", project=project, created_by=self.user, deleted_at=old)
+            task.labels.add(label)
+            TaskComment.objects.create(task=task, author=self.user, content="note")
+            FocusedTask.objects.create(user=self.user, task=task)
+        self.recent = Task.objects.create(title="Recent", project=project, deleted_at=timezone.now())
+        self.active = Task.objects.create(title="Active", project=project)
+        self.gone = User.objects.create_user(email='gone@example.com', username='gone', password='testpass123')
+        User.objects.filter(id=self.gone.id).update(is_deleted=True, deleted_at=old)
+    
+    def test_purge_in_chunks_with_cascades(self):
+        """Test old soft-deleted rows and their dependents are removed chunk by chunk."""
+        from core.purge import purge_soft_deleted
+        from projects.models import TaskComment
+        
+        report = purge_soft_deleted(chunk_size=2, sleep_seconds=0)
+        
+        self.assertEqual(report['chunks'], 4)
+        self.assertEqual(report['rows']['projects.Task'], 5)
+        self.assertEqual(report['rows']['projects.TaskComment'], 5)
+        self.assertEqual(report['rows']['projects.Task_labels'], 5)
+        self.assertEqual(report['rows']['accounts.CustomUser'], 1)
+        self.assertEqual(
+            set(Task.objects.values_list('title', flat=True)),
+            {'Recent', 'Active'}
+        )
+        self.assertFalse(TaskComment.objects.exists())
+        self.assertFalse(User.objects.filter(id=self.gone.id).exists())
+    
+    def test_purged_users_bump_the_versions_that_show_them(self):
+        """Test purging a user touches the projects and organizations listing them, and only those."""
+        from core.purge import purge_soft_deleted
+        from projects.models import ProjectRole
+        project = Project.objects.get()
+        bystander = Project.objects.create(name="Other", organization=Organization.objects.create(name="Other Org"))
+        Membership.objects.create(user=self.gone, organization=project.organization, role=Membership.MEMBER)
+        ProjectRole.objects.create(user=self.gone, project=project, role=ProjectRole.MEMBER)
+        Task.objects.filter(pk=self.active.pk).update(assigned_to=self.gone)
+        before = dict(Project.objects.values_list('id', 'version'))
+        org_before = dict(Organization.objects.values_list('id', 'version'))
+        
+        report = purge_soft_deleted(sleep_seconds=0)
+        
+        self.assertEqual(report['rows']['accounts.CustomUser'], 1)
+        self.assertGreater(Project.objects.get(pk=project.pk).version, before[project.pk])
+        self.assertGreater(Organization.objects.get(pk=project.organization_id).version, org_before[project.organization_id])
+        self.assertEqual(Project.objects.get(pk=bystander.pk).version, before[bystander.pk])
+    
+    def test_purge_command(self):
+        """Test the management command reports what it removed."""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        out = StringIO()
+        call_command('purge_deleted', '--chunk-size', '3', stdout=out)
+        self.assertIn('projects.Task: 5', out.getvalue())
+
+
+class BackgroundExecutorTests(TestCase):
+    """Tests for the in-process task runner used without a Celery broker."""
+    
+    def setUp(self):
+        from core.background import Executor, LocalApp
+        self.app = LocalApp('test')
+        self.executor = Executor(max_workers=2, max_pending=2)
+        self.addCleanup(self.executor.shutdown)
+    
+    def test_delay_interface_and_retry(self):
+        """Test bound tasks run on the pool and self.retry() reschedules them."""
+        from core.background import Retry
+        attempts = []
+        
+        @self.app.task(bind=True, max_retries=3, retry_backoff=0)
+        def flaky(task, value):
+            attempts.append(value)
+            if len(attempts) < 3:
+                raise task.retry(exc=ValueError('not yet'), countdown=0)
+            return value * 2
+        
+        self.assertEqual(self.app.tasks['core.tests.flaky'], flaky)
+        future = self.executor.submit(flaky, (21,), {})
+        self.assertEqual(future.result(timeout=5), 42)
+        self.assertEqual(len(attempts), 3)
+        metrics = self.executor.metrics()
+        self.assertEqual((metrics['retried'], metrics['succeeded'], metrics['failed']), (2, 1, 0))
+    
+    def test_failures_without_retry_are_reported(self):
+        """Test errors not marked for retry fail once and surface on the future."""
+        @self.app.task
+        def broken():
+            raise KeyError('boom')
+        
+        future = self.executor.submit(broken, (), {})
+        with self.assertRaises(KeyError):
+            future.result(timeout=5)
+        self.assertEqual(self.executor.metrics()['failed'], 1)
+    
+    def test_full_pool_runs_inline(self):
+        """Test back-pressure: once max_pending jobs are in flight, new jobs run in the caller."""
+        import threading
+        release = threading.Event()
+        
+        @self.app.task
+        def wait():
+            release.wait(5)
+            return threading.current_thread().name
+        
+        pooled = [self.executor.submit(wait, (), {}) for _ in range(2)]
+        release.set()
+        inline = self.executor.submit(wait, (), {})
+        
+        self.assertEqual(inline.result(timeout=5), threading.current_thread().name)
+        self.assertTrue(all(f.result(timeout=5).startswith('navflow-task') for f in pooled))
+        self.assertEqual(self.executor.metrics()['ran_inline'], 1)
+    
+    def test_assignment_notification_task(self):
+        """Test the assignment task writes a valid notification and email."""
+        from django.core import mail
+        from django.test import override_settings
+        from accounts.models import Notification
+        from core.tasks import send_task_assigned_notification
+        
+        owner = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        dev = User.objects.create_user(email='dev@example.com', username='dev', password='testpass123')
+        org = Organization.objects.create(name="Test Org")
+        project = Project.objects.create(name="Test Project", organization=org, created_by=owner)
+        task = Task.objects.create(title="Assigned", project=project, assigned_to=dev)
+        
+        with override_settings(BACKGROUND_TASKS_ALWAYS_EAGER=True):
+            send_task_assigned_notification.delay(task.id, owner.id).result()
+        
+        notification = Notification.objects.get(user=dev)
+        self.assertEqual((notification.type, notification.related_task_id, notification.actor_id), ('task_assigned', task.id, owner.id))
+        self.assertEqual(mail.outbox[0].to, ['dev@example.com'])
+
+
+class JobQueueTests(TestCase):
+    """Test the durable database job queue."""
+    
+    def test_claim_orders_by_priority_and_skips_future_jobs(self):
+        """Test workers claim ready jobs highest priority first and leave scheduled ones."""
+        from core import jobqueue
+        from core.models import Job
+        
+        low = jobqueue.enqueue('core.tasks.pause_stale_timers')
+        high = jobqueue.enqueue('core.tasks.pause_stale_timers', priority=10)
+        later = jobqueue.enqueue('core.tasks.pause_stale_timers', priority=20, run_at=timezone.now() + timedelta(hours=1))
+        other = jobqueue.enqueue('core.tasks.pause_stale_timers', queue='exports')
+        
+        claimed = jobqueue.claim(['default'], 'worker-1', limit=5)
+        self.assertEqual([job.id for job in claimed], [high.id, low.id])
+        self.assertTrue(all(job.status == Job.STATUS_RUNNING and job.attempts == 1 for job in claimed))
+        self.assertEqual(jobqueue.claim(['default'], 'worker-2', limit=5), [])
+        
+        stats = jobqueue.queue_stats()
+        self.assertEqual((stats['default']['running'], stats['default']['scheduled']), (2, 1))
+        self.assertEqual(stats['exports']['ready'], 1)
+        self.assertGreaterEqual(stats['exports']['latency_seconds'], 0)
+        self.assertEqual(Job.objects.get(id=later.id).status, Job.STATUS_QUEUED)
+        self.assertEqual(Job.objects.get(id=other.id).locked_by, None)
+    
+    def test_failed_job_backs_off_then_dead_letters(self):
+        """Test failures are rescheduled with exponential backoff until max_attempts."""
+        from django.test import override_settings
+        from core import jobqueue
+        from core.models import Job
+        
+        job = jobqueue.enqueue('core.tasks.no_such_task', max_attempts=2)
+        with override_settings(JOB_RETRY_BASE_SECONDS=60):
+            self.assertFalse(jobqueue.run_job(jobqueue.claim(['default'], 'w')[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=50))
+        self.assertIn('AttributeError', job.last_error)
+        
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        self.assertFalse(jobqueue.run_job(jobqueue.claim(['default'], 'w')[0]))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_DEAD, 2))
+        self.assertEqual(jobqueue.queue_stats()['default']['dead'], 1)
+        
+        self.assertEqual(jobqueue.retry_dead(), 1)
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.STATUS_QUEUED)
+    
+    def test_stale_running_jobs_are_requeued(self):
+        """Test jobs held by a vanished worker return to the queue after the visibility timeout."""
+        from core import jobqueue
+        from core.models import Job
+        
+        job = jobqueue.enqueue('core.tasks.pause_stale_timers')
+        jobqueue.claim(['default'], 'w')
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(hours=1))
+        
+        self.assertEqual(jobqueue.requeue_stale(timeout_seconds=60), 1)
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.STATUS_QUEUED)
+    
+    def test_stale_jobs_dead_letter_and_reclaimed_batch_jobs_are_skipped(self):
+        """Test a job lost on its last attempt is dead-lettered and a reclaimed job is not run twice."""
+        from core import jobqueue
+        from core.models import Job
+        
+        crasher = jobqueue.enqueue('core.tasks.pause_stale_timers', max_attempts=1, priority=10)
+        waiting = jobqueue.enqueue('core.tasks.no_such_task')
+        first, second = jobqueue.claim(['default'], 'w', limit=2)
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        
+        self.assertEqual(jobqueue.requeue_stale(timeout_seconds=60), 1)
+        self.assertEqual(Job.objects.get(id=crasher.id).status, Job.STATUS_DEAD)
+        with self.assertLogs('core.jobqueue', level='WARNING'):
+            self.assertFalse(jobqueue.run_job(second))
+        self.assertEqual(Job.objects.get(id=waiting.id).last_error, None)
+    
+    def test_outcome_of_a_job_reclaimed_mid_run_is_not_recorded(self):
+        """Test a worker that lost its job does not overwrite the new holder's row."""
+        from unittest import mock
+        from core import jobqueue
+        from core.models import Job
+        
+        job = jobqueue.enqueue('core.tasks.pause_stale_timers')
+        claimed = jobqueue.claim(['default'], 'w1')[0]
+        
+        def succeeds_after_losing_the_job():
+            Job.objects.filter(id=job.id).update(locked_by='w2')
+        
+        def fails_after_losing_the_job():
+            succeeds_after_losing_the_job()
+            raise RuntimeError('boom')
+        
+        for task in (succeeds_after_losing_the_job, fails_after_losing_the_job):
+            Job.objects.filter(id=job.id).update(locked_by='w1')
+            with mock.patch.object(jobqueue, 'resolve_task', return_value=task), \
+                    self.assertLogs('core.jobqueue', level='WARNING') as logs:
+                self.assertFalse(jobqueue.run_job(claimed))
+            self.assertIn('outcome was not recorded', logs.output[-1])
+            row = Job.objects.get(id=job.id)
+            self.assertEqual((row.status, row.locked_by, row.last_error), (Job.STATUS_RUNNING, 'w2', None))
+    
+    def test_periodic_jobs_enqueued_once_per_slot(self):
+        """Test beat entries are enqueued at their minute and deduplicated across workers."""
+        from core import jobqueue
+        from core.tasks import app
+        from core.models import Job
+        
+        moment = timezone.localtime(timezone.now()).replace(hour=9, minute=0)
+        self.assertEqual(jobqueue.enqueue_periodic(app.conf.beat_schedule, moment), 3)
+        self.assertEqual(jobqueue.enqueue_periodic(app.conf.beat_schedule, moment), 0)
+        self.assertEqual(
+            set(Job.objects.values_list('task_name', flat=True)),
+            {'core.tasks.send_daily_digest', 'core.tasks.find_and_notify_overdue_tasks', 'core.tasks.pause_stale_timers'}
+        )
+        self.assertEqual(jobqueue.enqueue_periodic(app.conf.beat_schedule, moment.replace(minute=7)), 0)
+    
+    def test_periodic_schedules_honour_every_field_and_catch_up(self):
+        """Test day and month fields restrict slots, and minutes passed during a long batch still run."""
+        from core import jobqueue
+        from core.background import crontab
+        from core.models import Job
+        
+        weekly = crontab(minute=0, hour=9, day_of_week='mon')
+        monday = timezone.localtime(timezone.now()).replace(hour=9, minute=0, second=0, microsecond=0)
+        monday -= timedelta(days=monday.weekday())
+        self.assertTrue(jobqueue.schedule_matches(weekly, monday))
+        self.assertFalse(jobqueue.schedule_matches(weekly, monday + timedelta(days=1)))
+        self.assertTrue(jobqueue.schedule_matches(crontab(day_of_week='1-5', minute='*/15'), monday.replace(minute=45)))
+        self.assertFalse(jobqueue.schedule_matches(crontab(day_of_month='2,3', month_of_year=monday.month), monday.replace(day=1)))
+        
+        schedule = {'digest': {'task': 'core.tasks.send_daily_digest', 'schedule': crontab(minute=0, hour=9)}}
+        # The previous check was at 08:58 and the batch ran until 09:03
+        self.assertEqual(jobqueue.enqueue_periodic(
+            schedule, monday + timedelta(minutes=3), since=monday - timedelta(minutes=2)
+        ), 1)
+        self.assertEqual(Job.objects.get().run_at, monday)
+        self.assertEqual(jobqueue.enqueue_periodic(schedule, monday + timedelta(minutes=4), since=monday), 0)
+    
+    def test_delay_stores_job_and_worker_runs_it(self):
+        """Test the database backend turns .delay() into a job that run_jobs executes."""
+        from io import StringIO
+        from django.core.management import call_command
+        from django.test import override_settings
+        from accounts.models import Notification
+        from core.models import Job
+        from core.tasks import send_task_assigned_notification
+        
+        owner = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        org = Organization.objects.create(name="Test Org")
+        project = Project.objects.create(name="Test Project", organization=org, created_by=owner)
+        task = Task.objects.create(title="Assigned", project=project, assigned_to=owner)
+        
+        with override_settings(BACKGROUND_TASK_BACKEND='database'):
+            job = send_task_assigned_notification.delay(task.id, owner.id)
+        self.assertEqual((job.task_name, job.args), ('core.tasks.send_task_assigned_notification', [task.id, owner.id]))
+        self.assertFalse(Notification.objects.exists())
+        
+        out = StringIO()
+        call_command('run_jobs', '--once', '--no-schedule', stdout=out)
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(Notification.objects.get().related_task_id, task.id)
+        self.assertIn('1 succeeded', out.getvalue())
+
+
+class QueryInstrumentationTests(TestCase):
+    """Test per-request query instrumentation and N+1 detection."""
+    
+    def test_normalize_sql_groups_literals_and_in_lists(self):
+        """Test queries differing only in parameters share a fingerprint."""
+        from core.performance import normalize_sql
+        self.assertEqual(
+            normalize_sql('SELECT * FROM t WHERE id = 12 AND name = \'a\'\'b\''),
+            normalize_sql('SELECT *  FROM t WHERE id = 7 AND name = \'x\'')
+        )
+        self.assertEqual(
+            normalize_sql('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            'SELECT * FROM t WHERE id IN (?)'
+        )
+    
+    def test_repeated_queries_logged_with_call_site(self):
+        """Test an N+1 loop is reported with its Python call site and a Server-Timing header."""
+        from django.http import HttpResponse
+        from django.test import RequestFactory, override_settings
+        from core.performance import QueryInstrumentationMiddleware
+        
+        def view(request):
+            for i in range(3):
+                Task.objects.filter(id=i).exists()
+            return HttpResponse('ok')
+        
+        middleware = QueryInstrumentationMiddleware(view)
+        with override_settings(QUERY_REPEAT_THRESHOLD=3, QUERY_LOG_SAMPLE_RATE=1.0):
+            with self.assertLogs('navflow.queries', level='WARNING') as logs:
+                response = middleware(RequestFactory().get('/api/v1/tasks/'))
+        
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="3 queries", app;dur=')
+        self.assertIn('GET /api/v1/tasks/ ran 3 queries', logs.output[0])
+        self.assertIn('repeated 3x at core/tests.py', logs.output[1])
+        self.assertIn('in view', logs.output[1])
+    
+    def test_sampling_and_budget_suppress_logging(self):
+        """Test requests within budget, or not sampled, are not logged."""
+        from django.test import override_settings
+        user = User.objects.create_user(email='user@example.com', username='user', password='testpass123')
+        self.client.force_login(user)
+        
+        with override_settings(QUERY_LOG_SAMPLE_RATE=0.0, QUERY_COUNT_THRESHOLD=0, QUERY_REPEAT_THRESHOLD=1):
+            with self.assertNoLogs('navflow.queries', level='WARNING'):
+                response = self.client.get('/api/v1/auth/user/')
+        self.assertIn('Server-Timing', response)
+
+
+class MetricsTests(TestCase):
+    """Test the file-backed Prometheus metrics registry and endpoint."""
+    
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        from core import metrics
+        self.metrics_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(METRICS_DIR=self.metrics_dir, METRICS_TOKEN='')
+        self.settings_override.enable()
+        metrics.registry._reset()
+    
+    def tearDown(self):
+        import shutil
+        self.settings_override.disable()
+        shutil.rmtree(self.metrics_dir, ignore_errors=True)
+    
+    def test_values_summed_across_worker_files(self):
+        """Test another worker's flushed file is added to this process's live values."""
+        import os
+        from core import metrics
+        
+        metrics.record_cache('project_stats', hit=True)
+        metrics.observe('navflow_notification_fanout_size', 3, source='comment')
+        other = {
+            'counters': [['navflow_cache_requests_total', [['cache', 'project_stats'], ['result', 'hit']], 2]],
+            'histograms': [['navflow_notification_fanout_size', [['source', 'comment']], [0, 0, 0, 1, 0, 0, 0, 0, 0], 7, 1]],
+        }
+        # The parent (the test runner's shell) stands in for a live worker
+        parent = os.getppid()
+        with open(os.path.join(self.metrics_dir, f'metrics-{parent}-{metrics._start_time(parent)}.json'), 'w') as f:
+            json.dump(other, f)
+        
+        text = metrics.render()
+        self.assertIn('navflow_cache_requests_total{cache="project_stats",result="hit"} 3', text)
+        self.assertIn('navflow_notification_fanout_size_bucket{source="comment",le="5"} 1', text)
+        self.assertIn('navflow_notification_fanout_size_bucket{source="comment",le="10"} 2', text)
+        self.assertIn('navflow_notification_fanout_size_sum{source="comment"} 10', text)
+        self.assertIn('navflow_notification_fanout_size_count{source="comment"} 2', text)
+    
+    def test_exited_workers_are_archived(self):
+        """Test files of exited workers, or of a pid since reused, are folded into the archive."""
+        import os
+        import subprocess
+        import sys
+        from core import metrics
+        
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        parent = os.getppid()
+        stale = [f'metrics-{exited.pid}-1.json', f'metrics-{parent}-{int(metrics._start_time(parent)) + 1}.json']
+        for name in stale:
+            with open(os.path.join(self.metrics_dir, name), 'w') as f:
+                json.dump({
+                    'counters': [['navflow_cache_requests_total', [['cache', 'x'], ['result', 'hit']], 5]],
+                    'histograms': [['navflow_notification_fanout_size', [['source', 'x']], [1, 0, 0, 0, 0, 0, 0, 0, 0], 1, 1]],
+                }, f)
+        
+        for _ in range(2):
+            text = metrics.render()
+            self.assertIn('navflow_cache_requests_total{cache="x",result="hit"} 10', text)
+            self.assertIn('navflow_notification_fanout_size_count{source="x"} 2', text)
+        self.assertEqual(
+            sorted(n for n in os.listdir(self.metrics_dir) if n.endswith('.json')), [metrics.ARCHIVE_FILE]
+        )
+    
+    def test_endpoint_reports_request_latency_by_view(self):
+        """Test requests are recorded per view and exposed at /metrics."""
+        from django.test import override_settings
+        user = User.objects.create_user(email='user@example.com', username='user', password='testpass123')
+        self.client.force_login(user)
+        self.client.get('/health/')
+        
+        with override_settings(DEBUG=True):
+            response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('# TYPE navflow_http_request_duration_seconds histogram', text)
+        self.assertIn('navflow_http_request_duration_seconds_count{method="GET",status="2xx",view="core:health"} 1', text)
+        self.assertIn('navflow_db_queries_per_request_count{view="core:health"} 1', text)
+        
+        with override_settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 403)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+        # Outside DEBUG an unset token closes the endpoint rather than opening it
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+
+class BenchmarkTests(TestCase):
+    """Test the endpoint benchmark harness."""
+    
+    def test_all_scenarios_run_on_small_dataset(self):
+        """Test every hot endpoint succeeds on seeded data and reports its costs."""
+        from core import bench
+        dataset = bench.seed(users=3, projects=1, tasks_per_project=25, comments_per_task=1, notifications=5)
+        results = bench.run_benchmarks(dataset, iterations=2, warmup=0)
+        
+        self.assertEqual(set(results), {s.name for s in bench.SCENARIOS})
+        for name, result in results.items():
+            self.assertGreater(result['queries'], 0, name)
+            self.assertGreater(result['bytes'], 0, name)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'], name)
+    
+    def test_compare_flags_regressions_past_tolerance(self):
+        """Test query, latency and size regressions are reported; noise within tolerance is not."""
+        from core.bench import compare
+        baseline = {'task_list': {'p50_ms': 10, 'p95_ms': 20, 'queries': 5, 'bytes': 1000}}
+        
+        within = {'task_list': {'p50_ms': 11, 'p95_ms': 24, 'queries': 5, 'bytes': 1050}}
+        self.assertEqual(compare(within, baseline), [])
+        
+        worse = {'task_list': {'p50_ms': 30, 'p95_ms': 40, 'queries': 30, 'bytes': 2000}}
+        regressions = compare(worse, baseline)
+        self.assertEqual(len(regressions), 3)
+        self.assertIn('task_list: 30 queries (baseline 5)', regressions)
+
+
+class ScaleSeederTests(TestCase):
+    """Test the skewed scale data generator."""
+    
+    def test_skewed_dataset_is_consistent(self):
+        """Test organization sizes follow the skew and generated rows reference real parents."""
+        from django.db.models import Count, F, Sum
+        from django.db.models.functions import Coalesce
+        from core.seeding import ScaleSeeder
+        from projects.models import TaskComment, TimeEntry
+        
+        report = ScaleSeeder(
+            orgs=5, users=40, tasks=500, tasks_per_project=100,
+            notifications_per_user=2, batch_size=64
+        ).run()
+        
+        self.assertEqual(report['rows']['projects.Task'], 500)
+        self.assertEqual(report['rows']['projects.AuditLog'], 500)
+        self.assertEqual(report['rows']['accounts.Notification'], 2 * report['rows']['accounts.CustomUser'])
+        sizes = list(
+            Organization.objects.annotate(n=Count('projects__tasks')).order_by('-n').values_list('n', flat=True)
+        )
+        self.assertEqual(sum(sizes), 500)
+        self.assertGreater(sizes[0], 4 * sizes[-1])
+        
+        self.assertFalse(Task.objects.exclude(section__project=F('project')).exists())
+        self.assertFalse(TaskComment.objects.exclude(task__project__organization=F('author__memberships__organization')).exists())
+        # Time totals match their entries, as for tasks timed through the API
+        self.assertFalse(
+            Task.objects.annotate(logged=Coalesce(Sum('time_entries__minutes'), 0))
+            .exclude(time_spent_minutes=F('logged')).exists()
+        )
+        self.assertFalse(TimeEntry.objects.exclude(project=F('task__project')).exists())
+        
+        # Sequences continue past the pre-assigned ids
+        project = Project.objects.first()
+        self.assertGreater(Task.objects.create(title="After", project=project).id, 500)
+
+
+class QueryCountContractTests(APITestCase):
+    """
+    Read endpoints must cost O(1) queries in the size of their collection.
+    Each entry in QUERY_BUDGETS is requested once with every collection at
+    1 row and again at 100 rows: the query count must not change and must
+    stay within the budget.
+    """
+    
+    # name -> (path, query budget); {org}, {project} and {task} are filled in.
+    # Endpoints behind core.response_cache are measured on a cold cache.
+    QUERY_BUDGETS = {
+        'project-list': ('/api/v1/projects/?page_size=100', 4),
+        'project-detail': ('/api/v1/projects/{project}/', 8),
+        'project-members': ('/api/v1/projects/{project}/members/', 4),
+        'task-list': ('/api/v1/tasks/?page_size=100', 4),
+        'task-detail': ('/api/v1/tasks/{task}/', 3),
+        'section-list': ('/api/v1/sections/?project_id={project}', 3),
+        'label-list': ('/api/v1/labels/', 3),
+        'comment-list': ('/api/v1/comments/?task_id={task}', 2),
+        'attachment-list': ('/api/v1/attachments/?task_id={task}', 2),
+        'focus-list': ('/api/v1/focus/', 4),
+        'auditlog-list': ('/api/v1/audit-logs/?page_size=100', 2),
+        'timesheet-list': ('/api/v1/timesheets/', 1),
+        'timer-active': ('/api/v1/timers/active/?organization_id={org}', 2),
+        'org-list': ('/api/v1/orgs/', 2),
+        'org-detail': ('/api/v1/orgs/{org}/', 3),
+        'org-details': ('/api/v1/orgs/{org}/details/', 9),
+        'org-members': ('/api/v1/orgs/{org}/members/', 4),
+        'org-members-with-permissions': ('/api/v1/orgs/{org}/members-with-permissions/', 4),
+        'org-invitations': ('/api/v1/orgs/{org}/invitations/', 3),
+        'invitation-list': ('/api/v1/orgs/invitations/', 1),
+        'notification-list': ('/api/v1/accounts/notifications/', 2),
+        'notification-unread': ('/api/v1/accounts/notifications/unread/', 2),
+        'notification-all': ('/api/v1/accounts/notifications/all/', 3),
+    }
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from orgs.models import OrgPermissions
+        from projects.models import ProjectRole
+        # Cold caches: budgets count the first read
+        cache.clear()
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.org = Organization.objects.create(name="Contract Org")
+        Membership.objects.create(user=self.user, organization=self.org, role=Membership.OWNER)
+        OrgPermissions.create_for_org(self.org)
+        self.project = Project.objects.create(name="Contract Project", organization=self.org, created_by=self.user)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        self.task = Task.objects.create(title="Anchor", project=self.project, created_by=self.user)
+        self.size = 0
+        self.client.force_authenticate(self.user)
+    
+    def _grow(self, count):
+        """Add `count` rows to every collection the endpoints list."""
+        from accounts.models import Notification
+        from orgs.models import Invitation
+        from projects.models import (
+            FocusedTask, ProjectRole, TaskAttachment, TaskComment, TaskLabel, TimeEntry,
+        )
+        now = timezone.now()
+        for i in range(self.size, self.size + count):
+            member = User.objects.create(email=f'member{i}@example.com', username=f'member{i}')
+            Membership.objects.create(user=member, organization=self.org, role=Membership.MEMBER)
+            ProjectRole.objects.create(user=member, project=self.project, role=ProjectRole.MEMBER)
+            project = Project.objects.create(name=f"Project {i}", organization=self.org, created_by=self.user)
+            ProjectRole.objects.create(user=self.user, project=project, role=ProjectRole.OWNER)
+            section = TaskSection.objects.create(project=self.project, name=f"Section {i}", slug=f"section-{i}", position=i)
+            label = TaskLabel.objects.create(name=f"Label {i}", organization=self.org)
+            task = Task.objects.create(
+                title=f"Task {i}", project=self.project, section=section, assigned_to=member,
+                created_by=self.user, is_timer_running=True, timer_started_at=now, timer_started_by=member
+            )
+            task.labels.add(label)
+            self.task.labels.add(label)
+            FocusedTask.objects.create(user=self.user, task=task)
+            for target in (task, self.task):
+                TaskComment.objects.create(task=target, author=member, content=f"Comment {i}")
+                TaskAttachment.objects.create(
+                    task=target, file_url=f'https://files.example.com/{i}.png', file_name=f'{i}.png',
+                    file_type='image', uploaded_by=member
+                )
+            TimeEntry.objects.create(
+                task=task, project=self.project, user=member,
+                started_at=now - timedelta(hours=1), ended_at=now, minutes=60
+            )
+            AuditLog.objects.create(organization=self.org, project=self.project, user=member, action=AuditLog.ACTION_CREATE)
+            Notification.objects.create(user=self.user, type='task_assigned', title='Assigned', message=f'Task {i}')
+            Invitation.objects.create(organization=self.org, invited_user=member, invited_by=self.user)
+            other_org = Organization.objects.create(name=f"Other Org {i}")
+            Membership.objects.create(user=member, organization=other_org, role=Membership.OWNER)
+            Membership.objects.create(user=self.user, organization=other_org, role=Membership.MEMBER)
+            Invitation.objects.create(organization=other_org, invited_user=self.user, invited_by=member)
+        self.size += count
+    
+    def _measure(self):
+        """Query count per endpoint at the current size."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        ids = {'org': self.org.id, 'project': self.project.id, 'task': self.task.id}
+        counts = {}
+        for name, (path, budget) in self.QUERY_BUDGETS.items():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path.format(**ids))
+            self.assertEqual(response.status_code, 200, f"{name}: {response.status_code}")
+            counts[name] = len(queries)
+        return counts
+    
+    def test_query_counts_do_not_grow_with_collection_size(self):
+        """Test every read endpoint runs the same, budgeted number of queries for 1 and 100 rows."""
+        self._grow(1)
+        small = self._measure()
+        self._grow(99)
+        large = self._measure()
+        
+        for name, (path, budget) in self.QUERY_BUDGETS.items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(large[name], small[name], f"{name}: {small[name]} queries at 1 row, {large[name]} at 100")
+                self.assertLessEqual(large[name], budget, f"{name}: {large[name]} queries, budget {budget}")
+    
+    def test_large_collections_are_returned(self):
+        """Test the contract runs against populated responses, not empty pages."""
+        self._grow(100)
+        response = self.client.get('/api/v1/tasks/?page_size=100')
+        self.assertEqual(response.data['count'], 101)
+        task = next(row for row in response.data['results'] if row['id'] != self.task.id)
+        self.assertEqual(task['comments_count'], 1)
+        self.assertEqual(task['attachments_count'], 1)
+        self.assertTrue(task['is_focused'])
+        self.assertEqual(len(task['labels_data']), 1)
+
+
+class ConditionalGetTests(APITestCase):
+    """Test ETag/Last-Modified revalidation of project and task reads."""
+    
+    def setUp(self):
+        from projects.models import ProjectRole
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.other = User.objects.create_user(email='other@example.com', username='other', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        self.project = Project.objects.create(name="Board", organization=self.org, created_by=self.user)
+        for user, role in ((self.user, ProjectRole.OWNER), (self.other, ProjectRole.MEMBER)):
+            Membership.objects.create(user=user, organization=self.org, role=Membership.MEMBER)
+            ProjectRole.objects.create(user=user, project=self.project, role=role)
+        self.task = Task.objects.create(title="Card", project=self.project, created_by=self.user)
+        self.client.force_authenticate(self.user)
+        self.board = f'/api/v1/tasks/?project_id={self.project.id}'
+    
+    def test_matching_etag_returns_304_after_one_query(self):
+        """Test a repeat board load is answered from the validators alone."""
+        response = self.client.get(self.board)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(self.board, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        
+        response = self.client.get(self.board, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_last_modified_only_for_pinned_project_sets(self):
+        """Test lists whose project set can shrink revalidate by ETag alone."""
+        response = self.client.get('/api/v1/projects/')
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('Last-Modified', self.client.get(f'/api/v1/projects/{self.project.id}/'))
+        self.assertNotIn('Last-Modified', self.client.get('/api/v1/tasks/'))
+    
+    def test_writes_change_the_etag(self):
+        """Test task, comment, label and bulk writes all invalidate cached copies."""
+        from projects.models import TaskComment, TaskLabel
+        label = TaskLabel.objects.create(name="Bug", organization=self.org)
+        writes = [
+            lambda: TaskComment.objects.create(task=self.task, author=self.user, content="Hi"),
+            lambda: self.task.labels.add(label),
+            lambda: TaskLabel.objects.filter(pk=label.pk).get().save(),
+            lambda: Task.objects.create(title="Another", project=self.project),
+            lambda: TaskService.bulk_update_tasks([self.task.id], {'priority': 'high'}, self.user),
+        ]
+        etag = self.client.get(self.board)['ETag']
+        for write in writes:
+            write()
+            response = self.client.get(self.board, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+    
+    def test_etag_is_per_user_and_url(self):
+        """Test callers and query strings never share validators."""
+        url = f'/api/v1/projects/{self.project.id}/'
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(f'{url}?expand=1')['ETag'], etag)
+        
+        self.client.force_authenticate(self.other)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_inaccessible_detail_is_not_revalidated(self):
+        """Test unknown or foreign tasks still 404 instead of 304."""
+        outsider = User.objects.create_user(email='out@example.com', username='out', password='testpass123')
+        self.client.force_authenticate(outsider)
+        response = self.client.get(f'/api/v1/tasks/{self.task.id}/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
+
+
+class ResponseCacheTests(APITestCase):
+    """Test version-keyed caching of section, label and member lists."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from projects.models import ProjectRole
+        cache.clear()
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.member = User.objects.create_user(email='member@example.com', username='member', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        self.project = Project.objects.create(name="Board", organization=self.org, created_by=self.user)
+        Membership.objects.create(user=self.user, organization=self.org, role=Membership.OWNER)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        TaskSection.objects.create(project=self.project, name="Backlog", slug="backlog")
+        self.client.force_authenticate(self.user)
+    
+    def test_repeat_reads_are_served_from_cache(self):
+        """Test a warm read costs only the scope query."""
+        urls = [
+            f'/api/v1/sections/?project_id={self.project.id}',
+            f'/api/v1/projects/{self.project.id}/members/',
+            f'/api/v1/orgs/{self.org.id}/members/',
+            '/api/v1/labels/',
+        ]
+        for url in urls:
+            first = self.client.get(url)
+            with self.assertNumQueries(1):
+                second = self.client.get(url)
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(second.json(), first.json())
+    
+    def test_writes_invalidate_exactly(self):
+        """Test section, task, membership, label and profile writes show up on the next read."""
+        from projects.models import ProjectRole, TaskLabel
+        sections = f'/api/v1/sections/?project_id={self.project.id}'
+        self.client.get(sections)
+        Task.objects.create(title="Card", project=self.project, section=TaskSection.objects.get())
+        self.assertEqual(self.client.get(sections).data['results'][0]['task_count'], 1)
+        
+        members = f'/api/v1/orgs/{self.org.id}/members/'
+        self.client.get(members)
+        Membership.objects.create(user=self.member, organization=self.org, role=Membership.MEMBER)
+        self.assertEqual(len(self.client.get(members).data), 2)
+        self.member.first_name = 'Renamed'
+        self.member.save()
+        self.assertIn('Renamed', [row['user_name'] for row in self.client.get(members).data])
+        
+        project_members = f'/api/v1/projects/{self.project.id}/members/'
+        self.client.get(project_members)
+        ProjectRole.objects.create(user=self.member, project=self.project, role=ProjectRole.MEMBER)
+        self.assertEqual(len(self.client.get(project_members).data), 2)
+        
+        self.client.get('/api/v1/labels/')
+        TaskLabel.objects.create(name="Scoped", project=self.project)
+        names = [row['name'] for row in self.client.get('/api/v1/labels/').data['results']]
+        self.assertIn('Scoped', names)
+    
+    def test_callers_without_access_are_not_served(self):
+        """Test the cache never answers for a caller outside the scope."""
+        url = f'/api/v1/projects/{self.project.id}/members/'
+        self.client.get(url)
+        self.client.force_authenticate(self.member)
+        self.assertIn(self.client.get(url).status_code, (403, 404))
+        self.assertEqual(self.client.get(f'/api/v1/orgs/{self.org.id}/members/').status_code, 404)
+
+
+class LabelCatalogTests(APITestCase):
+    """Test seeded default labels and the cached label catalog."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from projects.models import ProjectRole
+        cache.clear()
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        self.project = Project.objects.create(name="Board", organization=self.org, created_by=self.user)
+        Membership.objects.create(user=self.user, organization=self.org, role=Membership.OWNER)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        self.task = Task.objects.create(title="Card", project=self.project, created_by=self.user)
+        self.client.force_authenticate(self.user)
+    
+    def test_default_labels_are_seeded_once(self):
+        """Test defaults exist without a get_or_create pass and repeat lookups run no queries."""
+        from django.db import IntegrityError, transaction
+        from projects.models import DEFAULT_LABELS, TaskLabel
+        TaskLabel.clear_default_labels()
+        self.assertEqual(TaskLabel.objects.filter(is_default=True).count(), len(DEFAULT_LABELS))
+        labels = TaskLabel.get_default_labels()
+        with self.assertNumQueries(0):
+            self.assertEqual(TaskLabel.get_default_labels(), labels)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TaskLabel.objects.create(name='Bug', is_default=True)
+    
+    def test_task_labels_follow_label_writes(self):
+        """Test renaming a label shows up on the next task read."""
+        from projects.models import TaskLabel
+        label = TaskLabel.objects.create(name="Backend", organization=self.org)
+        self.task.labels.add(label, TaskLabel.get_default_labels()[0])
+        url = f'/api/v1/tasks/{self.task.id}/'
+        self.assertEqual([row['name'] for row in self.client.get(url).data['labels_data']], ['Backend', 'Bug'])
+        
+        label.name = "Triage"
+        label.save()
+        self.assertEqual([row['name'] for row in self.client.get(url).data['labels_data']], ['Bug', 'Triage'])
+
+
+class TaskCounterTests(APITestCase):
+    """Test denormalized task counters stay equal to the task rows."""
+    
+    def setUp(self):
+        from projects.models import ProjectRole
+        self.user = User.objects.create_user(email='owner@example.com', username='owner', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        self.project = Project.objects.create(name="Board", organization=self.org, created_by=self.user)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        self.todo = TaskSection.objects.create(project=self.project, name="To Do", slug="todo", is_default=True)
+        self.extra = TaskSection.objects.create(project=self.project, name="Extra", slug="extra", position=1)
+        self.tasks = [Task.objects.create(title=f"Task {i}", project=self.project, section=self.extra) for i in range(4)]
+        self.client.force_authenticate(self.user)
+    
+    def assertCountersInSync(self):
+        from core.counters import reconcile
+        self.assertEqual(reconcile(), {'projects': 0, 'sections': 0})
+    
+    def test_instance_writes_move_counters(self):
+        """Test create, status and section changes, soft delete and hard delete."""
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.active_task_count, 4)
+        self.assertEqual(self.project.get_status_counts()['todo'], 4)
+        
+        task = self.tasks[0]
+        task.status = 'done'
+        task.section = self.todo
+        task.save()
+        self.client.post('/api/v1/tasks/reorder/', {'tasks': [{'id': self.tasks[1].id, 'position': 0, 'status': 'review'}]}, format='json')
+        self.tasks[2].soft_delete()
+        self.tasks[3].delete()
+        self.assertCountersInSync()
+        
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.get_status_counts(), {'todo': 0, 'in_progress': 0, 'review': 1, 'done': 1})
+        detail = self.client.get(f'/api/v1/projects/{self.project.id}/').data
+        self.assertEqual(detail['task_count'], 2)
+        self.assertEqual({row['id'] for row in detail['tasks']}, {self.tasks[0].id, self.tasks[1].id})
+        self.assertEqual({row['name']: row['task_count'] for row in detail['sections']}, {'To Do': 1, 'Extra': 1})
+    
+    def test_stale_copies_do_not_repeat_a_move(self):
+        """Test two copies of one task saved in turn move the counters once."""
+        first, second = Task.objects.get(pk=self.tasks[0].pk), Task.objects.get(pk=self.tasks[0].pk)
+        first.soft_delete()
+        second.soft_delete()
+        
+        first, second = Task.objects.get(pk=self.tasks[1].pk), Task.objects.get(pk=self.tasks[1].pk)
+        first.status = second.status = 'done'
+        first.save()
+        second.save()
+        
+        Task.objects.get(pk=self.tasks[2].pk).delete()
+        Task(pk=self.tasks[2].pk, title="Gone", project=self.project, section=self.extra).delete()
+        
+        self.assertCountersInSync()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.active_task_count, 2)
+        self.assertEqual(self.project.get_status_counts(), {'todo': 1, 'in_progress': 0, 'review': 0, 'done': 1})
+    
+    def test_deferred_loads_are_counted(self):
+        """Test saving a task loaded without its counter fields."""
+        task = Task.objects.only('id', 'title').get(pk=self.tasks[0].pk)
+        task.status = 'in_progress'
+        task.save()
+        self.assertCountersInSync()
+    
+    def test_bulk_paths_move_counters(self):
+        """Test bulk updates, section deletes and imports adjust the counters."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        self.client.post('/api/v1/tasks/bulk/', {
+            'task_ids': [self.tasks[0].id, self.tasks[1].id], 'status': 'done',
+        }, format='json')
+        self.client.post('/api/v1/tasks/bulk/', {'task_ids': [self.tasks[2].id], 'delete': True}, format='json')
+        self.assertCountersInSync()
+        
+        self.client.delete(f'/api/v1/sections/{self.extra.id}/')
+        self.todo.refresh_from_db()
+        self.assertEqual(self.todo.active_task_count, 3)
+        
+        upload = SimpleUploadedFile('tasks.csv', b'title,status\nImported,review\n', content_type='text/csv')
+        self.client.post('/api/v1/tasks/import/', {'file': upload, 'project_id': self.project.id}, format='multipart')
+        self.assertEqual(Project.objects.get(pk=self.project.pk).review_task_count, 1)
+        self.assertCountersInSync()
+    
+    def test_reconcile_repairs_drift(self):
+        """Test the reconcile command rewrites counters that drifted."""
+        from io import StringIO
+        from django.core.management import call_command
+        Project.objects.filter(pk=self.project.pk).update(active_task_count=99, done_task_count=-3)
+        TaskSection.objects.filter(pk=self.extra.pk).update(active_task_count=0)
+        
+        out = StringIO()
+        call_command('reconcile_task_counters', stdout=out)
+        self.assertIn('Corrected 1 projects and 1 sections', out.getvalue())
+        self.assertCountersInSync()
+
+
+class ProjectionParityTests(APITestCase):
+    """Test list projections render exactly what their serializers do."""
+    
+    def setUp(self):
+        from decimal import Decimal
+        from django.core.cache import cache
+        from projects.models import FocusedTask, ProjectRole, TaskComment, TaskLabel
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='owner@example.com', username='owner', password='testpass123', first_name='Ada', last_name='Lovelace'
+        )
+        nameless = User.objects.create_user(email='zed@example.com', username='zed', password='testpass123')
+        self.org = Organization.objects.create(name="Test Org")
+        other_org = Organization.objects.create(name="Other Org")
+        self.project = Project.objects.create(name="Board", organization=self.org, created_by=self.user)
+        ProjectRole.objects.create(user=self.user, project=self.project, role=ProjectRole.OWNER)
+        section = TaskSection.objects.create(project=self.project, name="Doing", slug="doing", color='#123456')
+        now = timezone.now()
+        
+        first = Task.objects.create(
+            title="Assigned", description="Body", project=self.project, section=section, status='in_progress',
+            priority='urgent', assigned_to=self.user, created_by=self.user, due_date=now, estimated_hours=Decimal('2.5'),
+            time_spent_minutes=135, started_at=now, is_timer_running=True, timer_started_at=now, position=3
+        )
+        second = Task.objects.create(title="Nameless", project=self.project, assigned_to=nameless, status='done', completed_at=now)
+        Task.objects.create(
+            title="Orphaned", project=self.project, assigned_to_deleted=True, assigned_to_username='gone'
+        )
+        Task.objects.create(title="Blank", project=self.project)
+        
+        first.labels.add(
+            TaskLabel.get_default_labels()[0],
+            TaskLabel.objects.create(name="Org", organization=self.org),
+            TaskLabel.objects.create(name="Scoped", project=self.project),
+            TaskLabel.objects.create(name="Foreign", organization=other_org),
+        )
+        FocusedTask.objects.create(user=self.user, task=second)
+        TaskComment.objects.create(task=first, author=self.user, content="Hi")
+        self.client.force_authenticate(self.user)
+    
+    def test_task_list_matches_serializer(self):
+        """Test /tasks/ renders the same JSON, key order included, with and without the projection."""
+        from django.test import override_settings
+        url = f'/api/v1/tasks/?project_id={self.project.id}&page_size=100'
+        with override_settings(READ_PROJECTIONS=[]):
+            expected = self.client.get(url).content
+        with override_settings(READ_PROJECTIONS=['tasks']):
+            actual = self.client.get(url).content
+        
+        self.assertEqual(len(json.loads(actual)['results']), 4)
+        self.assertEqual(json.loads(actual), json.loads(expected))
+        self.assertEqual(actual, expected)
+    
+    def test_projection_runs_no_per_row_queries(self):
+        """Test a projected page costs the same queries at 4 and 40 rows."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = f'/api/v1/tasks/?project_id={self.project.id}&page_size=100'
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        for i in range(36):
+            Task.objects.create(title=f"Task {i}", project=self.project)
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(len(self.client.get(url).data['results']), 40)
+        self.assertEqual(len(large), len(small))
+
+
+class AsyncViewTests(APITestCase):
+    """Test the async endpoints and the async middleware paths."""
+    
+    def setUp(self):
+        from accounts.models import Notification
+        self.user = User.objects.create_user(email='user@example.com', username='user', password='testpass123')
+        for i in range(25):
+            Notification.objects.create(user=self.user, type='task_assigned', title='Assigned', message=f'Task {i}')
+        Notification.objects.create(user=self.user, type='task_assigned', title='Read', message='Old', is_read=True)
+    
+    def test_unread_notifications(self):
+        """Test unread polling returns the count and latest 20, authenticated through DRF."""
+        url = '/api/v1/accounts/notifications/unread/'
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        self.client.force_authenticate(self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['count'], 25)
+        self.assertEqual(len(response.json()['results']), 20)
+        self.assertFalse(any(n['is_read'] for n in response.json()['results']))
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+    
+    def test_async_views_apply_configured_throttles(self):
+        """Test the async endpoints are rate limited like the DRF views."""
+        from unittest import mock
+        from django.core.cache import cache
+        from rest_framework.throttling import UserRateThrottle
+        cache.clear()
+        self.addCleanup(cache.clear)
+        url = '/api/v1/accounts/notifications/unread/'
+        self.client.force_authenticate(self.user)
+        with mock.patch.object(UserRateThrottle, 'THROTTLE_RATES', {'user': '2/min', 'anon': '2/min'}):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('throttled', response.json()['detail'])
+        self.assertTrue(0 < int(response['Retry-After']) <= 60)
+    
+    def test_health_check_under_asgi(self):
+        """Test the async health check through the ASGI handler."""
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncClient
+        response = async_to_sync(AsyncClient().get)('/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['checks']['database'], 'connected')
+    
+    def test_query_instrumentation_counts_async_orm(self):
+        """Test the async middleware path counts queries made through the async ORM."""
+        from asgiref.sync import async_to_sync
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+        from core.performance import QueryInstrumentationMiddleware
+        
+        async def view(request):
+            for i in range(3):
+                await Task.objects.filter(id=i).aexists()
+            return HttpResponse('ok')
+        
+        middleware = QueryInstrumentationMiddleware(view)
+        response = async_to_sync(middleware)(RequestFactory().get('/api/v1/tasks/'))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="3 queries"')
+    
+    def test_async_ai_helpers_fall_back_offline(self):
+        """Test the async AI helpers return the offline fallbacks."""
+        from asgiref.sync import async_to_sync
+        from core.ai_services import AIService
+        service = AIService()
+        self.assertEqual(async_to_sync(service.aestimate_effort)('Write docs')['complexity'], 'medium')
+        self.assertEqual(async_to_sync(service.asummarize_tasks)(Task.objects.none()), "No tasks to summarize")
+
+
+class AIPipelineTests(TestCase):
+    """Test the cached, batched AI pipeline on the offline stub backend."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from core.ai_pipeline import AIPipeline, StubBackend
+        cache.clear()
+        self.backend = StubBackend()
+        self.pipeline = AIPipeline(
+            self.backend, timeout=5.0, batch_size=3, max_concurrency=2, cache_timeout=60, max_pending=10
+        )
+        self.addCleanup(self.pipeline.shutdown)
+    
+    def test_results_cached_by_input_hash(self):
+        """Test a repeated request is answered from the cache, and changed inputs are not."""
+        tasks = [{'title': 'A', 'description': '', 'status': 'done'}, {'title': 'B', 'description': '', 'status': 'todo'}]
+        first = self.pipeline.run('summarize', {'tasks': tasks})
+        self.assertEqual(first, "Total: 2 tasks | Completed: 1 | In Progress: 0")
+        self.assertEqual(self.pipeline.run('summarize', {'tasks': list(tasks)}), first)
+        self.assertEqual(self.pipeline.backend_calls, 1)
+        
+        self.pipeline.run('summarize', {'tasks': tasks[:1]})
+        self.assertEqual(self.pipeline.backend_calls, 2)
+    
+    def test_prompts_batched_and_deduplicated(self):
+        """Test 7 requests (one duplicate) of one kind take ceil(6 / batch size) backend calls."""
+        from core.ai_pipeline import AIRequest
+        titles = ['a', 'b', 'c', 'd', 'e', 'f', 'a']
+        results = self.pipeline.run_many([AIRequest('estimate', {'title': t, 'description': ''}) for t in titles])
+        self.assertEqual(len(results), 7)
+        self.assertEqual(results[0], {"hours": 4, "complexity": "medium", "priority": "medium"})
+        self.assertEqual(self.pipeline.backend_calls, 2)
+    
+    def test_timeout_falls_back_and_late_result_is_cached(self):
+        """Test a slow backend yields the stub answer in time, and its late answer is cached."""
+        import threading
+        from core.ai_pipeline import AIRequest
+        release = threading.Event()
+        
+        class SlowBackend:
+            name = 'slow'
+            
+            def complete(self, kind, payloads):
+                release.wait(5)
+                return ['late'] * len(payloads)
+        
+        self.pipeline.backend = SlowBackend()
+        self.assertEqual(self.pipeline.run('describe', {'title': 'x'}, timeout=0.05), "")
+        release.set()
+        self.pipeline.pool.shutdown(wait=True)
+        [future] = self.pipeline.submit_many([AIRequest('describe', {'title': 'x'})])
+        self.assertEqual(future.result(timeout=0), 'late')
+    
+    def test_backend_errors_fall_back_uncached(self):
+        """Test a failing backend yields the stub answer and nothing is cached."""
+        class FailingBackend:
+            name = 'failing'
+            
+            def complete(self, kind, payloads):
+                raise RuntimeError('provider down')
+        
+        self.pipeline.backend = FailingBackend()
+        with self.assertLogs('core.ai_pipeline', level='WARNING'):
+            self.assertEqual(self.pipeline.run('estimate', {'title': 'x', 'description': ''})['hours'], 4)
+            self.pipeline.run('estimate', {'title': 'x', 'description': ''})
+        self.assertEqual(self.pipeline.backend_calls, 2)
+    
+    def test_full_backlog_rejects_and_abandoned_prompts_are_not_sent(self):
+        """Test prompts beyond the backlog get the stub at once, and prompts nobody awaits are dropped."""
+        import threading
+        from django.core.cache import cache
+        from core.ai_pipeline import AIPipeline, AIRequest
+        started, release = threading.Event(), threading.Event()
+        
+        class BlockingBackend:
+            name = 'blocking'
+            
+            def complete(self, kind, payloads):
+                started.set()
+                release.wait(5)
+                return ['late'] * len(payloads)
+        
+        pipeline = AIPipeline(
+            BlockingBackend(), timeout=5.0, batch_size=1, max_concurrency=1, cache_timeout=60, max_pending=1
+        )
+        self.addCleanup(pipeline.shutdown)
+        pipeline.submit_many([AIRequest('describe', {'title': 'running'})])
+        self.assertTrue(started.wait(5))
+        # The only thread is busy: 'queued' fills the backlog and 'refused' is turned away
+        self.assertEqual(pipeline.run('describe', {'title': 'queued'}, timeout=0.05), "")
+        [refused] = pipeline.submit_many([AIRequest('describe', {'title': 'refused'})])
+        self.assertTrue(refused.done())
+        self.assertEqual(pipeline.run('describe', {'title': 'refused'}, timeout=5.0), "")
+        
+        release.set()
+        pipeline.pool.shutdown(wait=True)
+        self.assertEqual(pipeline.backend_calls, 1)
+        self.assertIsNone(cache.get(pipeline.cache_key(AIRequest('describe', {'title': 'queued'}))))
+
+
+class WorkloadIndexTests(TestCase):
+    """Test the cached organization workload index behind assignment suggestions."""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.org = Organization.objects.create(name="Workload Org")
+        self.users = []
+        for name in ('busy', 'light', 'idle'):
+            user = User.objects.create_user(email=f'{name}@example.com', username=name, password='testpass123')
+            Membership.objects.create(user=user, organization=self.org, role=Membership.MEMBER)
+            self.users.append(user)
+        self.busy, self.light, self.idle = self.users
+        self.project = Project.objects.create(name="Workload Project", organization=self.org, created_by=self.busy)
+        Task.objects.create(title="Big", project=self.project, assigned_to=self.busy, priority='urgent', estimated_hours=8)
+        for i in range(3):
+            Task.objects.create(title=f"Small {i}", project=self.project, assigned_to=self.light, priority='low', estimated_hours=1)
+        # Not open work in this organization
+        Task.objects.create(title="Done", project=self.project, assigned_to=self.idle, status='done')
+        Task.objects.create(title="Gone", project=self.project, assigned_to=self.idle, deleted_at=timezone.now())
+        other = Project.objects.create(name="Elsewhere", organization=Organization.objects.create(name="Other"))
+        Task.objects.create(title="Other org", project=other, assigned_to=self.idle)
+    
+    def test_weighted_loads_and_suggestion(self):
+        """Test loads weigh priority by hours and the idle member is suggested."""
+        from core.ai_services import AIService
+        from core.workload import workload_index
+        index = workload_index(self.org.id)
+        self.assertEqual(index['loads'], {self.busy.id: (1, 32.0), self.light.id: (3, 3.0)})
+        
+        anchor = Task.objects.create(title="New", project=self.project)
+        suggestion = AIService().suggest_task_assignment(anchor)
+        self.assertEqual(suggestion, {'user_id': self.idle.id, 'username': 'idle', 'current_tasks': 0, 'load': 0.0})
+    
+    def test_task_writes_refresh_the_index(self):
+        """Test assigning work to the idle member moves the suggestion on."""
+        from core.workload import suggest_assignee
+        self.assertEqual(suggest_assignee(self.org.id)['user_id'], self.idle.id)
+        Task.objects.create(title="Now busy", project=self.project, assigned_to=self.idle, priority='medium')
+        self.assertEqual(suggest_assignee(self.org.id)['user_id'], self.light.id)
+    
+    def test_cached_lookup_is_one_query(self):
+        """Test a warm lookup costs one stamp query regardless of member count."""
+        from core.workload import suggest_assignee
+        suggest_assignee(self.org.id)
+        with self.assertNumQueries(1):
+            suggest_assignee(self.org.id)
+        for i in range(30):
+            user = User.objects.create(email=f'extra{i}@example.com', username=f'extra{i}')
+            Membership.objects.create(user=user, organization=self.org, role=Membership.MEMBER)
+        suggest_assignee(self.org.id)
+        with self.assertNumQueries(1):
+            suggest_assignee(self.org.id)
+    
+    def test_auto_assign_based_on_workload(self):
+        """Test an unassigned task goes to the least loaded member; assigned ones are left."""
+        from core.ai_services import WorkflowAutomation
+        task = Task.objects.create(title="Unassigned", project=self.project)
+        self.assertTrue(WorkflowAutomation.auto_assign_based_on_workload(task))
+        task.refresh_from_db()
+        self.assertEqual(task.assigned_to, self.idle)
+        self.assertFalse(WorkflowAutomation.auto_assign_based_on_workload(task))
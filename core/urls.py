@@ -1,9 +1,10 @@
 from django.urls import path
-from .views import api_homepage, health_check
+from .views import api_homepage, health_check, metrics
 
 app_name = 'core'
 
 urlpatterns = [
     path('', api_homepage, name='homepage'),
     path('health/', health_check, name='health'),
+    path('metrics', metrics, name='metrics'),
 ]
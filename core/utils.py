@@ -0,0 +1,16 @@
+"""
+Small helpers shared by the batch jobs in core (imports, exports, digests,
+overdue notices).
+"""
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Consecutive lists of up to `size` items, read lazily from any iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.db import connection
@@ -53,9 +54,10 @@ def api_homepage(request):
 
 
 @require_http_methods(["GET"])
-def health_check(request):
+async def health_check(request):
     """
     Health check endpoint for monitoring and load balancers.
+    Async, so probes waiting on a slow database do not hold a worker.
     
     Verifies:
     - API is responsive
@@ -73,14 +75,52 @@ def health_check(request):
     
     # Check database connection
     try:
-        connection.ensure_connection()
+        await sync_to_async(connection.ensure_connection)()
         health_status["checks"]["database"] = "connected"
     except Exception as e:
         health_status["status"] = "unhealthy"
         health_status["checks"]["database"] = f"error: {str(e)}"
         return JsonResponse(health_status, status=503)
     
+    # In-process background executor counters, when it is in use
+    from core.background import get_executor_metrics
+    background = get_executor_metrics()
+    if background is not None:
+        health_status["checks"]["background"] = background
+    
+    # Durable job queue depth and latency per queue
+    from django.conf import settings
+    if settings.BACKGROUND_TASK_BACKEND == 'database':
+        from core.jobqueue import queue_stats
+        health_status["checks"]["job_queues"] = await sync_to_async(queue_stats)()
+    
     # Add Python version
     health_status["python_version"] = sys.version.split()[0]
     
     return JsonResponse(health_status, status=200)
+
+
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    Prometheus scrape endpoint.
+    
+    Sums request latency, query, cache, background task and notification
+    metrics across all gunicorn workers (see core.metrics), plus live job
+    queue gauges. Requests must send METRICS_TOKEN as a bearer token; only
+    DEBUG serves scrapes without one configured.
+    
+    Returns:
+        HttpResponse: Prometheus text format, or 403 without a valid token
+    """
+    from django.conf import settings
+    from django.http import HttpResponse
+    from core.metrics import job_queue_gauges, render
+    
+    if not settings.METRICS_TOKEN:
+        if not settings.DEBUG:
+            return JsonResponse({"detail": "METRICS_TOKEN is not configured"}, status=403)
+    elif request.headers.get('Authorization') != f"Bearer {settings.METRICS_TOKEN}":
+        return JsonResponse({"detail": "Invalid metrics token"}, status=403)
+    
+    return HttpResponse(render(job_queue_gauges()), content_type='text/plain; version=0.0.4; charset=utf-8')
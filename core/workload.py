@@ -0,0 +1,98 @@
+"""
+Organization workload index for assignment suggestions.
+One GROUP BY assigned_to aggregate gives each member's open tasks and a
+load weighted by priority and estimated hours. The index is cached per
+organization under a stamp of its version and its projects' versions, which
+every membership and task write bumps (see projects.signals and the bulk
+paths' touch()), so writes make it unreachable instead of waiting for a TTL.
+A lookup is then one stamp query and a cache read, whatever the org's size.
+"""
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, FloatField, Max, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+from core import metrics
+from orgs.models import Membership, Organization
+from projects.models import Task, TaskStatus
+
+OPEN_STATUSES = (TaskStatus.TODO, TaskStatus.IN_PROGRESS)
+PRIORITY_WEIGHTS = {'low': 1.0, 'medium': 2.0, 'high': 3.0, 'urgent': 4.0}
+# Hours assumed for tasks without an estimate
+DEFAULT_TASK_HOURS = 4.0
+
+
+def task_load():
+    """Expression: a task's priority weight times its estimated hours."""
+    weight = Case(
+        *[When(priority=priority, then=Value(w)) for priority, w in PRIORITY_WEIGHTS.items()],
+        default=Value(PRIORITY_WEIGHTS['medium']), output_field=FloatField()
+    )
+    hours = Coalesce(Cast('estimated_hours', FloatField()), Value(DEFAULT_TASK_HOURS), output_field=FloatField())
+    return weight * hours
+
+
+def compute(organization_id: int) -> Dict:
+    """
+    {'members': {user_id: username}, 'loads': {user_id: (tasks, load)},
+    'least_loaded': user_id or None} for the organization's members.
+    """
+    members = dict(Membership.objects.filter(organization_id=organization_id).values_list(
+        'user_id', 'user__username'
+    ))
+    rows = Task.objects.filter(
+        project__organization_id=organization_id, assigned_to__isnull=False,
+        status__in=OPEN_STATUSES, deleted_at__isnull=True,
+    ).order_by().values('assigned_to').annotate(
+        tasks=Count('id'), load=Sum(task_load(), output_field=FloatField())
+    ).values_list('assigned_to', 'tasks', 'load')
+    # Former members may still hold tasks; they are not candidates
+    loads = {user_id: (tasks, round(load, 2)) for user_id, tasks, load in rows if user_id in members}
+    least_loaded = min(
+        members, key=lambda user_id: (loads.get(user_id, (0, 0.0))[::-1], user_id), default=None
+    )
+    return {'members': members, 'loads': loads, 'least_loaded': least_loaded}
+
+
+def stamp(organization_id: int) -> Optional[str]:
+    """Changes whenever a membership or any task of the organization is written."""
+    row = Organization.objects.filter(pk=organization_id).annotate(
+        project_count=Count('projects'),
+        project_versions=Sum('projects__version'),
+        last_change=Max('projects__content_updated_at'),
+    ).values_list('version', 'project_count', 'project_versions', 'last_change').first()
+    if row is None:
+        return None
+    version, count, versions, last_change = row
+    return f"{version}:{count}:{versions or 0}:{last_change.timestamp() if last_change else 0}"
+
+
+def workload_index(organization_id: int) -> Optional[Dict]:
+    """The cached index (see compute()), or None if the organization does not exist."""
+    current = stamp(organization_id)
+    if current is None:
+        return None
+    key = f'workload:{organization_id}:{current}'
+    index = cache.get(key)
+    metrics.record_cache('workload', index is not None)
+    if index is None:
+        index = compute(organization_id)
+        cache.set(key, index, settings.WORKLOAD_CACHE_TIMEOUT)
+    return index
+
+
+def suggest_assignee(organization_id: int) -> Optional[Dict]:
+    """The member with the least weighted open work (ties: fewer tasks, then lowest id)."""
+    index = workload_index(organization_id)
+    if not index or index['least_loaded'] is None:
+        return None
+    user_id = index['least_loaded']
+    tasks, load = index['loads'].get(user_id, (0, 0.0))
+    return {
+        'user_id': user_id,
+        'username': index['members'][user_id],
+        'current_tasks': tasks,
+        'load': load,
+    }
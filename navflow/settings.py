@@ -16,6 +16,7 @@ from decouple import config
 import dj_database_url
 import os
 import re
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -78,6 +79,9 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     
+    # Per-request query count/time, Server-Timing header and N+1 logging
+    'core.performance.QueryInstrumentationMiddleware',
+    
     # Multi-tenant SaaS support (optional - enable when needed)
     # 'core.tenant.MultiTenantMiddleware',
     
@@ -114,9 +118,14 @@ WSGI_APPLICATION = 'navflow.wsgi.application'
 # Use DATABASE_URL if provided by environment, otherwise use individual config values
 DATABASE_URL = config('DATABASE_URL', default=None)
 
+# Seconds to keep connections open. Set 0 when serving ASGI, where each
+# request gets fresh connection state and persistent connections pile up
+# instead of being reused; put a pooler (e.g. PgBouncer) in front instead
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600)
+        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=DB_CONN_MAX_AGE)
     }
 else:
     DATABASES = {
@@ -324,6 +333,74 @@ if CELERY_BROKER_URL:
     CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
     CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 
+# Task exports: projects above the row limit are exported in the background
+# to gzipped files under EXPORTS_ROOT instead of streaming in the request
+EXPORTS_ROOT = config('EXPORTS_ROOT', default=os.path.join(BASE_DIR, 'exports'))
+TASK_EXPORT_STREAM_MAX_ROWS = config('TASK_EXPORT_STREAM_MAX_ROWS', default=50000, cast=int)
+
+# Timers running longer than this are capped and auto-paused by the sweeper
+TIMER_MAX_RUNNING_MINUTES = config('TIMER_MAX_RUNNING_MINUTES', default=12 * 60, cast=int)
+
+# Purge of soft-deleted tasks and users: retention, rows per transaction,
+# and pause between chunks to limit lock time and replication lag
+SOFT_DELETE_RETENTION_DAYS = config('SOFT_DELETE_RETENTION_DAYS', default=30, cast=int)
+PURGE_CHUNK_SIZE = config('PURGE_CHUNK_SIZE', default=500, cast=int)
+PURGE_SLEEP_SECONDS = config('PURGE_SLEEP_SECONDS', default=0.0, cast=float)
+
+# Query instrumentation (core.performance.QueryInstrumentationMiddleware):
+# requests over the query budget or repeating one statement this many times
+# are logged to 'navflow.queries', for a sampled fraction of requests
+QUERY_INSTRUMENTATION_ENABLED = config('QUERY_INSTRUMENTATION_ENABLED', default=True, cast=bool)
+QUERY_SERVER_TIMING = config('QUERY_SERVER_TIMING', default=True, cast=bool)
+QUERY_COUNT_THRESHOLD = config('QUERY_COUNT_THRESHOLD', default=50, cast=int)
+QUERY_REPEAT_THRESHOLD = config('QUERY_REPEAT_THRESHOLD', default=10, cast=int)
+QUERY_LOG_SAMPLE_RATE = config('QUERY_LOG_SAMPLE_RATE', default=0.1, cast=float)
+
+# ETag/Last-Modified on project and task reads (core.conditional); repeat
+# GETs with a matching If-None-Match get a 304 without serializing
+CONDITIONAL_GET_ENABLED = config('CONDITIONAL_GET_ENABLED', default=True, cast=bool)
+
+# Version-keyed cache of section, label and member lists (core.response_cache).
+# Writes bump the scope's version, so the timeout only bounds memory use
+RESPONSE_CACHE_ENABLED = config('RESPONSE_CACHE_ENABLED', default=True, cast=bool)
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=86400, cast=int)
+
+# List endpoints rendered from values() rows instead of their serializer
+# (core.projections), by projection name, comma-separated; empty disables
+READ_PROJECTIONS = [name for name in config('READ_PROJECTIONS', default='tasks').split(',') if name]
+
+# Per-organization workload index for assignment suggestions (core.workload).
+# Keyed by org and project versions, so the timeout only bounds memory use
+WORKLOAD_CACHE_TIMEOUT = config('WORKLOAD_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Prometheus /metrics: each worker flushes its values to METRICS_DIR every
+# METRICS_FLUSH_SECONDS and the endpoint sums them. Clear the directory when
+# deploying. Scrapes must send METRICS_TOKEN as a bearer token; without one
+# set, /metrics is only served when DEBUG is on.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default=os.path.join(tempfile.gettempdir(), 'navflow-metrics'))
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=5.0, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# In-process background jobs, used when CELERY_BROKER_URL is not set
+BACKGROUND_TASK_WORKERS = config('BACKGROUND_TASK_WORKERS', default=4, cast=int)
+BACKGROUND_TASK_MAX_PENDING = config('BACKGROUND_TASK_MAX_PENDING', default=1000, cast=int)
+BACKGROUND_TASK_PROCESS_WORKERS = config('BACKGROUND_TASK_PROCESS_WORKERS', default=2, cast=int)
+BACKGROUND_TASK_MAX_RETRIES = config('BACKGROUND_TASK_MAX_RETRIES', default=2, cast=int)
+BACKGROUND_TASK_RETRY_BACKOFF = config('BACKGROUND_TASK_RETRY_BACKOFF', default=5.0, cast=float)
+BACKGROUND_TASK_SHUTDOWN_TIMEOUT = config('BACKGROUND_TASK_SHUTDOWN_TIMEOUT', default=30.0, cast=float)
+BACKGROUND_TASKS_ALWAYS_EAGER = config('BACKGROUND_TASKS_ALWAYS_EAGER', default=False, cast=bool)
+# 'local' runs jobs on the in-process executor; 'database' stores them in
+# core.Job for `manage.py run_jobs` workers on any node to claim
+BACKGROUND_TASK_BACKEND = config('BACKGROUND_TASK_BACKEND', default='local')
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=5, cast=int)
+JOB_RETRY_BASE_SECONDS = config('JOB_RETRY_BASE_SECONDS', default=30, cast=int)
+JOB_RETRY_MAX_SECONDS = config('JOB_RETRY_MAX_SECONDS', default=3600, cast=int)
+# Running jobs are handed to another worker after this many seconds
+# without a heartbeat, which running jobs send every JOB_HEARTBEAT_SECONDS
+JOB_VISIBILITY_TIMEOUT = config('JOB_VISIBILITY_TIMEOUT', default=1800, cast=int)
+JOB_HEARTBEAT_SECONDS = config('JOB_HEARTBEAT_SECONDS', default=60, cast=int)
+
 # Email Configuration for Async Emails
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
@@ -332,7 +409,23 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@navflow.app')
+# Threads sending the daily digest, each over its own reused SMTP connection
+DIGEST_SENDER_THREADS = config('DIGEST_SENDER_THREADS', default=1, cast=int)
+# How far back the first overdue scan looks before a watermark exists
+OVERDUE_INITIAL_LOOKBACK_HOURS = config('OVERDUE_INITIAL_LOOKBACK_HOURS', default=24, cast=int)
 
 # OpenAI Configuration for AI Features (Optional)
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
-OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-3.5-turbo')
\ No newline at end of file
+OPENAI_MODEL = config('OPENAI_MODEL', default='gpt-3.5-turbo')
+
+# AI pipeline (core.ai_pipeline): 'openai' when a key is set, otherwise the
+# deterministic offline 'stub'. Callers wait AI_REQUEST_TIMEOUT seconds at
+# most; up to AI_MAX_CONCURRENCY provider calls run at once, each carrying up
+# to AI_BATCH_SIZE prompts, and results are cached by a hash of their inputs.
+# Beyond AI_MAX_PENDING queued prompts, new ones get the stub's answer at once
+AI_BACKEND = config('AI_BACKEND', default='openai' if OPENAI_API_KEY else 'stub')
+AI_REQUEST_TIMEOUT = config('AI_REQUEST_TIMEOUT', default=10.0, cast=float)
+AI_MAX_CONCURRENCY = config('AI_MAX_CONCURRENCY', default=4, cast=int)
+AI_BATCH_SIZE = config('AI_BATCH_SIZE', default=8, cast=int)
+AI_CACHE_TIMEOUT = config('AI_CACHE_TIMEOUT', default=7 * 24 * 3600, cast=int)
+AI_MAX_PENDING = config('AI_MAX_PENDING', default=100, cast=int)
\ No newline at end of file
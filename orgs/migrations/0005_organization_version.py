@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orgs', '0004_add_org_permissions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
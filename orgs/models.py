@@ -1,10 +1,55 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 
 User = get_user_model()
 
 
+class OrganizationQuerySet(models.QuerySet):
+    """Custom queryset for Organization model."""
+    
+    def for_member(self, user):
+        """Organizations the user belongs to, without a join + DISTINCT."""
+        return self.filter(
+            id__in=Membership.objects.filter(user=user).values('organization_id')
+        )
+    
+    def touch(self):
+        """Bump the version that keys cached member and label responses (see core.response_cache)."""
+        return self.update(version=models.F('version') + 1)
+    
+    def with_list_stats(self, user=None):
+        """
+        Annotate the member count and the caller's role, and prefetch the owner
+        membership into `owner_memberships`, so serializers run no per-row queries.
+        """
+        member_count = Membership.objects.filter(
+            organization=models.OuterRef('pk')
+        ).order_by().values('organization').annotate(c=models.Count('pk')).values('c')
+        
+        queryset = self.annotate(
+            member_count=Coalesce(models.Subquery(member_count), 0),
+        ).prefetch_related(
+            models.Prefetch(
+                'memberships',
+                queryset=Membership.objects.filter(role=Membership.OWNER).select_related('user'),
+                to_attr='owner_memberships'
+            )
+        )
+        
+        if user is not None:
+            queryset = queryset.annotate(
+                caller_role=models.Subquery(
+                    Membership.objects.filter(
+                        organization=models.OuterRef('pk'),
+                        user=user
+                    ).values('role')[:1]
+                )
+            )
+        return queryset
+
+
 class Organization(models.Model):
     """
     Organization model that groups users together.
@@ -13,6 +58,10 @@ class Organization(models.Model):
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Bumped by orgs.signals and projects.signals when members or labels change
+    version = models.PositiveBigIntegerField(default=0)
+    
+    objects = OrganizationQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
@@ -24,7 +73,9 @@ class Organization(models.Model):
         return self.name
     
     def get_owner(self):
-        """Get the owner of this organization."""
+        """Get the owner of this organization (uses prefetched `owner_memberships` when present)."""
+        if hasattr(self, 'owner_memberships'):
+            return self.owner_memberships[0] if self.owner_memberships else None
         return self.memberships.filter(role=Membership.OWNER).first()
 
 
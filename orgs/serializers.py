@@ -40,10 +40,14 @@ class OrganizationSerializer(serializers.ModelSerializer):
     
     def get_member_count(self, obj):
         """Get the number of members."""
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return obj.memberships.count()
     
     def get_user_role(self, obj):
         """Get the current user's role in this organization."""
+        if hasattr(obj, 'caller_role'):
+            return obj.caller_role
         user = self.context.get('user')
         if user:
             try:
@@ -65,6 +69,9 @@ class OrganizationListSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'owner_email', 'member_count', 'user_role', 'created_at']
         read_only_fields = fields
     
+    # Count and caller role come from Organization.objects.with_list_stats();
+    # the fallbacks keep un-annotated querysets working.
+    
     def get_owner_email(self, obj):
         """Get the owner's email."""
         owner = obj.get_owner()
@@ -72,10 +79,14 @@ class OrganizationListSerializer(serializers.ModelSerializer):
     
     def get_member_count(self, obj):
         """Get the number of members."""
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return obj.memberships.count()
     
     def get_user_role(self, obj):
         """Get the current user's role in this organization."""
+        if hasattr(obj, 'caller_role'):
+            return obj.caller_role
         user = self.context.get('user')
         if user:
             try:
@@ -337,3 +348,26 @@ class OrgMemberWithPermissionsSerializer(serializers.ModelSerializer):
             # If no permissions exist, create defaults
             org_permissions = OrgPermissions.create_for_org(obj.organization)
             return org_permissions.get_permissions_for_role(obj.role)
+
+
+class MemberProjectsSerializer(serializers.Serializer):
+    """One member's desired project access."""
+    user_email = serializers.EmailField()
+    project_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=True)
+
+
+class BulkMemberProjectsSerializer(serializers.Serializer):
+    """Serializer for syncing project access for many members at once."""
+    MAX_MEMBERS = 1000
+    
+    members = MemberProjectsSerializer(many=True, allow_empty=False)
+    
+    def validate_members(self, value):
+        """Cap the batch size and reject duplicate members."""
+        if len(value) > self.MAX_MEMBERS:
+            raise serializers.ValidationError(f"At most {self.MAX_MEMBERS} members per request.")
+        
+        emails = [m['user_email'] for m in value]
+        if len(set(emails)) != len(emails):
+            raise serializers.ValidationError("Each member may only appear once.")
+        return value
@@ -0,0 +1,27 @@
+"""
+Organization version bumps for the response cache (see core.response_cache).
+Member lists change with memberships, organization edits and member profiles.
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Membership, Organization
+
+
+@receiver([post_save, post_delete], sender=Membership)
+def membership_changed(sender, instance, **kwargs):
+    Organization.objects.filter(pk=instance.organization_id).touch()
+
+
+@receiver(post_save, sender=Organization)
+def organization_saved(sender, instance, created, **kwargs):
+    if not created:
+        Organization.objects.filter(pk=instance.pk).touch()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    Organization.objects.filter(memberships__user_id=instance.pk).touch()
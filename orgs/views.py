@@ -3,7 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.db import models, transaction
 import logging
 from .models import Organization, Membership, Invitation, OrgPermissions
 from .serializers import (
@@ -16,8 +16,10 @@ from .serializers import (
     UpdateMemberRoleSerializer,
     OrgPermissionsSerializer,
     OrgPermissionsUpdateSerializer,
-    OrgMemberWithPermissionsSerializer
+    OrgMemberWithPermissionsSerializer,
+    BulkMemberProjectsSerializer
 )
+from core.response_cache import cached_response, organization_scope
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -55,11 +57,14 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         """Return organizations that the user is a member of."""
         user = self.request.user
         logger.info(f'Getting organizations for user: {user.email}')
-        orgs = Organization.objects.filter(memberships__user=user).distinct()
-        logger.info(f'Found {orgs.count()} organizations for user {user.email}')
-        for org in orgs:
-            membership = Membership.objects.get(user=user, organization=org)
-            logger.info(f'  - {org.name} (Role: {membership.role})')
+        orgs = Organization.objects.for_member(user)
+        if self.action == 'list':
+            # Member count, owner and caller role resolved in 2 queries per page
+            return orgs.with_list_stats(user)
+        if self.action == 'retrieve':
+            return orgs.with_list_stats(user).prefetch_related(
+                models.Prefetch('memberships', queryset=Membership.objects.select_related('user'))
+            )
         return orgs
     
     def get_serializer_class(self):
@@ -194,11 +199,12 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         from projects.models import Project, Task
         from projects.serializers import ProjectListSerializer
         
-        projects = Project.objects.filter(organization=organization).select_related('created_by')
+        projects = Project.objects.filter(organization=organization)
         
         # Calculate stats
         total_projects = projects.count()
         active_projects = projects.filter(status='active').count()
+        projects = projects.with_list_stats(request.user)
         total_tasks = Task.objects.filter(project__organization=organization).count()
         completed_tasks = Task.objects.filter(project__organization=organization, status='done').count()
         
@@ -282,6 +288,7 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         )
     
     @action(detail=True, methods=['get'])
+    @cached_response('org_members', organization_scope)
     def members(self, request, pk=None):
         """Get all members of an organization."""
         organization = self.get_object()
@@ -293,7 +300,7 @@ class OrganizationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        memberships = organization.memberships.all()
+        memberships = organization.memberships.select_related('user')
         serializer = MembershipSerializer(memberships, many=True)
         return Response(serializer.data)
     
@@ -465,7 +472,9 @@ class OrganizationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        invitations = organization.invitations.filter(status=Invitation.PENDING)
+        invitations = organization.invitations.filter(
+            status=Invitation.PENDING
+        ).select_related('organization', 'invited_user', 'invited_by')
         serializer = InvitationSerializer(invitations, many=True)
         return Response(serializer.data)
 
@@ -598,41 +607,86 @@ class OrganizationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Verify all projects belong to this organization
-        from projects.models import Project, ProjectRole
-        projects = Project.objects.filter(id__in=project_ids, organization=organization)
-        if projects.count() != len(project_ids):
+        # Apply only the difference against the member's current access
+        from projects.services import ProjectAccessService
+        from django.core.exceptions import ValidationError
+        try:
+            result = ProjectAccessService.sync_member_projects(
+                organization,
+                {member_membership: project_ids}
+            )
+        except ValidationError as e:
             return Response(
-                {'detail': 'Some projects do not belong to this organization.'},
+                {'detail': e.messages[0]},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Remove user from all projects in this org first
-        ProjectRole.objects.filter(
-            user=member_user,
-            project__organization=organization
-        ).delete()
-        
-        # Add user to selected projects with appropriate role based on their org role
-        project_role_map = {
-            Membership.OWNER: ProjectRole.OWNER,
-            Membership.ADMIN: ProjectRole.ADMIN,
-            Membership.MODERATOR: ProjectRole.MODERATOR,
-            Membership.MEMBER: ProjectRole.MEMBER,
-        }
+        return Response({
+            'detail': 'Project access updated successfully.',
+            'project_ids': project_ids,
+            **result
+        })
+    
+    @action(detail=True, methods=['post'], url_path='members/projects/bulk-update')
+    def bulk_update_member_projects(self, request, pk=None):
+        """
+        Update project access for many members in one call.
+        Body: {"members": [{"user_email": ..., "project_ids": [...]}, ...]}
+        Only owners and admins can update member project access.
+        """
+        organization = self.get_object()
+        
+        # Check if requester is admin or owner
+        try:
+            requester_membership = Membership.objects.get(user=request.user, organization=organization)
+            if requester_membership.role not in [Membership.ADMIN, Membership.OWNER]:
+                return Response(
+                    {'detail': 'Only owners and admins can update member project access.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+        except Membership.DoesNotExist:
+            return Response(
+                {'detail': 'You are not a member of this organization.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
-        project_role = project_role_map.get(member_membership.role, ProjectRole.MEMBER)
+        serializer = BulkMemberProjectsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        members = serializer.validated_data['members']
+        
+        # Resolve all memberships in one query
+        emails = [m['user_email'] for m in members]
+        memberships = {
+            m.user.email: m
+            for m in Membership.objects.filter(
+                organization=organization,
+                user__email__in=emails
+            ).select_related('user')
+        }
+        missing = [email for email in emails if email not in memberships]
+        if missing:
+            return Response(
+                {'detail': 'Some users are not members of this organization.', 'user_emails': missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        for project in projects:
-            ProjectRole.objects.create(
-                user=member_user,
-                project=project,
-                role=project_role
+        from projects.services import ProjectAccessService
+        from django.core.exceptions import ValidationError
+        try:
+            result = ProjectAccessService.sync_member_projects(
+                organization,
+                {memberships[m['user_email']]: m['project_ids'] for m in members}
+            )
+        except ValidationError as e:
+            return Response(
+                {'detail': e.messages[0]},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
         return Response({
             'detail': 'Project access updated successfully.',
-            'project_ids': project_ids
+            'members_updated': len(members),
+            **result
         })
     
     @action(detail=True, methods=['get'])
@@ -787,7 +841,7 @@ class InvitationViewSet(viewsets.ViewSet):
         invitations = Invitation.objects.filter(
             invited_user=request.user,
             status=Invitation.PENDING
-        )
+        ).select_related('organization', 'invited_user', 'invited_by')
         serializer = InvitationSerializer(invitations, many=True)
         return Response(serializer.data)
     
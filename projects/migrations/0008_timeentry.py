@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_time_entries(apps, schema_editor):
+    """Seed one entry per task with tracked time so totals match entry sums."""
+    Task = apps.get_model('projects', 'Task')
+    TimeEntry = apps.get_model('projects', 'TimeEntry')
+    
+    batch = []
+    tasks = Task.objects.filter(time_spent_minutes__gt=0).values_list(
+        'id', 'project_id', 'assigned_to_id', 'time_spent_minutes', 'started_at', 'updated_at'
+    )
+    for task_id, project_id, user_id, minutes, started_at, updated_at in tasks.iterator(chunk_size=2000):
+        batch.append(TimeEntry(
+            task_id=task_id,
+            project_id=project_id,
+            user_id=user_id,
+            started_at=started_at or updated_at,
+            ended_at=updated_at,
+            minutes=minutes,
+            source='migrated',
+        ))
+        if len(batch) >= 2000:
+            TimeEntry.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        TimeEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_taskexport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField()),
+                ('minutes', models.IntegerField()),
+                ('source', models.CharField(choices=[('timer', 'Timer'), ('manual', 'Manual'), ('reset', 'Reset'), ('migrated', 'Migrated')], default='timer', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_entries', to='projects.project')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_entries', to='projects.task')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='time_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['user', 'started_at'], name='projects_ti_user_id_3c399d_idx'), models.Index(fields=['project', 'started_at'], name='projects_ti_project_6a0082_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_time_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_timeentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='timer_started_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='running_timers', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='timeentry',
+            name='source',
+            field=models.CharField(choices=[('timer', 'Timer'), ('manual', 'Manual'), ('reset', 'Reset'), ('migrated', 'Migrated'), ('auto_paused', 'Auto-paused')], default='timer', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_timer_running', True)), fields=['timer_started_at'], name='task_running_timer_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+DEFAULT_LABELS = [
+    {'name': 'Bug', 'color': '#ef4444', 'bg_color': '#fef2f2', 'icon': 'Bug'},
+    {'name': 'Feature', 'color': '#10b981', 'bg_color': '#ecfdf5', 'icon': 'Sparkles'},
+    {'name': 'Enhancement', 'color': '#3b82f6', 'bg_color': '#eff6ff', 'icon': 'Zap'},
+    {'name': 'Documentation', 'color': '#8b5cf6', 'bg_color': '#f5f3ff', 'icon': 'FileText'},
+    {'name': 'Urgent', 'color': '#f59e0b', 'bg_color': '#fffbeb', 'icon': 'AlertTriangle'},
+    {'name': 'Help Wanted', 'color': '#ec4899', 'bg_color': '#fdf2f8', 'icon': 'HelpCircle'},
+]
+
+
+def seed_default_labels(apps, schema_editor):
+    """
+    Create the default labels once. Duplicates left by concurrent
+    get_or_create calls are merged into the oldest row first.
+    """
+    TaskLabel = apps.get_model('projects', 'TaskLabel')
+    Through = apps.get_model('projects', 'Task').labels.through
+
+    for name in TaskLabel.objects.filter(is_default=True).values_list('name', flat=True).distinct():
+        keep, *duplicates = TaskLabel.objects.filter(is_default=True, name=name).order_by('id')
+        for duplicate in duplicates:
+            linked = Through.objects.filter(tasklabel_id=keep.id).values('task_id')
+            Through.objects.filter(tasklabel_id=duplicate.id).exclude(task_id__in=linked).update(tasklabel_id=keep.id)
+            duplicate.delete()
+
+    for default in DEFAULT_LABELS:
+        TaskLabel.objects.get_or_create(name=default['name'], is_default=True, defaults=default)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orgs', '0005_organization_version'),
+        ('projects', '0011_project_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_default_labels, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tasklabel',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('name',), name='unique_default_label_name'),
+        ),
+    ]
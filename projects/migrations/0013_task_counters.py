@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:04
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+STATUSES = ['todo', 'in_progress', 'review', 'done']
+
+
+def backfill_counters(apps, schema_editor):
+    """Set the new counters from existing task rows (same as core.counters.reconcile)."""
+    Project = apps.get_model('projects', 'Project')
+    TaskSection = apps.get_model('projects', 'TaskSection')
+    Task = apps.get_model('projects', 'Task')
+
+    def active_count(field, **filters):
+        count = Task.objects.filter(
+            **{field: OuterRef('pk')}, deleted_at__isnull=True, **filters
+        ).order_by().values(field).annotate(c=Count('pk')).values('c')
+        return Coalesce(Subquery(count), 0)
+
+    Project.objects.update(
+        active_task_count=active_count('project'),
+        **{f'{status}_task_count': active_count('project', status=status) for status in STATUSES}
+    )
+    TaskSection.objects.update(active_task_count=active_count('section'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_default_labels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='active_task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='done_task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='review_task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='todo_task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tasksection',
+            name='active_task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -7,6 +9,19 @@ import re
 
 User = get_user_model()
 
+DEFAULT_LABELS = [
+    {'name': 'Bug', 'color': '#ef4444', 'bg_color': '#fef2f2', 'icon': 'Bug', 'is_default': True},
+    {'name': 'Feature', 'color': '#10b981', 'bg_color': '#ecfdf5', 'icon': 'Sparkles', 'is_default': True},
+    {'name': 'Enhancement', 'color': '#3b82f6', 'bg_color': '#eff6ff', 'icon': 'Zap', 'is_default': True},
+    {'name': 'Documentation', 'color': '#8b5cf6', 'bg_color': '#f5f3ff', 'icon': 'FileText', 'is_default': True},
+    {'name': 'Urgent', 'color': '#f59e0b', 'bg_color': '#fffbeb', 'icon': 'AlertTriangle', 'is_default': True},
+    {'name': 'Help Wanted', 'color': '#ec4899', 'bg_color': '#fdf2f8', 'icon': 'HelpCircle', 'is_default': True},
+]
+
+# Default labels are seeded by migration 0012 and rarely change, so each
+# process loads them once; projects.signals clears this on default label writes
+_default_labels = None
+
 
 class TaskLabel(models.Model):
     """
@@ -34,30 +49,38 @@ class TaskLabel(models.Model):
             models.Index(fields=['organization']),
             models.Index(fields=['project']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['name'],
+                condition=models.Q(is_default=True),
+                name='unique_default_label_name'
+            ),
+        ]
     
     def __str__(self):
         return self.name
     
     @classmethod
     def get_default_labels(cls):
-        """Get or create default labels."""
-        defaults = [
-            {'name': 'Bug', 'color': '#ef4444', 'bg_color': '#fef2f2', 'icon': 'Bug', 'is_default': True},
-            {'name': 'Feature', 'color': '#10b981', 'bg_color': '#ecfdf5', 'icon': 'Sparkles', 'is_default': True},
-            {'name': 'Enhancement', 'color': '#3b82f6', 'bg_color': '#eff6ff', 'icon': 'Zap', 'is_default': True},
-            {'name': 'Documentation', 'color': '#8b5cf6', 'bg_color': '#f5f3ff', 'icon': 'FileText', 'is_default': True},
-            {'name': 'Urgent', 'color': '#f59e0b', 'bg_color': '#fffbeb', 'icon': 'AlertTriangle', 'is_default': True},
-            {'name': 'Help Wanted', 'color': '#ec4899', 'bg_color': '#fdf2f8', 'icon': 'HelpCircle', 'is_default': True},
-        ]
-        labels = []
-        for default in defaults:
-            label, _ = cls.objects.get_or_create(
-                name=default['name'],
-                is_default=True,
-                defaults=default
-            )
-            labels.append(label)
-        return labels
+        """Default labels in DEFAULT_LABELS order, memoized per process."""
+        global _default_labels
+        if _default_labels is None:
+            names = [default['name'] for default in DEFAULT_LABELS]
+            found = {label.name: label for label in cls.objects.filter(is_default=True, name__in=names)}
+            labels = []
+            for default in DEFAULT_LABELS:
+                label = found.get(default['name'])
+                if label is None:
+                    # Only when the seed rows were removed (e.g. a flushed database)
+                    label, _ = cls.objects.get_or_create(name=default['name'], is_default=True, defaults=default)
+                labels.append(label)
+            _default_labels = labels
+        return list(_default_labels)
+    
+    @classmethod
+    def clear_default_labels(cls):
+        global _default_labels
+        _default_labels = None
 
 
 class TaskSection(models.Model):
@@ -77,6 +100,8 @@ class TaskSection(models.Model):
     is_default = models.BooleanField(default=False, help_text="Whether this is a default section")
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_sections')
+    # Tasks not soft-deleted, maintained by core.counters
+    active_task_count = models.IntegerField(default=0)
     
     class Meta:
         ordering = ['position']
@@ -148,6 +173,100 @@ class ProjectRole(models.Model):
             raise ValidationError("User must be a member of the project's organization.")
 
 
+class ProjectQuerySet(models.QuerySet):
+    """Custom queryset for Project model."""
+    
+    def for_member(self, user):
+        """Projects the user holds a role in, without a join + DISTINCT."""
+        return self.filter(
+            id__in=ProjectRole.objects.filter(user=user).values('project_id')
+        )
+    
+    def touch(self):
+        """Bump the content version that conditional GETs compare (see core.conditional)."""
+        return self.update(version=models.F('version') + 1, content_updated_at=timezone.now())
+    
+    def with_list_stats(self, user=None):
+        """
+        Annotate the member count and the caller's role, and prefetch the
+        owner role into `owner_roles`, so list serializers run no per-row queries.
+        Task counts are columns (see core.counters).
+        """
+        member_count = ProjectRole.objects.filter(
+            project=models.OuterRef('pk')
+        ).order_by().values('project').annotate(c=models.Count('pk')).values('c')
+        
+        queryset = self.select_related('organization', 'created_by').annotate(
+            member_count=Coalesce(models.Subquery(member_count), 0),
+        ).prefetch_related(
+            models.Prefetch(
+                'roles',
+                queryset=ProjectRole.objects.filter(role=ProjectRole.OWNER).select_related('user'),
+                to_attr='owner_roles'
+            )
+        )
+        
+        if user is not None:
+            queryset = queryset.annotate(
+                caller_role=models.Subquery(
+                    ProjectRole.objects.filter(
+                        project=models.OuterRef('pk'),
+                        user=user
+                    ).values('role')[:1]
+                )
+            )
+        return queryset
+    
+    def with_detail_stats(self, user=None):
+        """
+        with_list_stats() plus the roles, tasks and sections that
+        ProjectDetailSerializer nests, each prefetched with its own stats.
+        Soft-deleted tasks are left out, as everywhere else in the API.
+        """
+        return self.with_list_stats(user).prefetch_related(
+            models.Prefetch('roles', queryset=ProjectRole.objects.select_related('user')),
+            models.Prefetch('tasks', queryset=Task.objects.filter(deleted_at__isnull=True).with_list_stats(user)),
+        )
+
+
+class TaskQuerySet(models.QuerySet):
+    """Custom queryset for Task model."""
+    
+    def with_list_stats(self, user=None):
+        """
+        Join project, organization, section and people, prefetch labels and
+        annotate comment/attachment counts and the caller's focus id, so
+        TaskSerializer runs no per-row queries.
+        """
+        comment_count = TaskComment.objects.filter(
+            task=models.OuterRef('pk')
+        ).order_by().values('task').annotate(c=models.Count('pk')).values('c')
+        attachment_count = TaskAttachment.objects.filter(
+            task=models.OuterRef('pk')
+        ).order_by().values('task').annotate(c=models.Count('pk')).values('c')
+        
+        queryset = self.select_related(
+            'project__organization', 'section', 'assigned_to', 'created_by'
+        ).prefetch_related(
+            # Label data is rendered from the organization's label catalog
+            models.Prefetch('labels', queryset=TaskLabel.objects.only('id'))
+        ).annotate(
+            comment_count=Coalesce(models.Subquery(comment_count), 0),
+            attachment_count=Coalesce(models.Subquery(attachment_count), 0),
+        )
+        
+        if user is not None:
+            queryset = queryset.annotate(
+                caller_focus_id=models.Subquery(
+                    FocusedTask.objects.filter(
+                        task=models.OuterRef('pk'),
+                        user=user
+                    ).values('pk')[:1]
+                )
+            )
+        return queryset
+
+
 class Project(models.Model):
     """
     Project model that belongs to an organization.
@@ -164,6 +283,17 @@ class Project(models.Model):
         choices=[('active', 'Active'), ('archived', 'Archived')],
         default='active'
     )
+    # Bumped by projects.signals whenever anything a project response shows changes
+    version = models.PositiveBigIntegerField(default=0)
+    content_updated_at = models.DateTimeField(default=timezone.now)
+    # Tasks not soft-deleted, in total and per status, maintained by core.counters
+    active_task_count = models.IntegerField(default=0)
+    todo_task_count = models.IntegerField(default=0)
+    in_progress_task_count = models.IntegerField(default=0)
+    review_task_count = models.IntegerField(default=0)
+    done_task_count = models.IntegerField(default=0)
+    
+    objects = ProjectQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
@@ -178,12 +308,18 @@ class Project(models.Model):
         return f"{self.name} ({self.organization.name})"
     
     def get_owner(self):
-        """Get the owner of this project."""
+        """Get the owner of this project (uses prefetched `owner_roles` when present)."""
+        if hasattr(self, 'owner_roles'):
+            return self.owner_roles[0] if self.owner_roles else None
         return self.roles.filter(role=ProjectRole.OWNER).first()
     
     def get_members_with_role(self, role):
         """Get all members with a specific role."""
         return self.roles.filter(role=role)
+    
+    def get_status_counts(self):
+        """Active task count per status, from the counter columns."""
+        return {status: getattr(self, f'{status}_task_count') for status in TaskStatus.values}
 
 
 class TaskStatus(models.TextChoices):
@@ -233,8 +369,11 @@ class Task(models.Model):
     completed_at = models.DateTimeField(blank=True, null=True, help_text="When task was completed")
     is_timer_running = models.BooleanField(default=False, help_text="Whether timer is currently running")
     timer_started_at = models.DateTimeField(blank=True, null=True, help_text="When the current timer session started")
+    timer_started_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='running_timers')
     position = models.PositiveIntegerField(default=0, help_text="Position in kanban column for ordering")
     
+    objects = TaskQuerySet.as_manager()
+    
     class Meta:
         ordering = ['position', '-created_at']
         indexes = [
@@ -243,11 +382,34 @@ class Task(models.Model):
             models.Index(fields=['deleted_at']),  # Phase 4: Index for soft delete filtering
             models.Index(fields=['project', 'status', 'position']),  # Phase 6: For kanban ordering
             models.Index(fields=['project', 'section', 'position']),  # Phase 7: For section ordering
+            models.Index(fields=['due_date']),  # Overdue detection scans a due_date window
+            models.Index(fields=['updated_at']),  # ...and tasks edited since its last run
+            # Only running timers are indexed, so the live dashboard and sweeper stay cheap
+            models.Index(
+                fields=['timer_started_at'],
+                condition=models.Q(is_timer_running=True),
+                name='task_running_timer_idx'
+            ),
         ]
     
     def __str__(self):
         return f"{self.title} ({self.project.name})"
     
+    # Fields that decide which counters a task is in (see core.counters)
+    COUNTER_FIELDS = ('project_id', 'section_id', 'status', 'deleted_at')
+    
+    def save(self, *args, **kwargs):
+        # projects.signals locks the stored row to read the counter key it
+        # moves from; the lock must last until the save commits
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def counter_key(self):
+        """(project_id, section_id, status) while the task is active, else None."""
+        if self.deleted_at is not None:
+            return None
+        return (self.project_id, self.section_id, self.status)
+    
     @classmethod
     def get_active(cls):
         """Phase 4: Return only non-deleted tasks."""
@@ -263,6 +425,7 @@ class Task(models.Model):
         if not self.is_timer_running:
             self.is_timer_running = True
             self.timer_started_at = timezone.now()
+            self.timer_started_by = user
             if not self.started_at:
                 self.started_at = timezone.now()
             self.save()
@@ -282,11 +445,7 @@ class Task(models.Model):
     def pause_timer(self, user=None):
         """Pause the task timer and log elapsed time without stopping."""
         if self.is_timer_running and self.timer_started_at:
-            elapsed = timezone.now() - self.timer_started_at
-            elapsed_minutes = int(elapsed.total_seconds() / 60)
-            self.time_spent_minutes += elapsed_minutes
-            self.is_timer_running = False
-            self.timer_started_at = None
+            elapsed_minutes = self._close_timer_session(user)
             self.save()
             
             # Log the action
@@ -311,11 +470,7 @@ class Task(models.Model):
     def stop_timer(self, user=None):
         """Phase 6: Stop the task timer and add elapsed time."""
         if self.is_timer_running and self.timer_started_at:
-            elapsed = timezone.now() - self.timer_started_at
-            elapsed_minutes = int(elapsed.total_seconds() / 60)
-            self.time_spent_minutes += elapsed_minutes
-            self.is_timer_running = False
-            self.timer_started_at = None
+            elapsed_minutes = self._close_timer_session(user)
             self.save()
             
             # Log the action
@@ -338,11 +493,14 @@ class Task(models.Model):
         return 0
     
     def reset_timer(self, user=None):
-        """Reset the task timer to zero."""
+        """Reset the task timer to zero with an offsetting time entry."""
         old_time = self.time_spent_minutes
-        self.time_spent_minutes = 0
+        if old_time:
+            now = timezone.now()
+            self._record_time(-old_time, getattr(user, 'id', None), TimeEntry.SOURCE_RESET, now, now)
         self.is_timer_running = False
         self.timer_started_at = None
+        self.timer_started_by = None
         self.save()
         
         # Log the action
@@ -361,6 +519,57 @@ class Task(models.Model):
                 }
             )
     
+    def add_time(self, minutes, user=None):
+        """Manually log time that was not tracked with the timer."""
+        now = timezone.now()
+        self._record_time(minutes, getattr(user, 'id', None), TimeEntry.SOURCE_MANUAL, now - timedelta(minutes=minutes), now)
+        self.save()
+    
+    def _close_timer_session(self, user):
+        """
+        Record the running session, capped at TIMER_MAX_RUNNING_MINUTES, and clear the timer.
+        Time is credited to whoever started the timer.
+        """
+        from django.conf import settings
+        
+        elapsed_minutes = int((timezone.now() - self.timer_started_at).total_seconds() / 60)
+        elapsed_minutes = min(elapsed_minutes, settings.TIMER_MAX_RUNNING_MINUTES)
+        self._record_time(
+            elapsed_minutes,
+            self.timer_started_by_id or getattr(user, 'id', None),
+            TimeEntry.SOURCE_TIMER,
+            self.timer_started_at,
+            self.timer_started_at + timedelta(minutes=elapsed_minutes)
+        )
+        self.is_timer_running = False
+        self.timer_started_at = None
+        self.timer_started_by = None
+        return elapsed_minutes
+    
+    def _record_time(self, minutes, user_id, source, started_at, ended_at):
+        """
+        Append a TimeEntry and update the time_spent_minutes cache.
+        Entries are never edited; the cache always equals their sum.
+        """
+        TimeEntry.objects.create(
+            task=self,
+            project_id=self.project_id,
+            user_id=user_id,
+            started_at=started_at,
+            ended_at=ended_at,
+            minutes=minutes,
+            source=source
+        )
+        self.time_spent_minutes += minutes
+    
+    def recalculate_time_spent(self):
+        """Rebuild the time_spent_minutes cache from time entries."""
+        total = self.time_entries.aggregate(total=models.Sum('minutes'))['total'] or 0
+        self.time_spent_minutes = max(total, 0)
+        Task.objects.filter(id=self.id).update(time_spent_minutes=self.time_spent_minutes)
+        Project.objects.filter(id=self.project_id).touch()
+        return self.time_spent_minutes
+    
     def get_time_spent_display(self):
         """Phase 6: Get formatted time spent string."""
         hours = self.time_spent_minutes // 60
@@ -370,6 +579,47 @@ class Task(models.Model):
         return f"{minutes}m"
 
 
+class TimeEntry(models.Model):
+    """
+    Append-only record of time spent on a task.
+    Task.time_spent_minutes is a cache of the sum of a task's entries;
+    resets are stored as a negative entry rather than deleting history.
+    """
+    SOURCE_TIMER = 'timer'
+    SOURCE_MANUAL = 'manual'
+    SOURCE_RESET = 'reset'
+    SOURCE_MIGRATED = 'migrated'
+    SOURCE_AUTO_PAUSED = 'auto_paused'
+    
+    SOURCE_CHOICES = [
+        (SOURCE_TIMER, 'Timer'),
+        (SOURCE_MANUAL, 'Manual'),
+        (SOURCE_RESET, 'Reset'),
+        (SOURCE_MIGRATED, 'Migrated'),
+        (SOURCE_AUTO_PAUSED, 'Auto-paused'),
+    ]
+    
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='time_entries')
+    # Denormalized from task so timesheets can filter and group without a join
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='time_entries')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='time_entries')
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    minutes = models.IntegerField()
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default=SOURCE_TIMER)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['user', 'started_at']),
+            models.Index(fields=['project', 'started_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.minutes}m on {self.task_id} by {self.user_id}"
+
+
 class TaskAttachment(models.Model):
     """
     Phase 8: Attachments for tasks (images, videos, PDFs, etc.).
@@ -526,3 +776,53 @@ class AuditLog(models.Model):
     def __str__(self):
         user_str = self.user.email if self.user else 'Unknown'
         return f"{user_str} {self.action} at {self.timestamp}"
+
+
+class TaskExport(models.Model):
+    """
+    Background task export job.
+    Tracks progress while a large project is written to a gzipped file on disk.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    FORMAT_CHOICES = [('csv', 'CSV'), ('jsonl', 'JSON Lines')]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='exports')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='task_exports')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    total_rows = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    file_path = models.CharField(max_length=500, blank=True, null=True)
+    file_size = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['project', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"Export {self.id} of {self.project.name} ({self.status})"
+
+    @property
+    def progress(self):
+        """Percentage of rows written so far."""
+        if self.status == self.STATUS_COMPLETED:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, int(self.rows_written * 100 / self.total_rows))
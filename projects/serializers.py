@@ -1,6 +1,10 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Project, Task, ProjectRole, AuditLog, TaskSection, TaskLabel, TaskComment, TaskAttachment, FocusedTask
+from django.core.cache import cache
+from django.db.models import Q
+from core import metrics
+from .models import Project, Task, ProjectRole, AuditLog, TaskSection, TaskLabel, TaskComment, TaskAttachment, FocusedTask, TaskExport
 
 User = get_user_model()
 
@@ -14,6 +18,35 @@ class TaskLabelSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+def label_catalog(organization_id, version):
+    """
+    Serialized labels usable on the organization's tasks (defaults, org-wide
+    and project labels) by id. Cached under the organization's version,
+    which label writes bump (projects.signals).
+    """
+    key = f"label_catalog:{organization_id}:{version}"
+    catalog = cache.get(key)
+    metrics.record_cache('label_catalog', catalog is not None)
+    if catalog is None:
+        labels = TaskLabel.objects.filter(
+            Q(is_default=True) | Q(organization_id=organization_id) | Q(project__organization_id=organization_id)
+        )
+        catalog = {row['id']: dict(row) for row in TaskLabelSerializer(labels, many=True).data}
+        cache.set(key, catalog, settings.RESPONSE_CACHE_TIMEOUT)
+    return catalog
+
+
+def catalog_labels(catalog, label_ids):
+    """Serialized labels in label_ids order; labels missing from the catalog are read directly."""
+    missing = [pk for pk in label_ids if pk not in catalog]
+    if missing:
+        catalog = {**catalog, **{
+            row['id']: dict(row)
+            for row in TaskLabelSerializer(TaskLabel.objects.filter(pk__in=missing), many=True).data
+        }}
+    return [catalog[pk] for pk in label_ids if pk in catalog]
+
+
 class TaskSectionSerializer(serializers.ModelSerializer):
     """Phase 7: Serializer for task sections."""
     task_count = serializers.SerializerMethodField()
@@ -24,7 +57,8 @@ class TaskSectionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'task_count']
     
     def get_task_count(self, obj):
-        return obj.tasks.filter(deleted_at__isnull=True).count()
+        # Counter column maintained by core.counters
+        return obj.active_task_count
 
 
 class TaskAttachmentSerializer(serializers.ModelSerializer):
@@ -151,7 +185,7 @@ class TaskSerializer(serializers.ModelSerializer):
     time_spent_display = serializers.CharField(source='get_time_spent_display', read_only=True)
     section_name = serializers.CharField(source='section.name', read_only=True, allow_null=True)
     section_color = serializers.CharField(source='section.color', read_only=True, allow_null=True)
-    labels_data = TaskLabelSerializer(source='labels', many=True, read_only=True)
+    labels_data = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
     attachments_count = serializers.SerializerMethodField()
     is_focused = serializers.SerializerMethodField()
@@ -172,7 +206,11 @@ class TaskSerializer(serializers.ModelSerializer):
             'time_spent_display', 'started_at', 'completed_at', 'is_timer_running',
             'timer_started_at', 'position'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'created_by_email', 'time_spent_display', 'comments_count', 'attachments_count']
+        read_only_fields = [
+            'created_at', 'updated_at', 'created_by_email', 'time_spent_display', 'comments_count', 'attachments_count',
+            # Cached sum of TimeEntry rows; changed only through the timer endpoints
+            'time_spent_minutes',
+        ]
     
     def get_assigned_to_username(self, obj):
         if obj.assigned_to_deleted and obj.assigned_to_username:
@@ -196,19 +234,40 @@ class TaskSerializer(serializers.ModelSerializer):
             return obj.assigned_to.get_initials()
         return None
     
+    # Counts and focus come from Task.objects.with_list_stats();
+    # the fallbacks keep un-annotated querysets working.
+    
+    def get_labels_data(self, obj):
+        # Label ids come from the (id-only) prefetch, their data from the
+        # organization's catalog, loaded once per serializer
+        organization = obj.project.organization
+        catalogs = self.__dict__.setdefault('_label_catalogs', {})
+        key = (organization.pk, organization.version)
+        if key not in catalogs:
+            catalogs[key] = label_catalog(*key)
+        return catalog_labels(catalogs[key], [label.pk for label in obj.labels.all()])
+    
     def get_comments_count(self, obj):
+        if hasattr(obj, 'comment_count'):
+            return obj.comment_count
         return obj.comments.count()
     
     def get_attachments_count(self, obj):
+        if hasattr(obj, 'attachment_count'):
+            return obj.attachment_count
         return obj.attachments.count()
     
     def get_is_focused(self, obj):
+        if hasattr(obj, 'caller_focus_id'):
+            return obj.caller_focus_id is not None
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return FocusedTask.objects.filter(user=request.user, task=obj).exists()
         return False
     
     def get_focused_id(self, obj):
+        if hasattr(obj, 'caller_focus_id'):
+            return obj.caller_focus_id
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             focused = FocusedTask.objects.filter(user=request.user, task=obj).first()
@@ -224,6 +283,7 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
     owner_email = serializers.SerializerMethodField()
     member_count = serializers.SerializerMethodField()
     task_count = serializers.SerializerMethodField()
+    status_counts = serializers.SerializerMethodField()
     roles = ProjectRoleSerializer(many=True, read_only=True)
     tasks = TaskSerializer(many=True, read_only=True)
     sections = TaskSectionSerializer(many=True, read_only=True)  # Phase 7: Include sections
@@ -233,12 +293,12 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         model = Project
         fields = [
             'id', 'name', 'description', 'organization_name', 'status',
-            'owner_email', 'member_count', 'task_count', 'user_role',
+            'owner_email', 'member_count', 'task_count', 'status_counts', 'user_role',
             'roles', 'tasks', 'sections', 'created_by_email', 'created_at', 'updated_at'
         ]
         read_only_fields = [
             'id', 'organization_name', 'owner_email', 'member_count',
-            'task_count', 'roles', 'tasks', 'sections', 'created_by_email', 'created_at', 'updated_at'
+            'task_count', 'status_counts', 'roles', 'tasks', 'sections', 'created_by_email', 'created_at', 'updated_at'
         ]
     
     def get_owner_email(self, obj):
@@ -249,9 +309,14 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         return obj.roles.count()
     
     def get_task_count(self, obj):
-        return obj.tasks.count()
+        return obj.active_task_count
+    
+    def get_status_counts(self, obj):
+        return obj.get_status_counts()
     
     def get_user_role(self, obj):
+        if hasattr(obj, 'caller_role'):
+            return obj.caller_role
         user = self.context.get('user')
         if user:
             try:
@@ -279,17 +344,24 @@ class ProjectListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
     
+    # Counts and caller role come from Project.objects.with_list_stats();
+    # the fallbacks keep un-annotated querysets working.
+    
     def get_owner_email(self, obj):
         owner = obj.get_owner()
         return owner.user.email if owner else None
     
     def get_member_count(self, obj):
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return obj.roles.count()
     
     def get_task_count(self, obj):
-        return obj.tasks.count()
+        return obj.active_task_count
     
     def get_user_role(self, obj):
+        if hasattr(obj, 'caller_role'):
+            return obj.caller_role
         user = self.context.get('user')
         if user:
             try:
@@ -338,6 +410,52 @@ class AddProjectMemberSerializer(serializers.Serializer):
         return data
 
 
+class BulkTaskUpdateSerializer(serializers.Serializer):
+    """Serializer for applying one set of changes to many tasks."""
+    task_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=5000)
+    status = serializers.ChoiceField(choices=Task._meta.get_field('status').choices, required=False)
+    priority = serializers.ChoiceField(choices=Task._meta.get_field('priority').choices, required=False)
+    assigned_to = serializers.IntegerField(required=False, allow_null=True)
+    section = serializers.IntegerField(required=False, allow_null=True)
+    due_date = serializers.DateTimeField(required=False, allow_null=True)
+    add_labels = serializers.ListField(child=serializers.IntegerField(), required=False)
+    remove_labels = serializers.ListField(child=serializers.IntegerField(), required=False)
+    delete = serializers.BooleanField(required=False)
+    
+    # Fields that change the tasks whenever they are sent, even as null
+    SCALAR_FIELDS = ('status', 'priority', 'assigned_to', 'section', 'due_date')
+    
+    def validate(self, data):
+        # delete=false and empty label lists are no-ops, not changes
+        if not (
+            any(field in data for field in self.SCALAR_FIELDS)
+            or data.get('delete') or data.get('add_labels') or data.get('remove_labels')
+        ):
+            raise serializers.ValidationError("At least one change is required.")
+        if set(data.get('add_labels', [])) & set(data.get('remove_labels', [])):
+            raise serializers.ValidationError("A label cannot be both added and removed.")
+        return data
+
+
+class TaskExportSerializer(serializers.ModelSerializer):
+    """Serializer for background task export jobs."""
+    progress = serializers.IntegerField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = TaskExport
+        fields = [
+            'id', 'project', 'format', 'status', 'total_rows', 'rows_written', 'progress',
+            'file_size', 'error', 'created_at', 'started_at', 'finished_at', 'download_url'
+        ]
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        if obj.status != TaskExport.STATUS_COMPLETED:
+            return None
+        return f"/api/v1/tasks/exports/{obj.id}/download/"
+
+
 class FocusedTaskSerializer(serializers.ModelSerializer):
     """Phase 8: Serializer for focused tasks in personal space."""
     task_data = TaskSerializer(source='task', read_only=True)
@@ -4,8 +4,18 @@ Encapsulates complex operations and rules in one place.
 """
 from django.utils import timezone
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from .models import Task, Project, ProjectRole, AuditLog
-from orgs.models import Organization
+from orgs.models import Organization, Membership
+
+
+# Project role granted when an org member is given access to a project
+PROJECT_ROLE_FOR_ORG_ROLE = {
+    Membership.OWNER: ProjectRole.OWNER,
+    Membership.ADMIN: ProjectRole.ADMIN,
+    Membership.MODERATOR: ProjectRole.MODERATOR,
+    Membership.MEMBER: ProjectRole.MEMBER,
+}
 
 
 class TaskService:
@@ -191,3 +201,75 @@ class ProjectService:
         )
         
         return project_role
+
+
+class ProjectAccessService:
+    """Sync which projects org members can access."""
+    
+    @staticmethod
+    def sync_member_projects(organization, assignments):
+        """
+        Make each member's project access in `organization` match exactly.
+        `assignments` maps Membership -> iterable of project IDs.
+        
+        Only the difference is written: one bulk delete for revoked access and
+        one bulk_create for new access, inside a single transaction that
+        reads the current roles under the members' membership row locks.
+        Roles on projects the member keeps are left untouched.
+        Returns {'added': n, 'removed': n, 'unchanged': n}.
+        """
+        wanted = {
+            membership.user_id: set(project_ids)
+            for membership, project_ids in assignments.items()
+        }
+        role_for_user = {
+            membership.user_id: PROJECT_ROLE_FOR_ORG_ROLE.get(membership.role, ProjectRole.MEMBER)
+            for membership in assignments
+        }
+        
+        requested = set().union(*wanted.values()) if wanted else set()
+        valid = set(
+            Project.objects.filter(id__in=requested, organization=organization).values_list('id', flat=True)
+        )
+        if valid != requested:
+            raise ValidationError("Some projects do not belong to this organization.")
+        
+        with transaction.atomic():
+            # Concurrent syncs of a member take turns, each diffing against
+            # the roles the previous one committed
+            list(Membership.objects.select_for_update().filter(
+                organization=organization, user_id__in=wanted.keys()
+            ).order_by('id').values_list('id', flat=True))
+            current = ProjectRole.objects.filter(
+                user_id__in=wanted.keys(),
+                project__organization=organization
+            ).values_list('id', 'user_id', 'project_id')
+            
+            remove_ids = []
+            existing = set()
+            for role_id, user_id, project_id in current:
+                if project_id in wanted[user_id]:
+                    existing.add((user_id, project_id))
+                else:
+                    remove_ids.append(role_id)
+            
+            new_roles = [
+                ProjectRole(user_id=user_id, project_id=project_id, role=role_for_user[user_id])
+                for user_id, project_ids in wanted.items()
+                for project_id in project_ids
+                if (user_id, project_id) not in existing
+            ]
+            
+            if remove_ids:
+                ProjectRole.objects.filter(id__in=remove_ids).delete()
+            if new_roles:
+                ProjectRole.objects.bulk_create(new_roles, batch_size=1000, ignore_conflicts=True)
+                # bulk_create sends no signals
+                Project.objects.filter(id__in={role.project_id for role in new_roles}).touch()
+                Organization.objects.filter(pk=organization.pk).touch()
+        
+        return {
+            'added': len(new_roles),
+            'removed': len(remove_ids),
+            'unchanged': len(existing),
+        }
@@ -0,0 +1,154 @@
+"""
+Project version bumps for conditional GETs (see core.conditional).
+Any write that can change a project, task list or project detail response
+bumps the versions of the projects it touches. Bulk .update() paths do not
+send signals and call ProjectQuerySet.touch() themselves.
+Label and project membership changes also bump the organization version
+that keys cached label lists (see core.response_cache).
+Task saves and deletes also move the active task counters (see core.counters).
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from core import counters
+from orgs.models import Organization
+from .models import (
+    FocusedTask, Project, ProjectRole, Task, TaskAttachment, TaskComment, TaskLabel, TaskSection,
+)
+
+# Context-local, so pausing in one request or task never affects another
+_paused = contextvars.ContextVar('versions_paused', default=False)
+
+# Names save(update_fields=...) may use for Task.COUNTER_FIELDS
+COUNTER_UPDATE_FIELDS = set(Task.COUNTER_FIELDS) | {'project', 'section'}
+
+
+@contextmanager
+def versions_paused():
+    """Skip version bumps, e.g. while purging rows no response can show."""
+    token = _paused.set(True)
+    try:
+        yield
+    finally:
+        _paused.reset(token)
+
+
+def touch(**lookup):
+    if not _paused.get():
+        Project.objects.filter(**lookup).touch()
+
+
+def touch_organizations(**lookup):
+    if not _paused.get():
+        Organization.objects.filter(**lookup).touch()
+
+
+@receiver([post_save, post_delete], sender=Task)
+@receiver([post_save, post_delete], sender=TaskSection)
+@receiver([post_save, post_delete], sender=ProjectRole)
+def project_child_changed(sender, instance, **kwargs):
+    touch(pk=instance.project_id)
+
+
+def _counts_change(update_fields) -> bool:
+    return not update_fields or bool(set(update_fields) & COUNTER_UPDATE_FIELDS)
+
+
+@receiver(pre_save, sender=Task)
+def task_counter_key_before_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Runs inside Task.save()'s transaction; the row stays locked until commit
+    if raw or not instance.pk or not _counts_change(update_fields):
+        instance._counter_key_before_save = None
+    else:
+        instance._counter_key_before_save = counters.stored_key(instance.pk)
+
+
+@receiver(post_save, sender=Task)
+def task_counters_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    old = instance.__dict__.pop('_counter_key_before_save', None)
+    if raw or not _counts_change(update_fields):
+        return
+    counters.move(old, instance.counter_key())
+
+
+def _deleted_with_project(origin) -> bool:
+    # Counters of a project being deleted go with it
+    return getattr(origin, 'model', type(origin)) in (Project, Organization)
+
+
+@receiver(pre_delete, sender=Task)
+def task_counter_key_before_delete(sender, instance, origin=None, **kwargs):
+    # Inside the deletion's transaction: a task deleted twice is uncounted once
+    if not _deleted_with_project(origin):
+        instance._counter_key_before_delete = counters.stored_key(instance.pk)
+
+
+@receiver(post_delete, sender=Task)
+def task_counters_deleted(sender, instance, origin=None, **kwargs):
+    old = instance.__dict__.pop('_counter_key_before_delete', None)
+    if not _deleted_with_project(origin):
+        counters.move(old, None)
+
+
+@receiver([post_save, post_delete], sender=ProjectRole)
+def project_role_changed(sender, instance, **kwargs):
+    # Callers see the labels of the projects they belong to
+    touch_organizations(projects__id=instance.project_id)
+
+
+@receiver([post_save, post_delete], sender=TaskComment)
+@receiver([post_save, post_delete], sender=TaskAttachment)
+@receiver([post_save, post_delete], sender=FocusedTask)
+def task_child_changed(sender, instance, **kwargs):
+    touch(tasks__id=instance.task_id)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, **kwargs):
+    touch(pk=instance.pk)
+
+
+@receiver(post_save, sender=Organization)
+def organization_saved(sender, instance, created, **kwargs):
+    # Project responses show the organization's name
+    if not created:
+        touch(organization_id=instance.pk)
+
+
+@receiver(post_save, sender=TaskLabel)
+@receiver(pre_delete, sender=TaskLabel)
+def label_changed(sender, instance, **kwargs):
+    touch(tasks__labels__id=instance.pk)
+    if instance.is_default:
+        TaskLabel.clear_default_labels()
+    if instance.organization_id:
+        touch_organizations(pk=instance.organization_id)
+    elif instance.project_id:
+        touch_organizations(projects__id=instance.project_id)
+    else:
+        # Default labels are listed for everyone
+        touch_organizations()
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def task_labels_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        touch(pk=instance.project_id)
+    elif pk_set:
+        touch(tasks__id__in=pk_set)
+    else:
+        touch(tasks__labels__id=instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Names and avatars appear on tasks and member lists; logins only touch last_login
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    touch(roles__user_id=instance.pk)
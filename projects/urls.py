@@ -8,7 +8,11 @@ from .views import (
     TaskLabelViewSet,
     TaskCommentViewSet,
     TaskAttachmentViewSet,
-    FocusedTaskViewSet
+    FocusedTaskViewSet,
+    TimesheetViewSet,
+    TimerViewSet,
+    export_status,
+    export_download,
 )
 
 # Phase 5: Register all viewsets with router
@@ -21,7 +25,12 @@ router.register(r'labels', TaskLabelViewSet, basename='label')  # Phase 8
 router.register(r'comments', TaskCommentViewSet, basename='comment')  # Phase 8
 router.register(r'attachments', TaskAttachmentViewSet, basename='attachment')  # Phase 8
 router.register(r'focus', FocusedTaskViewSet, basename='focus')  # Phase 8
+router.register(r'timesheets', TimesheetViewSet, basename='timesheet')
+router.register(r'timers', TimerViewSet, basename='timer')
 
 urlpatterns = [
+    # Async views; listed before the router so tasks/<pk>/ does not match them
+    path('tasks/exports/<int:export_id>/', export_status, name='task-export-status'),
+    path('tasks/exports/<int:export_id>/download/', export_download, name='task-export-download'),
     path('', include(router.urls)),
 ]
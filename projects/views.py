@@ -6,8 +6,8 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.db import models
-from .models import Project, Task, ProjectRole, AuditLog, TaskSection, TaskLabel, TaskComment, TaskAttachment, FocusedTask
+from django.db import models, transaction
+from .models import Project, Task, ProjectRole, AuditLog, TaskSection, TaskLabel, TaskComment, TaskAttachment, FocusedTask, TaskExport, TimeEntry
 from .serializers import (
     ProjectDetailSerializer,
     ProjectListSerializer,
@@ -19,7 +19,9 @@ from .serializers import (
     TaskLabelSerializer,
     TaskCommentSerializer,
     TaskAttachmentSerializer,
-    FocusedTaskSerializer
+    FocusedTaskSerializer,
+    BulkTaskUpdateSerializer,
+    TaskExportSerializer
 )
 from .permissions import (
     IsProjectMember,
@@ -29,6 +31,13 @@ from .permissions import (
     CanManageTasks
 )
 from .services import TaskService, ProjectService
+from core import counters, services as core_services
+from core.async_views import api_response, async_api_view
+from core.conditional import ConditionalGetMixin
+from core.projections import ProjectionListMixin, TaskProjection
+from core.response_cache import cached_response, member_organizations_scope, project_scope
+from core.tasks import send_task_assigned_notification
+from core.metrics import record_fanout
 from orgs.models import Membership
 from accounts.models import Notification
 
@@ -43,10 +52,11 @@ class StandardPagination(PageNumberPagination):
     max_page_size = 100
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing projects with role-based permissions.
     Phase 5: Added pagination and filtering
+    List and retrieve answer If-None-Match with 304 (core.conditional).
     """
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardPagination  # Phase 5: Add pagination
@@ -62,12 +72,18 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Return only projects in organizations where user is a member.
         """
         user = self.request.user
-        # Get all org IDs where user is a member
-        org_ids = Membership.objects.filter(user=user).values_list('organization_id', flat=True)
-        # Get all projects in those orgs where user is a project member
-        return Project.objects.filter(
-            roles__user=user
-        ).select_related('organization', 'created_by').distinct()
+        queryset = Project.objects.for_member(user)
+        if self.action == 'list':
+            # Counts, owner and caller role resolved in 3 queries per page
+            return queryset.with_list_stats(user)
+        if self.action == 'retrieve':
+            # Nested roles, tasks and sections are prefetched with their stats
+            return queryset.with_detail_stats(user)
+        return queryset.select_related('organization', 'created_by')
+    
+    def conditional_projects(self, request, pk=None):
+        projects = Project.objects.for_member(request.user)
+        return projects.filter(pk=pk) if pk is not None else projects
     
     def get_serializer_class(self):
         """Use detailed serializer for retrieve/create, list for list."""
@@ -222,6 +238,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
         )
     
     @action(detail=True, methods=['get'])
+    @cached_response('project_members', project_scope)
     def members(self, request, pk=None):
         """Get all members of a project."""
         project = self.get_object()
@@ -233,7 +250,7 @@ class ProjectViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        roles = project.roles.all()
+        roles = project.roles.select_related('user')
         serializer = ProjectRoleSerializer(roles, many=True)
         return Response(serializer.data)
     
@@ -378,12 +395,15 @@ class ProjectViewSet(viewsets.ModelViewSet):
         }, status=status.HTTP_200_OK)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, ProjectionListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing tasks with role-based permissions.
     Phase 4: Soft delete support, Phase 5: Pagination & filtering
+    List and retrieve answer If-None-Match with 304 (core.conditional).
+    List pages are rendered by TaskProjection (core.projections).
     """
     serializer_class = TaskSerializer
+    list_projection = TaskProjection
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardPagination  # Phase 5: Add pagination
     # Phase 5: Add filtering backends
@@ -401,7 +421,20 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Phase 4: Only return non-deleted tasks
         return Task.get_active().filter(
             project__roles__user=user
-        ).select_related('project', 'assigned_to', 'created_by').distinct()
+        ).with_list_stats(user).distinct()
+    
+    def conditional_projects(self, request, pk=None):
+        projects = Project.objects.for_member(request.user)
+        if pk is not None:
+            return projects.filter(tasks__pk=pk)
+        project_id = request.query_params.get('project_id')
+        if project_id and project_id.isdigit():
+            projects = projects.filter(pk=project_id)
+        return projects
+    
+    def conditional_pinned(self, request, pk=None):
+        project_id = request.query_params.get('project_id')
+        return pk is not None or bool(project_id and project_id.isdigit())
     
     def create(self, request, *args, **kwargs):
         """
@@ -439,19 +472,11 @@ class TaskViewSet(viewsets.ModelViewSet):
                 due_date=serializer.validated_data.get('due_date')
             )
             
-            # Phase 7: Send notification if task is assigned to someone
+            # Phase 7: Send notification if task is assigned to someone (off the request path)
             assigned_to = serializer.validated_data.get('assigned_to')
             if assigned_to and assigned_to != request.user:
-                Notification.objects.create(
-                    user=assigned_to,
-                    type='task_assigned',
-                    title='New Task Assigned',
-                    message=f'You have been assigned to "{task.title}" in {project.name}',
-                    link=f'/tasks?task={task.id}',
-                    related_task_id=task.id,
-                    related_project_id=project.id,
-                    actor_id=request.user.id,
-                    actor_name=request.user.get_full_name()
+                transaction.on_commit(
+                    lambda: send_task_assigned_notification.delay(task.id, request.user.id)
                 )
             
             return Response(
@@ -502,16 +527,8 @@ class TaskViewSet(viewsets.ModelViewSet):
             # Phase 7: Send notification if assignee changed
             new_assigned_to = task.assigned_to
             if new_assigned_to and new_assigned_to != old_assigned_to and new_assigned_to != request.user:
-                Notification.objects.create(
-                    user=new_assigned_to,
-                    type='task_assigned',
-                    title='Task Assigned to You',
-                    message=f'You have been assigned to "{task.title}" in {task.project.name}',
-                    link=f'/tasks?task={task.id}',
-                    related_task_id=task.id,
-                    related_project_id=task.project.id,
-                    actor_id=request.user.id,
-                    actor_name=request.user.get_full_name()
+                transaction.on_commit(
+                    lambda: send_task_assigned_notification.delay(task.id, request.user.id)
                 )
             
             return Response(
@@ -626,8 +643,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        task.time_spent_minutes += minutes
-        task.save()
+        task.add_time(minutes, user=request.user)
         return Response(TaskSerializer(task).data)
     
     @action(detail=False, methods=['post'])
@@ -670,12 +686,176 @@ class TaskViewSet(viewsets.ModelViewSet):
                     task.completed_at = timezone.now()
                     # Stop timer if running
                     if task.is_timer_running:
-                        task.stop_timer()
+                        task.stop_timer(user=request.user)
                 elif new_status != 'done' and old_status == 'done':
                     task.completed_at = None
             task.save()
         
         return Response({'detail': 'Tasks reordered successfully'})
+    
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_tasks(self, request):
+        """
+        Import tasks from an uploaded CSV or JSONL file into a project.
+        Expects multipart fields `file` and `project_id` (optional `format`).
+        Rows are validated and inserted in chunks; invalid rows are reported
+        with their row number and skipped.
+        """
+        from django.core.exceptions import ValidationError
+        from core.imports import TaskImporter, detect_format, SUPPORTED_FORMATS
+        
+        upload = request.FILES.get('file')
+        project_id = request.data.get('project_id')
+        if not upload or not project_id:
+            return Response(
+                {'detail': 'file and project_id are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        format_type = request.data.get('format') or detect_format(upload.name)
+        if format_type not in SUPPORTED_FORMATS:
+            return Response(
+                {'detail': f'format must be one of: {", ".join(SUPPORTED_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            project = Project.objects.get(id=project_id)
+        except (Project.DoesNotExist, ValueError):
+            return Response(
+                {'detail': 'Project not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            TaskService.can_create_task(request.user, project)
+        except ValidationError as e:
+            return Response(
+                {'detail': e.messages[0]},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        result = TaskImporter(project, request.user).run(upload, format_type)
+        return Response(
+            result,
+            status=status.HTTP_201_CREATED if result['created'] else status.HTTP_400_BAD_REQUEST
+        )
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Apply the same changes to many tasks in one request.
+        Supports status, priority, assigned_to, section, due_date,
+        add_labels/remove_labels and delete (soft delete).
+        Moderators and above only, in every affected project.
+        """
+        serializer = BulkTaskUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        update_data = dict(serializer.validated_data)
+        task_ids = update_data.pop('task_ids')
+        
+        updated, errors = core_services.TaskService.bulk_update_tasks(
+            task_ids=task_ids,
+            update_data=update_data,
+            user=request.user
+        )
+        if errors:
+            return Response(
+                {'detail': errors[0], 'errors': errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({'detail': 'Tasks updated successfully', 'updated': updated})
+    
+    @action(detail=False, methods=['get'], url_path='export')
+    def export_tasks(self, request):
+        """
+        Export a project's tasks as CSV or JSONL.
+        Query params: project_id, export_format (csv|jsonl), background (true to force a job).
+        Projects up to TASK_EXPORT_STREAM_MAX_ROWS rows are streamed directly;
+        larger ones start a background export and return 202 with the job.
+        """
+        from django.conf import settings
+        from django.db import transaction
+        from core.exports import SUPPORTED_FORMATS, count_rows, enqueue_export, stream_response
+        
+        project_id = request.query_params.get('project_id')
+        format_type = request.query_params.get('export_format', 'csv')
+        if not project_id:
+            return Response(
+                {'detail': 'project_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if format_type not in SUPPORTED_FORMATS:
+            return Response(
+                {'detail': f'export_format must be one of: {", ".join(SUPPORTED_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            project = Project.objects.get(id=project_id)
+        except (Project.DoesNotExist, ValueError):
+            return Response(
+                {'detail': 'Project not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        if not ProjectRole.objects.filter(project=project, user=request.user).exists():
+            return Response(
+                {'detail': 'You are not a member of this project'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        background = request.query_params.get('background', '').lower() in ('1', 'true', 'yes')
+        if not background and count_rows(project.id) <= settings.TASK_EXPORT_STREAM_MAX_ROWS:
+            return stream_response(project, format_type)
+        
+        export = TaskExport.objects.create(
+            project=project,
+            requested_by=request.user,
+            format=format_type
+        )
+        # The worker must see the committed job row
+        transaction.on_commit(lambda: enqueue_export(export.id))
+        return Response(TaskExportSerializer(export).data, status=status.HTTP_202_ACCEPTED)
+
+
+def _visible_exports(user):
+    """Export jobs of projects the user belongs to."""
+    return TaskExport.objects.filter(project__roles__user=user)
+
+
+@async_api_view()
+async def export_status(request, export_id):
+    """Progress of a background export; async since clients poll it while it runs."""
+    export = await _visible_exports(request.user).filter(id=export_id).afirst()
+    if not export:
+        return api_response({'detail': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+    return api_response(TaskExportSerializer(export).data)
+
+
+@async_api_view()
+async def export_download(request, export_id):
+    """Download a completed background export (gzipped)."""
+    import os
+    from django.http import FileResponse
+    
+    export = await _visible_exports(request.user).filter(id=export_id).afirst()
+    if not export:
+        return api_response({'detail': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+    if export.status != TaskExport.STATUS_COMPLETED or not export.file_path or not os.path.exists(export.file_path):
+        return api_response(
+            {'detail': 'Export is not ready'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    return FileResponse(
+        open(export.file_path, 'rb'),
+        as_attachment=True,
+        filename=os.path.basename(export.file_path),
+        content_type='application/gzip'
+    )
 
 
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
@@ -692,7 +872,136 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
         """Phase 5: Only return audit logs for orgs user is a member of."""
         user = self.request.user
         org_ids = Membership.objects.filter(user=user).values_list('organization_id', flat=True)
-        return AuditLog.objects.filter(organization_id__in=org_ids)
+        return AuditLog.objects.filter(organization_id__in=org_ids).select_related('user')
+
+
+class TimesheetViewSet(viewsets.ViewSet):
+    """
+    Time spent per user, project and day, aggregated from time entries.
+    Moderators and above see everyone's time in their projects; members see their own.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def list(self, request):
+        """
+        Query params: start, end (YYYY-MM-DD, inclusive; default the last 7 days),
+        project_id, organization_id, user_id.
+        """
+        from datetime import datetime, time, timedelta
+        from django.db.models import Count, Q, Sum
+        from django.db.models.functions import TruncDate
+        from django.utils.dateparse import parse_date
+        
+        params = request.query_params
+        try:
+            end = parse_date(params['end']) if params.get('end') else timezone.localdate()
+            start = parse_date(params['start']) if params.get('start') else end - timedelta(days=6)
+        except ValueError:
+            start = end = None
+        if not start or not end or start > end:
+            return Response(
+                {'detail': 'start and end must be valid dates (YYYY-MM-DD) with start <= end'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        roles = ProjectRole.objects.filter(user=request.user)
+        managed = roles.filter(
+            role__in=[ProjectRole.OWNER, ProjectRole.ADMIN, ProjectRole.MODERATOR]
+        ).values('project_id')
+        # Reset entries only zero a task's cached total; they are not work anyone did
+        entries = TimeEntry.objects.exclude(source=TimeEntry.SOURCE_RESET).filter(
+            Q(project_id__in=managed) |
+            Q(project_id__in=roles.values('project_id'), user=request.user),
+            started_at__gte=timezone.make_aware(datetime.combine(start, time.min)),
+            started_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+        )
+        
+        filters = {
+            'project_id': 'project_id',
+            'organization_id': 'project__organization_id',
+            'user_id': 'user_id',
+        }
+        for param, lookup in filters.items():
+            value = params.get(param)
+            if value:
+                if not value.isdigit():
+                    return Response(
+                        {'detail': f'{param} must be an integer'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                entries = entries.filter(**{lookup: value})
+        
+        rows = list(
+            entries.annotate(date=TruncDate('started_at'))
+            .values('date', 'user_id', 'user__username', 'project_id', 'project__name')
+            .annotate(minutes=Sum('minutes'), entries=Count('id'))
+            .order_by('date', 'user__username', 'project__name')
+        )
+        
+        return Response({
+            'start': start,
+            'end': end,
+            'total_minutes': sum(row['minutes'] for row in rows),
+            'rows': [
+                {
+                    'date': row['date'],
+                    'user_id': row['user_id'],
+                    'username': row['user__username'],
+                    'project_id': row['project_id'],
+                    'project_name': row['project__name'],
+                    'minutes': row['minutes'],
+                    'entries': row['entries'],
+                }
+                for row in rows
+            ],
+        })
+
+
+class TimerViewSet(viewsets.ViewSet):
+    """Live view of running task timers."""
+    permission_classes = [permissions.IsAuthenticated]
+    
+    @action(detail=False, methods=['get'])
+    def active(self, request):
+        """
+        Timers currently running in an organization (query param organization_id).
+        Org owners and admins see every project; others see projects they belong to.
+        """
+        org_id = request.query_params.get('organization_id')
+        if not org_id or not org_id.isdigit():
+            return Response(
+                {'detail': 'organization_id is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        membership = Membership.objects.filter(
+            user=request.user,
+            organization_id=org_id
+        ).select_related('organization').first()
+        if not membership:
+            return Response(
+                {'detail': 'You are not a member of this organization'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        project_ids = None
+        if membership.role not in [Membership.OWNER, Membership.ADMIN]:
+            project_ids = ProjectRole.objects.filter(user=request.user).values('project_id')
+        
+        timers = core_services.TimerService.get_active_timers(membership.organization, project_ids)
+        return Response([
+            {
+                'task_id': timer['id'],
+                'title': timer['title'],
+                'project_id': timer['project_id'],
+                'project_name': timer['project__name'],
+                'user_id': timer['timer_started_by_id'],
+                'username': timer['timer_started_by__username'],
+                'timer_started_at': timer['timer_started_at'],
+                'elapsed_seconds': max(int(timer['elapsed'].total_seconds()), 0),
+            }
+            for timer in timers
+        ])
 
 
 class TaskSectionViewSet(viewsets.ModelViewSet):
@@ -717,6 +1026,10 @@ class TaskSectionViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('position')
     
+    @cached_response('sections', project_scope, query_param='project_id')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def create(self, request, *args, **kwargs):
         """Create a new section. Only moderators and above."""
         project_id = request.data.get('project_id')
@@ -819,10 +1132,13 @@ class TaskSectionViewSet(viewsets.ModelViewSet):
             is_default=True
         ).first()
         
-        if default_section:
-            Task.objects.filter(section=section).update(section=default_section)
-        
-        return super().destroy(request, *args, **kwargs)
+        # The counter move and the delete commit together
+        with transaction.atomic():
+            if default_section:
+                moved = list(Task.objects.filter(section=section).values_list('id', flat=True))
+                with counters.tracking(moved):
+                    Task.objects.filter(id__in=moved, section=section).update(section=default_section)
+            return super().destroy(request, *args, **kwargs)
     
     @action(detail=False, methods=['post'])
     def reorder(self, request):
@@ -855,6 +1171,7 @@ class TaskSectionViewSet(viewsets.ModelViewSet):
                 id=section_data['id'],
                 project=project
             ).update(position=section_data['position'])
+        Project.objects.filter(id=project.id).touch()
         
         return Response({'detail': 'Sections reordered successfully'})
 
@@ -872,11 +1189,16 @@ class TaskLabelViewSet(viewsets.ModelViewSet):
         org_ids = Membership.objects.filter(user=user).values_list('organization_id', flat=True)
         project_ids = ProjectRole.objects.filter(user=user).values_list('project_id', flat=True)
         
+        # The memberships are IN subqueries, not joins, so rows need no DISTINCT
         return TaskLabel.objects.filter(
             models.Q(is_default=True) |
             models.Q(organization_id__in=org_ids) |
             models.Q(project_id__in=project_ids)
-        ).distinct()
+        )
+    
+    @cached_response('labels', member_organizations_scope)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
     
     def create(self, request, *args, **kwargs):
         """Create a custom label."""
@@ -887,7 +1209,7 @@ class TaskLabelViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def defaults(self, request):
-        """Get or create default labels."""
+        """Default labels, memoized per process."""
         labels = TaskLabel.get_default_labels()
         serializer = self.get_serializer(labels, many=True)
         return Response(serializer.data)
@@ -934,7 +1256,9 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
         comment = serializer.save(author=request.user)
         
         # Notify task assignee if not the commenter
+        notified = 0
         if task.assigned_to and task.assigned_to != request.user:
+            notified += 1
             Notification.objects.create(
                 user=task.assigned_to,
                 type='task_comment',
@@ -954,6 +1278,7 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
             try:
                 mentioned_user = User.objects.get(username__iexact=username)
                 if mentioned_user != request.user:
+                    notified += 1
                     Notification.objects.create(
                         user=mentioned_user,
                         type='mention',
@@ -969,6 +1294,7 @@ class TaskCommentViewSet(viewsets.ModelViewSet):
                     )
             except User.DoesNotExist:
                 pass
+        record_fanout('comment', notified)
         
         return Response(self.get_serializer(comment).data, status=status.HTTP_201_CREATED)
     
@@ -1034,7 +1360,9 @@ class FocusedTaskViewSet(viewsets.ModelViewSet):
         """Get user's focused tasks."""
         queryset = FocusedTask.objects.filter(
             user=self.request.user
-        ).select_related('task', 'task__project', 'task__assigned_to')
+        ).prefetch_related(
+            models.Prefetch('task', queryset=Task.objects.with_list_stats(self.request.user))
+        )
         
         # Filter by task_id if provided
         task_id = self.request.query_params.get('task_id')